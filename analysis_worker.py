@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Background analysis worker pool for Real Estate AI Investment System
+Runs analysis jobs in chunks on threads or processes and reports progress
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from leaderboard import Leaderboard
+from monte_carlo import simulate_property_risk
+from run_history import RunHistoryStore
+from spatial_index import fill_market_cap_rates
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def analyze_chunk(chunk: List[Any], use_ai: bool = True) -> List[Any]:
+    """Analyze one chunk of properties.
+
+    Runs inside a worker thread or process, so the engine is imported here:
+    it needs GROQ_API_KEY and a missing key should fail the job, not the
+    caller that imported this module.
+    """
+    from real_estate_ai_engine import API_KEY, BASE_URL, GroqAIService, RealEstateAnalysisEngine
+
+    engine = RealEstateAnalysisEngine(GroqAIService(API_KEY, BASE_URL))
+    if use_ai:
+        return engine.analyze_properties(chunk)
+
+    results = engine.compute_results(chunk)
+    engine._generate_basic_recommendations(results)
+    return results
+
+
+@dataclass
+class JobProgress:
+    """Progress snapshot of one analysis job"""
+    job_id: str
+    total_properties: int
+    total_chunks: int
+    status: str = JOB_QUEUED
+    completed_chunks: int = 0
+    processed_properties: int = 0
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Properties analyzed per second"""
+        elapsed = self.elapsed_seconds
+        return self.processed_properties / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def percent_complete(self) -> float:
+        return 100.0 * self.completed_chunks / self.total_chunks if self.total_chunks else 100.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated time left, from the throughput so far"""
+        if self.status == JOB_COMPLETED:
+            return 0.0
+        if not self.throughput:
+            return None
+        return (self.total_properties - self.processed_properties) / self.throughput
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(
+            elapsed_seconds=self.elapsed_seconds,
+            throughput=self.throughput,
+            percent_complete=self.percent_complete,
+            eta_seconds=self.eta_seconds,
+        )
+        return data
+
+
+class AnalysisWorkerPool:
+    """Local pool that runs several analysis jobs concurrently.
+
+    Each job is split into chunks that share one executor, and a small
+    coordinator thread per job collects chunk results, so ``submit`` returns
+    immediately and callers poll ``progress`` instead of blocking.
+    """
+
+    def __init__(self, max_workers: int = None, use_processes: bool = False,
+                 history_path: Optional[str] = None):
+        self.max_workers = max_workers or Config.ANALYSIS_WORKERS
+        self.history_path = history_path
+        self.use_processes = use_processes
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor: Executor = executor_class(max_workers=self.max_workers)
+        self._jobs: Dict[str, JobProgress] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._leaderboards: Dict[str, Leaderboard] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, properties: List[Any], chunk_size: int = None, output_path: Optional[str] = None,
+               use_ai: bool = True) -> str:
+        """Queue an analysis job and return its id"""
+        chunk_size = chunk_size or Config.ANALYSIS_CHUNK_SIZE
+        chunks = [properties[i:i + chunk_size] for i in range(0, len(properties), chunk_size)]
+
+        job_id = uuid.uuid4().hex[:12]
+        progress = JobProgress(
+            job_id=job_id,
+            total_properties=len(properties),
+            total_chunks=len(chunks),
+            output_path=output_path
+        )
+        with self._lock:
+            self._jobs[job_id] = progress
+            self._done[job_id] = threading.Event()
+            self._leaderboards[job_id] = Leaderboard()
+
+        threading.Thread(
+            target=self._run_job,
+            args=(job_id, properties, chunks, use_ai),
+            name=f"analysis-job-{job_id}",
+            daemon=True
+        ).start()
+        logger.info(f"📥 Queued analysis job {job_id}: {len(properties)} properties in {len(chunks)} chunks")
+        return job_id
+
+    def _run_job(self, job_id: str, properties: List[Any], chunks: List[List[Any]], use_ai: bool):
+        progress = self._jobs[job_id]
+        progress.status = JOB_RUNNING
+        progress.started_at = time.time()
+
+        try:
+            from real_estate_ai_engine import build_output_data
+
+            # Comps come from the whole job, not just the chunk a property lands in
+            fill_market_cap_rates(properties)
+
+            # Chunks are ranked independently; the job leaderboard ranks them
+            # together as they arrive, so partial top-K is available mid-run
+            leaderboard = self._leaderboards[job_id]
+            futures = {self.executor.submit(analyze_chunk, chunk, use_ai): len(chunk) for chunk in chunks}
+            for future in as_completed(futures):
+                chunk_results = future.result()
+                with self._lock:
+                    for result in chunk_results:
+                        leaderboard.update(result.property_id, result.cap_rate, result)
+                    progress.completed_chunks += 1
+                    progress.processed_properties += futures[future]
+
+            results = []
+            for rank, (_, _, result) in enumerate(leaderboard.top(len(leaderboard)), 1):
+                result.rank = rank
+                results.append(result)
+
+            # Risk levels come from simulated loss probability, as in the engine's own runs
+            output_data = build_output_data(properties, results, simulate_property_risk(properties))
+            if progress.output_path:
+                _write_json_atomic(progress.output_path, output_data)
+            if self.history_path:
+                history = RunHistoryStore(self.history_path)
+                history.record_run(output_data)
+                history.close()
+
+            self._results[job_id] = output_data
+            progress.status = JOB_COMPLETED
+            logger.info(f"✅ Analysis job {job_id} completed in {progress.elapsed_seconds:.1f}s")
+        except Exception as e:
+            progress.status = JOB_FAILED
+            progress.error = str(e)
+            logger.error(f"❌ Analysis job {job_id} failed: {e}")
+        finally:
+            progress.finished_at = time.time()
+            self._done[job_id].set()
+
+    def progress(self, job_id: str) -> Optional[JobProgress]:
+        return self._jobs.get(job_id)
+
+    def top(self, job_id: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Best ``k`` properties analyzed so far by a job, by cap rate"""
+        leaderboard = self._leaderboards.get(job_id)
+        if leaderboard is None:
+            return []
+        with self._lock:
+            entries = leaderboard.top(k)
+        return [
+            {"property_id": property_id, "rank": rank, "cap_rate": cap_rate}
+            for rank, (property_id, cap_rate, _) in enumerate(entries, 1)
+        ]
+
+    def jobs(self) -> List[JobProgress]:
+        """All jobs, newest first"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def active_jobs(self) -> List[JobProgress]:
+        return [job for job in self.jobs() if job.status in (JOB_QUEUED, JOB_RUNNING)]
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for a job and return its output data (None if it failed or timed out)"""
+        done = self._done.get(job_id)
+        if done is None or not done.wait(timeout):
+            return None
+        return self._results.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        if wait:
+            for done in list(self._done.values()):
+                done.wait()
+        self.executor.shutdown(wait=wait)
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    """Write JSON next to the target and swap it in, so readers never see a partial file"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
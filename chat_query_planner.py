@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Chat query planner for Real Estate AI Investment System
+Answers structured deal questions from the deal indexes and sends only open-ended ones to the LLM
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 50
+
+# Deals and fields sent to the LLM for an open-ended question
+CONTEXT_DEALS = 10
+CONTEXT_FIELDS = ("title", "city", "country", "price", "capRate", "discountPct", "risk", "category", "score")
+
+FIELD_LABELS = {"capRate": "cap rate", "discountPct": "discount", "price": "price", "score": "score"}
+
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                 "eight": 8, "nine": 9, "ten": 10, "twenty": 20}
+
+_NUMBER = r"\$?\s*(\d[\d,]*(?:\.\d+)?)\s*(k|m|mm|million|thousand|%|percent)?(?![\w])"
+_COUNT = r"(\d+|" + "|".join(_NUMBER_WORDS) + r")"
+
+_OPEN_ENDED = re.compile(
+    r"\b(why|should|explain|recommend\w*|advi[cs]e|think|strategy|strategies|compare|versus|vs|pros|cons|"
+    r"outlook|forecast|predict\w*|opinion|worth it|risks|how (?:do|can|should|would))\b"
+)
+_TOP = re.compile(r"\b(?:top|best|highest|lowest|worst|cheapest|first|largest|biggest)\s+" + _COUNT + r"\b")
+_COUNT_FIRST = re.compile(r"\b" + _COUNT + r"\s+(?:best|top|cheapest|highest|lowest|deals|properties|listings)\b")
+_RANKING = re.compile(r"\b(top|best|highest|lowest|worst|cheapest|priciest|most expensive|largest|biggest|"
+                      r"show|list|find)\b")
+_AVERAGE = re.compile(r"\b(average|avg|mean|typical)\b")
+_MEDIAN = re.compile(r"\bmedian\b")
+_HOW_MANY = re.compile(r"\b(how many|number of|count)\b")
+_RISK = re.compile(r"\b(low|medium|moderate|high)[- ]risk\b")
+_CATEGORIES = {"distressed": "distressed", "mispriced": "mispriced", "arbitrage": "cap_rate_arbitrage"}
+
+_MAX_BOUND = re.compile(r"\b(?:under|below|less than|cheaper than|at most|up to|max(?:imum)?)\s+" + _NUMBER)
+_MIN_BOUND = re.compile(r"\b(?:over|above|more than|greater than|at least|min(?:imum)?)\s+" + _NUMBER)
+_BETWEEN = re.compile(r"\bbetween\s+" + _NUMBER + r"\s+(?:and|to|-)\s+" + _NUMBER)
+
+
+@dataclass
+class QueryPlan:
+    """What a chat message asks for, in terms of deal store queries"""
+    intent: str
+    measure: str = "score"
+    descending: bool = True
+    limit: int = DEFAULT_TOP_N
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = field(default_factory=dict)
+    markets: List[str] = field(default_factory=list)
+    category: Optional[str] = None
+    risk: Optional[str] = None
+    statistic: str = "mean"
+
+    def filters(self) -> Dict[str, Any]:
+        return {"ranges": self.ranges, "markets": self.markets or None, "category": self.category, "risk": self.risk}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _amount(number: str, unit: Optional[str]) -> Tuple[float, bool]:
+    """Parsed value and whether it is a percentage"""
+    value = float(number.replace(",", ""))
+    unit = (unit or "").lower()
+    if unit in ("k", "thousand"):
+        value *= 1_000
+    elif unit in ("m", "mm", "million"):
+        value *= 1_000_000
+    return value, unit in ("%", "percent")
+
+
+# Words naming each field, in priority order
+_FIELD_WORDS = (
+    ("capRate", re.compile(r"cap\s*rates?|caprate|yield")),
+    ("discountPct", re.compile(r"discount|undervalued|below (?:fair )?value")),
+    ("score", re.compile(r"\bscores?\b")),
+    ("price", re.compile(r"price|cheap|expensive|pric(?:ey|iest)|affordable|cost")),
+)
+
+
+def _field_in(text: str) -> Optional[str]:
+    return next((name for name, pattern in _FIELD_WORDS if pattern.search(text)), None)
+
+
+def _bound_field(text: str, start: int, end: int, value: float, percent: bool) -> str:
+    """Field a numeric bound applies to.
+
+    Dollar amounts and large numbers are prices; otherwise the closest
+    percentage field named just before the bound, then just after it, and
+    cap rate when none is.
+    """
+    if "$" in text[start:end] or (value >= 1000 and not percent):
+        return "price"
+    before = text[max(0, start - 30):start]
+    after = text[end:end + 20]
+    mentions = [(m.end(), name) for name, pattern in _FIELD_WORDS[:3] for m in pattern.finditer(before)]
+    if mentions:
+        return max(mentions)[1]
+    mentions = [(m.start(), name) for name, pattern in _FIELD_WORDS[:3] for m in pattern.finditer(after)]
+    return min(mentions)[1] if mentions else "capRate"
+
+
+def plan_query(message: str, locations: Optional[List[Tuple[str, str]]] = None) -> QueryPlan:
+    """Recognize a structured intent in a chat message.
+
+    ``locations`` are the (city, country) pairs present in the data; a
+    message naming one is filtered to that market. Messages asking for
+    judgement (why, should, compare, recommend...) or with no recognizable
+    intent get the ``open`` intent.
+    """
+    text = " ".join(message.lower().split())
+    plan = QueryPlan(intent="open")
+
+    for match in _BETWEEN.finditer(text):
+        low, low_pct = _amount(match.group(1), match.group(2))
+        high, high_pct = _amount(match.group(3), match.group(4))
+        name = _bound_field(text, match.start(), match.end(), high, low_pct or high_pct)
+        plan.ranges[name] = (low, high)
+    for pattern, bound in ((_MIN_BOUND, 0), (_MAX_BOUND, 1)):
+        for match in pattern.finditer(text):
+            value, percent = _amount(match.group(1), match.group(2))
+            name = _bound_field(text, match.start(), match.end(), value, percent)
+            bounds = list(plan.ranges.get(name, (None, None)))
+            bounds[bound] = value
+            plan.ranges[name] = tuple(bounds)
+
+    risk = _RISK.search(text)
+    if risk:
+        plan.risk = "medium" if risk.group(1) == "moderate" else risk.group(1)
+    for word, category in _CATEGORIES.items():
+        if word in text:
+            plan.category = category
+    for city, country in locations or []:
+        for name in (city, country):
+            if name and re.search(r"\b" + re.escape(name) + r"\b", text) and name not in plan.markets:
+                plan.markets.append(name)
+
+    if _OPEN_ENDED.search(text):
+        return plan
+
+    named = _field_in(re.sub(r"\b(?:under|below|over|above|between|less than|more than|at least|at most)\s+"
+                             r"\$?\s*\d[\d,.]*\s*\w*", "", text))
+    if _HOW_MANY.search(text):
+        plan.intent = "count"
+        return plan
+    if _AVERAGE.search(text) or _MEDIAN.search(text):
+        plan.intent = "aggregate"
+        plan.measure = named or "capRate"
+        plan.statistic = "median" if _MEDIAN.search(text) else "mean"
+        return plan
+
+    count = _TOP.search(text) or _COUNT_FIRST.search(text)
+    has_filters = bool(plan.ranges or plan.markets or plan.category or plan.risk)
+    if not (count or _RANKING.search(text) or has_filters):
+        return plan
+
+    plan.intent = "top"
+    if count:
+        value = count.group(1)
+        plan.limit = min(MAX_TOP_N, max(1, int(value) if value.isdigit() else _NUMBER_WORDS[value]))
+    plan.measure = named or "score"
+    if re.search(r"\b(cheapest|lowest price|least expensive|most affordable)\b", text):
+        plan.measure, plan.descending = "price", False
+    elif re.search(r"\b(lowest|worst|smallest)\b", text):
+        plan.descending = False
+    elif plan.measure == "price":
+        # "price over 2 million" asks for the expensive end, so a lone lower bound sorts descending
+        low, high = plan.ranges.get("price", (None, None))
+        plan.descending = bool(re.search(r"\b(most expensive|priciest|highest|largest|biggest)\b", text)) \
+            or (low is not None and high is None)
+    return plan
+
+
+def _money(value: Any) -> str:
+    return f"${value:,.0f}" if isinstance(value, (int, float)) else "n/a"
+
+
+def _percent(value: Any) -> str:
+    return f"{value:.2f}%" if isinstance(value, (int, float)) else "n/a"
+
+
+def describe_filters(plan: QueryPlan) -> str:
+    parts = []
+    if plan.markets:
+        parts.append("in " + " or ".join(name.title() if name.islower() else name for name in plan.markets))
+    for name, (low, high) in plan.ranges.items():
+        show = _money if name == "price" else _percent if name != "score" else (lambda v: f"{v:g}")
+        label = FIELD_LABELS[name]
+        if low is not None and high is not None:
+            parts.append(f"with {label} between {show(low)} and {show(high)}")
+        elif low is not None:
+            parts.append(f"with {label} of at least {show(low)}")
+        elif high is not None:
+            parts.append(f"with {label} of at most {show(high)}")
+    if plan.risk:
+        parts.append(f"at {plan.risk} risk")
+    if plan.category:
+        parts.append(f"in the {plan.category.replace('_', ' ')} category")
+    return (" " + ", ".join(parts)) if parts else ""
+
+
+def format_deal(deal: Dict[str, Any]) -> str:
+    location = ", ".join(str(deal[key]) for key in ("city", "country") if deal.get(key))
+    return (f"• {deal.get('title') or deal.get('id')}" + (f" ({location})" if location else "")
+            + f" — cap rate {_percent(deal.get('capRate'))}, discount {_percent(deal.get('discountPct'))}, "
+            f"score {deal.get('score', 0):.0f}, price {_money(deal.get('price'))}")
+
+
+class ChatAssistant:
+    """Answers chat messages about the deals in a ``deals_service.DealStore``.
+
+    Top-N, filter, count and average questions are planned into store
+    queries and answered locally. Open-ended questions go to the LLM with a
+    short context: the best few deals matching whatever filters the message
+    did name, trimmed to the fields an answer needs.
+    """
+
+    def __init__(self, store, groq_service=None):
+        self.store = store
+        self.groq_service = groq_service
+
+    @property
+    def locations(self) -> List[Tuple[str, str]]:
+        return [tuple(value.split("\x00")) for value in self.store.location.values]
+
+    def plan(self, message: str) -> QueryPlan:
+        return plan_query(message, self.locations)
+
+    def answer_locally(self, plan: QueryPlan) -> Tuple[str, int]:
+        """Response text and the number of deals it covers"""
+        where = describe_filters(plan)
+        if plan.intent == "count":
+            total = len(self.store.matches(**plan.filters()))
+            return f"There {'is' if total == 1 else 'are'} {total:,} deal{'s' if total != 1 else ''}{where}.", total
+
+        if plan.intent == "aggregate":
+            matched = self.store.matches(**plan.filters())
+            values = self.store.columns[plan.measure][matched]
+            values = values[np.isfinite(values)]
+            label = FIELD_LABELS[plan.measure]
+            if not len(values):
+                return f"No deals{where} have a {label}.", 0
+            value = float(np.median(values) if plan.statistic == "median" else values.mean())
+            shown = _money(value) if plan.measure == "price" else f"{value:.1f}" if plan.measure == "score" \
+                else _percent(value)
+            return (f"The {'median' if plan.statistic == 'median' else 'average'} {label} across "
+                    f"{len(values):,} deals{where} is {shown}."), len(values)
+
+        deals, total = self.store.top(plan.measure, plan.descending, plan.limit, **plan.filters())
+        if not deals:
+            return f"No deals match{where or ' your question'}.", 0
+        direction = "highest" if plan.descending else "lowest"
+        heading = f"Top {len(deals)} deals by {direction} {FIELD_LABELS[plan.measure]}{where}"
+        if total > len(deals):
+            heading += f" (of {total:,} matching)"
+        return heading + ":\n" + "\n".join(format_deal(deal) for deal in deals), total
+
+    def context_deals(self, plan: QueryPlan) -> List[Dict[str, Any]]:
+        """Best deals matching the message's filters, with only the fields an answer needs"""
+        deals, _ = self.store.query("score", CONTEXT_DEALS, 0, **plan.filters())
+        return [
+            {key: round(deal[key], 2) if isinstance(deal.get(key), float) else deal[key]
+             for key in CONTEXT_FIELDS if deal.get(key) is not None}
+            for deal in deals
+        ]
+
+    def answer(self, message: str) -> Dict[str, Any]:
+        """Body of a POST /api/chat response"""
+        plan = self.plan(message)
+        body = {"intent": plan.intent, "timestamp": datetime.now().isoformat()}
+        if plan.intent != "open":
+            response, count = self.answer_locally(plan)
+            return {"response": response, "dealsCount": count, "source": "local", **body}
+
+        if self.groq_service is None:
+            return {"error": "AI assistant is disabled. Please configure GROQ_API_KEY in your environment variables.",
+                    "disabled": True, **body}
+        deals = self.context_deals(plan)
+        system = (
+            "You are a real estate investment analyst assistant. Answer from these deals only, citing "
+            "property titles and cities, in concise bullet points with specific numbers.\n\n"
+            f"DEALS:\n{json.dumps(deals, separators=(',', ':'))}"
+        )
+        completion = self.groq_service.send_chat_completion([
+            {"role": "system", "content": system},
+            {"role": "user", "content": message}
+        ])
+        try:
+            response = completion["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            response = completion.get("content") if isinstance(completion, dict) else None
+        return {"response": response or "Sorry, I could not generate a response.", "dealsCount": len(deals),
+                "source": "llm", **body}
@@ -29,11 +29,26 @@ class Config:
     
     # Analysis Configuration
     DEFAULT_DOWN_PAYMENT_PERCENT = float(os.getenv("DEFAULT_DOWN_PAYMENT_PERCENT", "20.0"))
+    DEFAULT_INTEREST_RATE = float(os.getenv("DEFAULT_INTEREST_RATE", "7.0"))
+    DEFAULT_AMORTIZATION_YEARS = int(os.getenv("DEFAULT_AMORTIZATION_YEARS", "30"))
+    
+    # Cash-Flow Projection Configuration
+    HOLD_PERIOD_YEARS = int(os.getenv("HOLD_PERIOD_YEARS", "10"))
+    RENT_GROWTH_PERCENT = float(os.getenv("RENT_GROWTH_PERCENT", "3.0"))
+    EXPENSE_GROWTH_PERCENT = float(os.getenv("EXPENSE_GROWTH_PERCENT", "3.0"))
+    SELLING_COST_PERCENT = float(os.getenv("SELLING_COST_PERCENT", "3.0"))
+    DISCOUNT_RATE_PERCENT = float(os.getenv("DISCOUNT_RATE_PERCENT", "8.0"))
+    
+    # Worker Pool Configuration
+    ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 4)))
+    ANALYSIS_CHUNK_SIZE = int(os.getenv("ANALYSIS_CHUNK_SIZE", "25"))
     
     # File Paths
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", ".")
     ANALYSIS_FILE = os.path.join(OUTPUT_DIR, "real_estate_analysis.json")
     CSV_FILE = os.path.join(OUTPUT_DIR, "real_estate_analysis.csv")
+    DEALS_SNAPSHOT_FILE = os.path.join(OUTPUT_DIR, "deals.snapshot")
+    HISTORY_DB = os.getenv("HISTORY_DB", os.path.join(OUTPUT_DIR, "analysis_history.db"))
     
     # Dashboard Configuration
     DASHBOARD_PORT = int(os.getenv("DASHBOARD_PORT", "8501"))
@@ -61,6 +76,7 @@ class Config:
         print(f"   Preferred Models: {len(cls.PREFERRED_MODELS)} models")
         print(f"   Max Retries: {cls.MAX_RETRIES}")
         print(f"   Base Delay: {cls.BASE_DELAY}s")
+        print(f"   Analysis Workers: {cls.ANALYSIS_WORKERS} (chunk size {cls.ANALYSIS_CHUNK_SIZE})")
         print(f"   Output Directory: {cls.OUTPUT_DIR}")
         print(f"   Dashboard Port: {cls.DASHBOARD_PORT}")
 
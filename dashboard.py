@@ -9,9 +9,29 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import heapq
 import json
 from datetime import datetime
 import os
+import tempfile
+
+from analysis_worker import AnalysisWorkerPool
+from config import Config
+from data_export import (
+    COMPRESSIONS,
+    EXPORT_FORMATS,
+    MIME_TYPES,
+    export_file_name,
+    preview_rows,
+    select_rows,
+    write_export,
+)
+from market_stats import MarketAggregates
+from property_index import PropertyIndex
+from summary_cube import build_summary_cube, distribution, ensure_dimensions
+
+EXPORT_PREVIEW_ROWS = 50
+PROPERTY_SEARCH_LIMIT = 25
 
 # Page configuration
 st.set_page_config(
@@ -53,13 +73,39 @@ def load_analysis_data():
     try:
         if os.path.exists("real_estate_analysis.json"):
             with open("real_estate_analysis.json", "r") as f:
-                return json.load(f)
+                data = json.load(f)
+            return prepare_summary(data)
         else:
             return None
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+@st.cache_resource
+def get_property_index(timestamp, _rows):
+    """Build the property lookup index once per analysis run"""
+    return PropertyIndex(_rows)
+
+def prepare_summary(data):
+    """Make sure the summary cube and complete distributions are available.
+
+    Files written by older engine versions have no cube, so it is built once
+    here; summary pages then read aggregates instead of scanning rows.
+    """
+    summary = data.setdefault('summary', {})
+    if 'cube' not in summary:
+        for row in data.get('analysis_results', []):
+            ensure_dimensions(row)
+        summary['cube'] = build_summary_cube(data.get('analysis_results', []))
+    
+    cube = summary['cube']
+    summary['risk_distribution'] = distribution(cube, 'risk_level')
+    summary['market_position_distribution'] = distribution(cube, 'market_position')
+    summary['category_distribution'] = distribution(cube, 'category')
+    if 'market_stats' not in summary:
+        summary['market_stats'] = MarketAggregates.from_rows(data.get('analysis_results', [])).to_dict()
+    return data
+
 def create_summary_metrics(data):
     """Create summary metric cards"""
     if not data:
@@ -150,7 +196,7 @@ def create_risk_analysis(data):
     risk_dist = data['summary']['risk_distribution']
     
     fig = go.Figure(data=[go.Pie(
-        labels=list(risk_dist.keys()),
+        labels=[risk.title() for risk in risk_dist.keys()],
         values=list(risk_dist.values()),
         hole=0.3,
         marker_colors=['#00ff00', '#ffff00', '#ff0000']
@@ -163,6 +209,27 @@ def create_risk_analysis(data):
     
     st.plotly_chart(fig, use_container_width=True)
 
+def create_market_table(data):
+    """Markets ranked by median cap rate, read from the precomputed market stats"""
+    market_stats = data['summary']['market_stats']
+    if not market_stats:
+        return
+    
+    st.subheader("🌍 Markets")
+    rows = [
+        {
+            'Market': market,
+            'Properties': stats['count'],
+            'Median Cap Rate (%)': stats['cap_rate']['median'],
+            'Cap Rate Std (%)': stats['cap_rate']['std'],
+            'Median Price ($)': stats['purchase_price']['median'],
+            'Average Score': stats['score']['mean'],
+        }
+        for market, stats in market_stats.items()
+    ]
+    rows.sort(key=lambda row: row['Median Cap Rate (%)'] or 0.0, reverse=True)
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
 def create_property_table(data):
     """Create detailed property analysis table"""
     if not data:
@@ -189,14 +256,10 @@ def create_recommendations_section(data):
     
     st.subheader("🎯 Investment Recommendations")
     
-    # Sort by score (highest first)
-    sorted_results = sorted(
-        data['analysis_results'],
-        key=lambda x: x['score'],
-        reverse=True
-    )
+    # Top 3 by score without sorting the whole book
+    top_results = heapq.nlargest(3, data['analysis_results'], key=lambda x: x['score'])
     
-    for i, result in enumerate(sorted_results[:3]):  # Top 3 recommendations
+    for i, result in enumerate(top_results):
         with st.container():
             col1, col2 = st.columns([1, 3])
             
@@ -209,6 +272,151 @@ def create_recommendations_section(data):
                 if 'ai_insights' in result and result['ai_insights']:
                     st.markdown(f"*{result['ai_insights']}*")
 
+def build_export_file(data, fmt, compression, columns, filters):
+    """Stream the export to a temporary file, reusing it while the options are unchanged"""
+    options_key = (data['timestamp'], fmt, compression, tuple(columns), repr(sorted(filters.items())))
+    cached = st.session_state.get('export_file')
+    if cached and cached['key'] == options_key and os.path.exists(cached['path']):
+        return cached['path']
+    
+    if cached and os.path.exists(cached['path']):
+        os.remove(cached['path'])
+    
+    with tempfile.NamedTemporaryFile(delete=False, prefix="real_estate_export_") as f:
+        write_export(f, data['analysis_results'], fmt=fmt, compression=compression,
+                     columns=columns, filters=filters)
+    st.session_state['export_file'] = {'key': options_key, 'path': f.name}
+    return f.name
+
+def create_export_section(data):
+    """Create export options, a single-click download and a bounded preview"""
+    rows = data['analysis_results']
+    if not rows:
+        st.info("No analysis results to export.")
+        return
+    
+    st.subheader("Export Options")
+    
+    all_columns = list(rows[0].keys())
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fmt = st.selectbox("Format", EXPORT_FORMATS, format_func=str.upper)
+        compression = st.selectbox(
+            "Compression",
+            COMPRESSIONS,
+            help="For Parquet this selects the internal column codec."
+        )
+    
+    with col2:
+        columns = st.multiselect("Columns", all_columns, default=all_columns)
+        risk_levels = st.multiselect(
+            "Risk levels",
+            list(data['summary']['risk_distribution'].keys()),
+            default=list(data['summary']['risk_distribution'].keys())
+        )
+        min_score = st.slider("Minimum score", 0, 100, 0)
+    
+    filters = {'risk_level': set(risk_levels)}
+    if min_score > 0:
+        filters['score'] = (min_score, None)
+    
+    try:
+        path = build_export_file(data, fmt, compression, columns, filters)
+    except ImportError as e:
+        st.error(str(e))
+        return
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+        return
+    
+    base_name = f"real_estate_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    with open(path, "rb") as f:
+        st.download_button(
+            label=f"Download {fmt.upper()} ({os.path.getsize(path) / 1024:,.1f} KB)",
+            data=f,
+            file_name=export_file_name(base_name, fmt, compression),
+            mime=MIME_TYPES[fmt] if compression == "none" or fmt == "parquet" else "application/octet-stream"
+        )
+    
+    # Data preview
+    st.subheader("Data Preview")
+    st.caption(f"First {EXPORT_PREVIEW_ROWS} matching rows")
+    preview = preview_rows(select_rows(rows, columns, filters), EXPORT_PREVIEW_ROWS)
+    st.dataframe(pd.DataFrame(preview), use_container_width=True, hide_index=True)
+    
+    with st.expander("Summary"):
+        st.json({key: value for key, value in data['summary'].items() if key != 'cube'})
+
+@st.cache_resource
+def get_worker_pool():
+    """One background worker pool shared by all dashboard sessions"""
+    return AnalysisWorkerPool(history_path=Config.HISTORY_DB)
+
+def create_run_analysis_section():
+    """Submit analysis jobs to the background pool and show their progress"""
+    pool = get_worker_pool()
+    
+    st.subheader("New Analysis Job")
+    source = st.radio("Properties", ["Sample portfolio", "Upload JSON"], horizontal=True)
+    uploaded = None
+    if source == "Upload JSON":
+        uploaded = st.file_uploader(
+            "JSON list of properties (id, address, purchase_price, annual_rent, operating_expenses, market_cap_rate)",
+            type=["json"]
+        )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        use_ai = st.checkbox("Use AI recommendations", value=True)
+    with col2:
+        chunk_size = st.number_input("Chunk size", min_value=1, value=Config.ANALYSIS_CHUNK_SIZE, step=5)
+    
+    if st.button("Start Analysis", type="primary"):
+        try:
+            from real_estate_ai_engine import properties_from_records, sample_properties
+            
+            if source == "Upload JSON":
+                if uploaded is None:
+                    st.warning("Upload a properties file first.")
+                    return
+                properties = properties_from_records(json.load(uploaded))
+            else:
+                properties = sample_properties()
+            
+            job_id = pool.submit(
+                properties,
+                chunk_size=int(chunk_size),
+                output_path="real_estate_analysis.json",
+                use_ai=use_ai
+            )
+            st.success(f"Job {job_id} submitted with {len(properties)} properties.")
+        except (ValueError, TypeError) as e:
+            st.error(f"Could not start analysis: {e}")
+    
+    st.subheader("Jobs")
+    st.button("Refresh progress")
+    
+    jobs = pool.jobs()
+    if not jobs:
+        st.info("No analysis jobs yet.")
+        return
+    
+    for job in jobs:
+        eta = f"{job.eta_seconds:.0f}s" if job.eta_seconds is not None else "n/a"
+        st.markdown(f"**{job.job_id}** - {job.status.title()}")
+        st.progress(
+            job.percent_complete / 100,
+            text=f"{job.completed_chunks}/{job.total_chunks} chunks · "
+                 f"{job.throughput:.1f} properties/s · ETA {eta}"
+        )
+        if job.error:
+            st.error(job.error)
+        elif job.processed_properties:
+            leaders = ", ".join(f"#{entry['rank']} {entry['property_id']} ({entry['cap_rate']:.2f}%)"
+                                for entry in pool.top(job.job_id, 3))
+            st.caption(f"Leaders so far: {leaders}")
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🏠 Real Estate AI Investment System</h1>', unsafe_allow_html=True)
@@ -217,9 +425,14 @@ def main():
     st.sidebar.title("Navigation")
     page = st.sidebar.selectbox(
         "Choose a page",
-        ["Dashboard", "Property Analysis", "AI Insights", "Data Export"]
+        ["Dashboard", "Property Analysis", "AI Insights", "Data Export", "Run Analysis"]
     )
     
+    if page == "Run Analysis":
+        st.header("🚀 Run Analysis")
+        create_run_analysis_section()
+        return
+    
     # Load data
     data = load_analysis_data()
     
@@ -251,15 +464,16 @@ def main():
         
         with col2:
             st.subheader("📊 Market Position Analysis")
-            df = pd.DataFrame(data['analysis_results'])
-            market_pos_counts = df['market_position'].value_counts()
+            market_pos_counts = data['summary']['market_position_distribution']
             
             fig = px.pie(
-                values=market_pos_counts.values,
-                names=market_pos_counts.index,
+                values=list(market_pos_counts.values()),
+                names=[pos.replace('_', ' ').title() for pos in market_pos_counts.keys()],
                 title="Market Position Distribution"
             )
             st.plotly_chart(fig, use_container_width=True)
+        
+        create_market_table(data)
     
     elif page == "Property Analysis":
         st.header("🏠 Property Analysis")
@@ -268,16 +482,20 @@ def main():
         
         # Property details
         st.subheader("🔍 Property Details")
+        property_index = get_property_index(data['timestamp'], data['analysis_results'])
+        query = st.text_input("Search by property ID or address:")
+        matches = property_index.search(query, PROPERTY_SEARCH_LIMIT)
+        if not matches:
+            st.info("No matching properties.")
+        
         selected_property = st.selectbox(
             "Select a property for detailed analysis:",
-            [prop['property_id'] for prop in data['analysis_results']]
+            [prop['property_id'] for prop in matches],
+            format_func=lambda pid: f"{pid} - {property_index.get(pid).get('address', '')}"
         )
         
         if selected_property:
-            prop_data = next(
-                prop for prop in data['analysis_results'] 
-                if prop['property_id'] == selected_property
-            )
+            prop_data = property_index.get(selected_property)
             
             col1, col2 = st.columns(2)
             
@@ -287,7 +505,7 @@ def main():
                 st.metric("Risk Level", prop_data['risk_level'].title())
             
             with col2:
-                st.metric("Market Position", prop_data['market_position'].title())
+                st.metric("Market Position", prop_data['market_position'].replace('_', ' ').title())
                 st.metric("Rank", f"#{prop_data['rank']}")
                 st.metric("NOI", f"${prop_data['noi']:,.2f}")
             
@@ -331,32 +549,7 @@ def main():
     elif page == "Data Export":
         st.header("📤 Data Export")
         
-        st.subheader("Export Options")
-        
-        # JSON export
-        if st.button("Download JSON Data"):
-            json_str = json.dumps(data, indent=2)
-            st.download_button(
-                label="Download JSON",
-                data=json_str,
-                file_name=f"real_estate_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
-            )
-        
-        # CSV export
-        if st.button("Download CSV Data"):
-            df = pd.DataFrame(data['analysis_results'])
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"real_estate_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
-        
-        # Data preview
-        st.subheader("Data Preview")
-        st.json(data)
+        create_export_section(data)
 
 if __name__ == "__main__":
     main()
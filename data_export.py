@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Streaming data export for Real Estate AI Investment System
+Chunked JSONL, CSV and Parquet writers with optional gzip/zstd compression
+"""
+
+import csv
+import io
+import json
+import zlib
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+EXPORT_FORMATS = ("jsonl", "csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+FILE_EXTENSIONS = {"jsonl": ".jsonl", "csv": ".csv", "parquet": ".parquet"}
+COMPRESSION_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+MIME_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Analysis row columns holding text or flags; Parquet types every other column from its values
+TEXT_COLUMNS = frozenset({
+    "property_id", "address", "recommendation", "risk_level", "market_position", "category",
+    "market_id", "city", "country", "duplicate_of", "ai_insights",
+})
+FLAG_COLUMNS = frozenset({"outlier"})
+
+
+def _matches(value: Any, condition: Any) -> bool:
+    if isinstance(condition, tuple):
+        low, high = condition
+        if value is None:
+            return False
+        return (low is None or value >= low) and (high is None or value <= high)
+    return value in condition
+
+
+def select_rows(rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None,
+                filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Apply filters and column selection lazily, row by row.
+
+    ``filters`` maps a column to either a collection of allowed values or a
+    ``(low, high)`` tuple for an inclusive range (``None`` leaves a side open).
+    """
+    filters = filters or {}
+    for row in rows:
+        if all(_matches(row.get(column), condition) for column, condition in filters.items()):
+            yield {column: row.get(column) for column in columns} if columns else row
+
+
+def preview_rows(rows: Iterable[Dict[str, Any]], limit: int = 50) -> List[Dict[str, Any]]:
+    """First ``limit`` rows only, without touching the rest"""
+    return list(islice(rows, limit))
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield JSON Lines, one encoded chunk at a time"""
+    for chunk in _chunks(rows, chunk_size):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in chunk).encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield CSV, one encoded chunk at a time.
+
+    Without explicit ``columns`` the header is taken from the first row, so
+    an export without rows or columns is empty; with ``columns`` it is at
+    least the header. Nested values are written as JSON.
+    """
+    header = list(columns) if columns else None
+    header_written = False
+    if header is not None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(header)
+        yield buffer.getvalue().encode("utf-8")
+        header_written = True
+    for chunk in _chunks(rows, chunk_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            header = header or list(chunk[0].keys())
+            writer.writerow(header)
+            header_written = True
+        for row in chunk:
+            writer.writerow([
+                json.dumps(value) if isinstance(value, (dict, list)) else value
+                for value in (row.get(column) for column in header)
+            ])
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.pending = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.pending.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending = []
+        return data
+
+
+def _parquet_kind(name: str, values: Sequence[Any]) -> str:
+    """Parquet type of a column: known text and flag columns, else from the first row group.
+
+    Numbers are always float64, so an integer first row group cannot
+    truncate later fractional values, and a column with no values yet is
+    numeric.
+    """
+    if name in TEXT_COLUMNS:
+        return "string"
+    if name in FLAG_COLUMNS:
+        return "bool"
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, bool) for value in present):
+        return "bool"
+    if all(isinstance(value, (int, float)) for value in present):
+        return "float64"
+    return "string"
+
+
+def _parquet_value(kind: str, name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "float64":
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"Column {name!r} is numeric in this export but holds {value!r}")
+        return float(value)
+    if kind == "bool":
+        return bool(value)
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, compression: str = "none") -> Iterator[bytes]:
+    """Yield a Parquet file one row group at a time.
+
+    Requires ``pyarrow``. Compression is applied by Parquet itself per column
+    chunk, so ``compression`` selects the Parquet codec here. The schema is
+    fixed before the first row group is written (see ``_parquet_kind``) and
+    every value is converted to it; an export without rows is still a
+    valid, empty Parquet file.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+
+    types = {"float64": pa.float64(), "bool": pa.bool_(), "string": pa.string()}
+    sink = _ChunkSink()
+    writer = None
+    names = list(columns) if columns else None
+    kinds: List[str] = []
+    codec = "none" if compression == "none" else compression
+    for chunk in _chunks(rows, chunk_size):
+        if writer is None:
+            names = names or list(chunk[0].keys())
+            kinds = [_parquet_kind(name, [row.get(name) for row in chunk]) for name in names]
+            schema = pa.schema([(name, types[kind]) for name, kind in zip(names, kinds)])
+            writer = pq.ParquetWriter(sink, schema, compression=codec)
+        arrays = [
+            pa.array([_parquet_value(kind, name, row.get(name)) for row in chunk], type=types[kind])
+            for name, kind in zip(names, kinds)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+        yield sink.drain()
+
+    if writer is None:
+        names = names or []
+        schema = pa.schema([(name, types[_parquet_kind(name, [])]) for name in names])
+        writer = pq.ParquetWriter(sink, schema, compression=codec)
+    writer.close()
+    yield sink.drain()
+
+
+def compress_chunks(chunks: Iterable[bytes], compression: str = "none") -> Iterator[bytes]:
+    """Stream-compress byte chunks with gzip or zstd"""
+    if compression == "none":
+        yield from chunks
+        return
+
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+        compressor = zstandard.ZstdCompressor().compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+
+def iter_export(rows: Iterable[Dict[str, Any]], fmt: str = "jsonl", compression: str = "none",
+                columns: Optional[Sequence[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Filter, project, serialize and compress rows as a stream of byte chunks"""
+    selected = select_rows(rows, columns, filters)
+
+    if fmt == "jsonl":
+        return compress_chunks(iter_jsonl(selected, chunk_size), compression)
+    elif fmt == "csv":
+        return compress_chunks(iter_csv(selected, columns, chunk_size), compression)
+    elif fmt == "parquet":
+        return iter_parquet(selected, columns, chunk_size, compression)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def write_export(fileobj: BinaryIO, rows: Iterable[Dict[str, Any]], **options) -> int:
+    """Write an export to an open binary file, returning the number of bytes written"""
+    written = 0
+    for chunk in iter_export(rows, **options):
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_file_name(base_name: str, fmt: str, compression: str = "none") -> str:
+    """File name with the extension matching format and compression"""
+    if fmt == "parquet":
+        return base_name + FILE_EXTENSIONS[fmt]
+    return base_name + FILE_EXTENSIONS[fmt] + COMPRESSION_EXTENSIONS[compression]
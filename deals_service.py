@@ -0,0 +1,771 @@
+#!/usr/bin/env python3
+"""
+Deals service for Real Estate AI Investment System
+Serves /api/deals from columnar indexes, with pre-sorted orders for sorting and range filters
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from chat_query_planner import ChatAssistant
+from config import Config
+from fair_value import ComparableSet
+from filter_compiler import And, BitmapIndex, Markets, OneOf, Predicate, compile_filter, contains, popcount, positions
+from micro_batcher import estimate_batcher
+from snapshot import (
+    KeyIndex,
+    LazyRecords,
+    Snapshot,
+    SnapshotFormatError,
+    encode_keys,
+    encode_records,
+    write_snapshot,
+)
+from versioned_store import StaleVersionError, VersionedStore, new_epoch
+
+logger = logging.getLogger(__name__)
+
+# Market cap rate assumed when a deal has none (percent), as in src/app/api/deals/route.ts
+DEFAULT_MARKET_CAP_RATE = 7.5
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+DEFAULT_PORT = 3002
+
+# Sort name -> (field, descending), following the deals route
+SORTS = {
+    "price": ("price", False),
+    "priceDesc": ("price", True),
+    "score": ("score", True),
+    "capRate": ("capRate", True),
+    "discount": ("discountPct", True),
+    "discountPct": ("discountPct", True),
+}
+
+RANGE_FIELDS = ("price", "score", "capRate", "discountPct")
+
+CODED_FIELDS = ("category", "risk", "location", "market_id", "status", "currency")
+
+SNAPSHOT_KIND = "deals"
+
+# Arrays a deals snapshot holds; bumped when DealStore adds or changes an index
+SNAPSHOT_LAYOUT = 2
+
+# Query parameter -> (field, bound)
+RANGE_PARAMS = {
+    "minPrice": ("price", 0),
+    "maxPrice": ("price", 1),
+    "capRateMin": ("capRate", 0),
+    "capRateMax": ("capRate", 1),
+    "scoreMin": ("score", 0),
+    "discountMin": ("discountPct", 0),
+}
+
+
+def enrich_deal(deal: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill cap rate, discount, estimated value and market cap rate like the deals route"""
+    enriched = dict(deal)
+    price, noi = enriched.get("price"), enriched.get("noi")
+    if not enriched.get("capRate") and noi and price:
+        enriched["capRate"] = noi / price * 100
+    if not enriched.get("discountPct") and enriched.get("aiEstimatedValue") and price:
+        estimated = enriched["aiEstimatedValue"]
+        enriched["discountPct"] = (estimated - price) / estimated * 100
+    if not enriched.get("aiEstimatedValue") and noi:
+        enriched["aiEstimatedValue"] = noi / ((enriched.get("marketCapRate") or DEFAULT_MARKET_CAP_RATE) / 100)
+    if not enriched.get("marketCapRate"):
+        enriched["marketCapRate"] = DEFAULT_MARKET_CAP_RATE
+    return enriched
+
+
+def deal_score(deal: Dict[str, Any], year: Optional[int] = None) -> float:
+    """0-100 deal score of the deals route: discount, cap rate, spread, risk and age"""
+    score = 0.0
+    discount, cap_rate, market_cap = deal.get("discountPct"), deal.get("capRate"), deal.get("marketCapRate")
+    if discount:
+        score += min(40, max(0, discount * 2))
+    if cap_rate:
+        score += min(30, max(0, (cap_rate - 4) * 3))
+    if cap_rate and market_cap:
+        score += min(20, max(0, (cap_rate - market_cap) * 10))
+    score += {"low": 10, "medium": 6, "high": 2}.get(deal.get("risk"), 0)
+    if deal.get("yearBuilt"):
+        age = (year or datetime.now().year) - deal["yearBuilt"]
+        score += 5 if age < 5 else 3 if age < 15 else 1 if age < 30 else 0
+    return min(100.0, max(0.0, score))
+
+
+def scored_deal(deal: Dict[str, Any], year: Optional[int] = None) -> Dict[str, Any]:
+    """Enriched deal with its route score, as served"""
+    enriched = enrich_deal(deal)
+    enriched["score"] = deal_score(enriched, year)
+    return enriched
+
+
+def deal_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Deal-schema record (``src/types/property.ts``) for an engine analysis row"""
+    price = row.get("purchase_price")
+    if not price and row.get("noi") and row.get("cap_rate"):
+        price = row["noi"] / row["cap_rate"] * 100
+    market_cap_rate = row.get("market_cap_rate")
+    deal = {
+        "id": row["property_id"],
+        "title": row.get("address") or row["property_id"],
+        "address": row.get("address", ""),
+        "city": row.get("city", ""),
+        "country": row.get("country", ""),
+        "marketId": row.get("market_id") or None,
+        "lat": row.get("lat"),
+        "lng": row.get("lng"),
+        "price": price,
+        "noi": row.get("noi"),
+        "capRate": row.get("cap_rate"),
+        "marketCapRate": market_cap_rate * 100 if market_cap_rate else None,
+        "aiEstimatedValue": row.get("estimated_value"),
+        "discountPct": row.get("discount_pct"),
+        "risk": row.get("risk_level", "medium"),
+        "category": row.get("category", "cap_rate_arbitrage"),
+    }
+    return {key: value for key, value in deal.items() if value is not None}
+
+
+def _column(deals: Sequence[Dict[str, Any]], field: str) -> np.ndarray:
+    values = np.array([deal.get(field) if deal.get(field) is not None else np.nan for deal in deals],
+                      dtype=np.float64)
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+class _CodedColumn:
+    """Categorical column with each value's positions stored contiguously"""
+
+    def __init__(self, values: Sequence[Any]):
+        self.values, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+        self.codes = codes.reshape(-1)
+        self._order = np.argsort(self.codes, kind="stable")
+        counts = np.bincount(self.codes, minlength=len(self.values))
+        self._ends = np.cumsum(counts)
+        self._starts = self._ends - counts
+        self.counts = counts
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"values": self.values, "codes": self.codes, "order": self._order, "counts": self.counts}
+
+    @classmethod
+    def from_arrays(cls, values: np.ndarray, codes: np.ndarray, order: np.ndarray,
+                    counts: np.ndarray) -> "_CodedColumn":
+        column = cls.__new__(cls)
+        column.values, column.codes, column._order, column.counts = values, codes, order, counts
+        column._ends = np.cumsum(counts)
+        column._starts = column._ends - counts
+        return column
+
+    def count(self, matched: np.ndarray) -> int:
+        return int(self.counts[matched].sum())
+
+    def positions(self, matched: np.ndarray) -> np.ndarray:
+        slots = np.flatnonzero(matched)
+        if len(slots) == 1:
+            return self._order[self._starts[slots[0]]:self._ends[slots[0]]]
+        return np.concatenate([self._order[self._starts[s]:self._ends[s]] for s in slots] or [np.empty(0, np.int64)])
+
+
+class _Filter:
+    """One query condition: exact candidate count, candidate positions and a vectorized check"""
+
+    def __init__(self, size: int, positions: Callable[[], np.ndarray], check: Callable[[np.ndarray], np.ndarray]):
+        self.size = size
+        self.positions = positions
+        self.check = check
+
+
+class DealStore:
+    """Deals held as columns with per-field orders built once.
+
+    Every sortable field keeps a permutation in sort order and every range
+    field its valid positions sorted by value, so a range filter is two
+    ``searchsorted`` calls and a slice. A query starts from its most
+    selective filter and checks the others on those candidates only; the
+    page is read off the sort permutation when most deals match, or
+    partitioned by precomputed sort rank when few do. An unfiltered query
+    is a slice of the permutation. Categorical fields also keep a packed
+    bitmap per value, so several categorical conditions are one bitwise
+    AND, and ``select`` evaluates any ``compile_filter`` spec the same way.
+
+    ``version`` is the ``VersionedStore`` version the deals were read at
+    and ``epoch`` the line of versions it belongs to (a fresh one when not
+    given); ``scored`` says they already went through ``scored_deal``.
+    """
+
+    def __init__(self, deals: Sequence[Dict[str, Any]], year: Optional[int] = None, version: int = 0,
+                 scored: bool = False, epoch: Optional[str] = None):
+        enriched = list(deals) if scored else [scored_deal(deal, year) for deal in deals]
+        self.deals = enriched
+        self.version = version
+        self.epoch = epoch or new_epoch()
+        self._by_id = {str(deal.get("id")): i for i, deal in enumerate(enriched)}
+        self._comps: Optional[ComparableSet] = None
+
+        self.columns = {field: _column(enriched, field) for field in RANGE_FIELDS}
+        # The route treats a zero cap rate as missing
+        cap_rate = self.columns["capRate"]
+        self.columns["capRate"] = np.where(cap_rate != 0, cap_rate, np.nan)
+
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for field, values in self.columns.items():
+            valid = np.flatnonzero(~np.isnan(values))
+            valid = valid[np.argsort(values[valid], kind="stable")]
+            self._sorted[field] = (valid, values[valid])
+
+        self._order: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._rank: Dict[Tuple[str, bool], np.ndarray] = {}
+        for field, descending in set(SORTS.values()):
+            key = np.nan_to_num(self.columns[field], nan=0.0)
+            order = np.argsort(-key if descending else key, kind="stable")
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._order[field, descending], self._rank[field, descending] = order, rank
+
+        self.category = _CodedColumn([deal.get("category", "") for deal in enriched])
+        self.risk = _CodedColumn([deal.get("risk", "") for deal in enriched])
+        self.location = _CodedColumn([
+            f"{str(deal.get('city', '')).lower()}\x00{str(deal.get('country', '')).lower()}" for deal in enriched
+        ])
+        self.market_id = _CodedColumn([deal.get("marketId") or "" for deal in enriched])
+        self.status = _CodedColumn([deal.get("status") or "" for deal in enriched])
+        self.currency = _CodedColumn([deal.get("currency") or "" for deal in enriched])
+        self.bitmaps = {name: BitmapIndex(getattr(self, name).values, getattr(self, name).codes)
+                        for name in CODED_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.deals)
+
+    def __iter__(self):
+        return iter(self.deals)
+
+    def index_arrays(self) -> Dict[str, np.ndarray]:
+        """Every column and prebuilt index as named arrays, for ``write_deal_snapshot``"""
+        arrays = {f"column/{field}": values for field, values in self.columns.items()}
+        for field, (positions, values) in self._sorted.items():
+            arrays[f"sorted/{field}/positions"], arrays[f"sorted/{field}/values"] = positions, values
+        for (field, descending), order in self._order.items():
+            direction = "desc" if descending else "asc"
+            arrays[f"order/{field}/{direction}"] = order
+            arrays[f"rank/{field}/{direction}"] = self._rank[field, descending]
+        for name in CODED_FIELDS:
+            for part, values in getattr(self, name).arrays().items():
+                arrays[f"{name}/{part}"] = values
+            if self.bitmaps[name].bitmaps is not None:
+                arrays[f"{name}/bitmaps"] = self.bitmaps[name].bitmaps
+        ids = encode_keys([deal.get("id") for deal in self.deals])
+        arrays["ids/sorted"], arrays["ids/positions"] = ids["sorted"], ids["positions"]
+        records = encode_records(self.deals)
+        arrays["records/blob"], arrays["records/offsets"] = records["blob"], records["offsets"]
+        return arrays
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "DealStore":
+        """Store over a mapped snapshot's arrays, with nothing rebuilt and deals decoded as they are read"""
+        if snapshot.meta.get("kind") != SNAPSHOT_KIND:
+            raise ValueError(f"{snapshot.path} is not a deals snapshot")
+        if snapshot.meta.get("layout", 1) != SNAPSHOT_LAYOUT:
+            raise SnapshotFormatError(
+                f"{snapshot.path} has deals layout {snapshot.meta.get('layout', 1)}; rewrite it with this build"
+            )
+        arrays = snapshot.arrays
+        store = cls.__new__(cls)
+        store.deals = LazyRecords(arrays["records/blob"], arrays["records/offsets"])
+        store.version = snapshot.meta["version"]
+        # Snapshots written before epochs were recorded get a fresh one, so no client version matches
+        store.epoch = snapshot.meta.get("epoch") or new_epoch()
+        store._by_id = KeyIndex(arrays["ids/sorted"], arrays["ids/positions"])
+        store._comps = None
+        store.columns = {field: arrays[f"column/{field}"] for field in RANGE_FIELDS}
+        store._sorted = {field: (arrays[f"sorted/{field}/positions"], arrays[f"sorted/{field}/values"])
+                         for field in RANGE_FIELDS}
+        store._order, store._rank = {}, {}
+        for field, descending in set(SORTS.values()):
+            direction = "desc" if descending else "asc"
+            store._order[field, descending] = arrays[f"order/{field}/{direction}"]
+            store._rank[field, descending] = arrays[f"rank/{field}/{direction}"]
+        for name in CODED_FIELDS:
+            setattr(store, name, _CodedColumn.from_arrays(
+                *(arrays[f"{name}/{part}"] for part in ("values", "codes", "order", "counts"))
+            ))
+        store.bitmaps = {name: BitmapIndex(arrays[f"{name}/values"], arrays[f"{name}/codes"],
+                                           arrays.get(f"{name}/bitmaps"))
+                         for name in CODED_FIELDS}
+        return store
+
+    def get(self, deal_id: str) -> Optional[Dict[str, Any]]:
+        position = self._by_id.get(deal_id)
+        return self.deals[position] if position is not None else None
+
+    @property
+    def comps(self) -> ComparableSet:
+        if self._comps is None:
+            self._comps = ComparableSet(self.deals)
+        return self._comps
+
+    def _range_filter(self, field: str, low: Optional[float], high: Optional[float]) -> _Filter:
+        positions, values = self._sorted[field]
+        start = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+        end = len(values) if high is None else int(np.searchsorted(values, high, side="right"))
+        column = self.columns[field]
+        low = -np.inf if low is None else low
+        high = np.inf if high is None else high
+        return _Filter(max(0, end - start), lambda: positions[start:end],
+                       lambda p: (column[p] >= low) & (column[p] <= high))
+
+    @staticmethod
+    def _coded_filter(column: _CodedColumn, matched: np.ndarray) -> _Filter:
+        return _Filter(column.count(matched), lambda: column.positions(matched), lambda p: matched[column.codes[p]])
+
+    def _bitmap_filter(self, predicate: Predicate) -> _Filter:
+        words = predicate.bitmap(self)
+        return _Filter(popcount(words), lambda: positions(words, len(self)), lambda p: contains(words, p))
+
+    def _filters(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+                 markets: Optional[Sequence[str]], category: Optional[str], risk: Optional[str]) -> List[_Filter]:
+        filters = [self._range_filter(field, low, high) for field, (low, high) in ranges.items()
+                   if low is not None or high is not None]
+        coded = []
+        if category:
+            coded.append((self.category, self.category.values == category, OneOf("category", [category])))
+        if risk and risk != "all":
+            coded.append((self.risk, self.risk.values == risk, OneOf("risk", [risk])))
+        if markets:
+            # Substring match on city or country, evaluated once per distinct location
+            wanted = [market.strip().lower() for market in markets]
+            matched = np.array([
+                any(market in city or market in country for market in wanted)
+                for city, country in (value.split("\x00") for value in self.location.values)
+            ], dtype=bool)
+            coded.append((self.location, matched, Markets(markets)))
+        if len(coded) > 1:
+            # Several categorical conditions become one AND of their bitmaps, with an exact count
+            filters.append(self._bitmap_filter(And(*(predicate for _, _, predicate in coded))))
+        elif coded:
+            column, matched, _ = coded[0]
+            filters.append(self._coded_filter(column, matched))
+        return filters
+
+    def matches(self, ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+                markets: Optional[Sequence[str]] = None, category: Optional[str] = None,
+                risk: Optional[str] = None) -> np.ndarray:
+        """Positions of every matching deal, in no particular order"""
+        filters = sorted(self._filters(ranges or {}, markets, category, risk), key=lambda f: f.size)
+        if not filters:
+            return np.arange(len(self.deals))
+        matched = filters[0].positions()
+        for other in filters[1:]:
+            matched = matched[other.check(matched)]
+        return matched
+
+    def select(self, where: Any) -> np.ndarray:
+        """Positions of the deals matching a ``compile_filter`` spec or compiled predicate, ascending"""
+        predicate = where if isinstance(where, Predicate) else compile_filter(where)
+        return positions(predicate.bitmap(self), len(self))
+
+    def count(self, where: Any) -> int:
+        predicate = where if isinstance(where, Predicate) else compile_filter(where)
+        return popcount(predicate.bitmap(self))
+
+    def query(self, sort: str = "score", limit: int = DEFAULT_PAGE_SIZE, offset: int = 0,
+              ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+              markets: Optional[Sequence[str]] = None, category: Optional[str] = None,
+              risk: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of matching deals in sort order, and the total match count.
+
+        ``ranges`` maps a range field to inclusive (low, high) bounds, either
+        of which may be None. Unknown sorts fall back to score, as in the route.
+        """
+        key = SORTS.get(sort, SORTS["score"])
+        order, rank = self._order[key], self._rank[key]
+        want = offset + limit
+        filters = self._filters(ranges or {}, markets, category, risk)
+        if not filters:
+            return [self.deals[p] for p in order[offset:want]], len(self.deals)
+
+        filters.sort(key=lambda f: f.size)
+        base, others = filters[0], filters[1:]
+        if not others:
+            matched, total = None, base.size
+        else:
+            matched = base.positions()
+            for other in others:
+                matched = matched[other.check(matched)]
+            total = len(matched)
+        if total == 0 or offset >= total:
+            return [], total
+
+        if total * total > want * len(order):
+            # Most deals match: walk the sort order until the page is full
+            page, step = [], max(1024, 4 * want * len(order) // total)
+            for start in range(0, len(order), step):
+                chunk = order[start:start + step]
+                for condition in filters:
+                    chunk = chunk[condition.check(chunk)]
+                page.extend(chunk.tolist())
+                if len(page) >= want:
+                    break
+            page = page[offset:want]
+        else:
+            if matched is None:
+                matched = base.positions()
+            ranks = rank[matched]
+            if want < len(matched):
+                nearest = np.argpartition(ranks, want - 1)[:want]
+                matched, ranks = matched[nearest], ranks[nearest]
+            page = matched[np.argsort(ranks, kind="stable")][offset:want].tolist()
+        return [self.deals[p] for p in page], total
+
+    def top(self, field: str, descending: bool = True, limit: int = DEFAULT_PAGE_SIZE,
+            **filters) -> Tuple[List[Dict[str, Any]], int]:
+        """Best ``limit`` matching deals by any range field, in either direction.
+
+        Uses the pre-sorted order when one exists and otherwise sorts only
+        the matches; ``filters`` are those of ``query``.
+        """
+        for sort, key in SORTS.items():
+            if key == (field, descending):
+                return self.query(sort, limit, 0, **filters)
+        matched = self.matches(**filters)
+        values = np.nan_to_num(self.columns[field][matched], nan=0.0)
+        order = np.argsort(-values if descending else values, kind="stable")[:limit]
+        return [self.deals[p] for p in matched[order]], len(matched)
+
+    def handle_query(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """Response body of GET /api/deals for parsed query parameters"""
+        sort = params.get("sort") or "score"
+        limit = min(int(params.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        offset = int(params.get("offset", 0))
+        if limit < 0 or offset < 0:
+            raise ValueError("limit and offset must be non-negative")
+
+        ranges: Dict[str, List[Optional[float]]] = {}
+        for param, (field, bound) in RANGE_PARAMS.items():
+            if params.get(param):
+                ranges.setdefault(field, [None, None])[bound] = float(params[param])
+        markets = [m.strip() for m in params["markets"].split(",")] if params.get("markets") else None
+        deals, total = self.query(sort, limit, offset, {f: tuple(b) for f, b in ranges.items()},
+                                  markets, params.get("category"), params.get("risk"))
+        return {
+            "deals": deals,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "filters": {
+                "sort": sort,
+                "minPrice": ranges.get("price", [None, None])[0],
+                "maxPrice": ranges.get("price", [None, None])[1],
+                "markets": markets,
+                "category": params.get("category"),
+                "risk": params.get("risk"),
+                "capRateMin": ranges.get("capRate", [None, None])[0],
+                "capRateMax": ranges.get("capRate", [None, None])[1],
+            }
+        }
+
+
+def _deal_snapshot(deals: List[Dict[str, Any]], version: int, epoch: str) -> DealStore:
+    return DealStore(deals, version=version, scored=True, epoch=epoch)
+
+
+def versioned_deals(deals: Sequence[Dict[str, Any]] = (), **options) -> VersionedStore:
+    """Versioned deal book whose snapshots are ``DealStore`` indexes"""
+    return VersionedStore(deals, build=_deal_snapshot, prepare=scored_deal, **options)
+
+
+def write_deal_snapshot(store: DealStore, path: str) -> int:
+    """Write ``store`` with all of its indexes as a binary snapshot; returns the file size"""
+    meta = {"kind": SNAPSHOT_KIND, "layout": SNAPSHOT_LAYOUT, "version": store.version, "epoch": store.epoch,
+            "deals": len(store),
+            "created": datetime.now().isoformat()}
+    return write_snapshot(path, store.index_arrays(), meta)
+
+
+def open_deal_snapshot(path: str) -> DealStore:
+    """Memory-map a deals snapshot; nothing is parsed or rebuilt, whatever its size"""
+    return DealStore.from_snapshot(Snapshot(path))
+
+
+def deal_etag(epoch: str, version: int) -> str:
+    return f'"deals-{epoch}-{version}"'
+
+
+def deal_since(epoch: str, version: int) -> str:
+    """``since`` token for the deals a client holds; versions only compare within one epoch"""
+    return f"{epoch}:{version}"
+
+
+def parse_since(token: str) -> Tuple[str, int]:
+    """Epoch and version of a ``since`` token; a bare version has no epoch and matches none"""
+    epoch, _, version = token.rpartition(":")
+    return epoch, int(version)
+
+
+class DealsRequestHandler(BaseHTTPRequestHandler):
+    """Deals, estimate and chat endpoints over ``server.store``, a ``VersionedStore`` of deals"""
+
+    def _send(self, status: int, body: Optional[Dict[str, Any]], etag: Optional[str] = None):
+        payload = json.dumps(body, default=float).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _not_modified(self, etag: str) -> bool:
+        """Answer 304 when the client already holds this version"""
+        tags = [tag.strip() for tag in (self.headers.get("If-None-Match") or "").split(",")]
+        if etag in tags or "*" in tags:
+            self._send(304, None, etag)
+            return True
+        return False
+
+    def _deals(self, store: VersionedStore, params: Dict[str, str]):
+        if self._not_modified(deal_etag(store.epoch, store.version)):
+            return
+        try:
+            if "since" in params:
+                epoch, since = parse_since(params["since"])
+                changes = store.changes_since(since, epoch)
+                self._send(200, changes, deal_etag(changes["epoch"], changes["version"]))
+                return
+            snapshot = store.snapshot()
+            self._send(200, {**snapshot.handle_query(params), "version": snapshot.version, "epoch": snapshot.epoch},
+                       deal_etag(snapshot.epoch, snapshot.version))
+        except StaleVersionError as e:
+            self._send(410, {"error": str(e), "version": store.version, "epoch": store.epoch})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        store: VersionedStore = self.server.store
+        if url.path == "/api/deals":
+            self._deals(store, {key: values[-1] for key, values in parse_qs(url.query).items()})
+        elif url.path == "/api/chat":
+            llm = self.server.chat.groq_service is not None
+            self._send(200, {"enabled": True, "provider": "groq" if llm else "local", "status": "ready"})
+        elif url.path.startswith("/api/deals/"):
+            deal = store.get(url.path[len("/api/deals/"):])
+            self._send(200, deal) if deal else self._send(404, {"error": "Deal not found"})
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def _json_body(self) -> Any:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            return None
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path == "/api/chat":
+            self._chat(self._json_body())
+            return
+        if path != "/api/estimate":
+            self._send(404, {"error": "Not found"})
+            return
+        record = self._json_body()
+        if not isinstance(record, dict):
+            self._send(400, {"error": "Property data is required"})
+            return
+        try:
+            self._send(200, self.server.estimate(record))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+
+    def _chat(self, body: Any):
+        message = body.get("message") if isinstance(body, dict) else None
+        if not message or not isinstance(message, str):
+            self._send(400, {"error": "Message is required and must be a string"})
+            return
+        try:
+            answer = self.server.chat.answer(message)
+        except Exception as e:
+            logger.error(f"❌ Error in chat: {e}")
+            self._send(500, {"error": "Internal server error. Please try again later."})
+            return
+        self._send(503 if answer.get("disabled") else 200, answer)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(store: DealStore, host: str = "localhost", port: int = DEFAULT_PORT,
+          groq_service=None) -> ThreadingHTTPServer:
+    """HTTP server over ``store``; call ``serve_forever`` or run it in a thread.
+
+    ``store`` is a ``DealStore`` or a ``versioned_deals`` book that can
+    change while serving. Concurrent estimate requests are micro-batched
+    into one comp pass. Chat questions the planner cannot answer locally go
+    to ``groq_service``.
+    """
+    if isinstance(store, DealStore):
+        # Served as it is until the first write, so a mapped snapshot is not read in up front
+        store = VersionedStore(base=store, build=_deal_snapshot, prepare=scored_deal)
+    server = ThreadingHTTPServer((host, port), DealsRequestHandler)
+    server.store = store
+    server.estimate = estimate_batcher(lambda: store.comps)
+    server.chat = ChatAssistant(store, groq_service)
+    return server
+
+
+def load_deals(path: str) -> List[Dict[str, Any]]:
+    """Deals from an analysis JSON file or a JSON list of deal records"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [deal_from_row(row) for row in data.get("analysis_results", [])]
+    return data
+
+
+def synthetic_deals(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Random deals in the deal schema, for benchmarks"""
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.lognormal(13, 0.6, n), -3)
+    cap_rate = rng.normal(7, 1.5, n)
+    cities = [("Mumbai", "India"), ("Austin", "USA"), ("London", "UK"), ("Dubai", "UAE"), ("Toronto", "Canada")]
+    city = rng.integers(0, len(cities), n)
+    currencies = {"India": "INR", "USA": "USD", "UK": "GBP", "UAE": "AED", "Canada": "CAD"}
+    categories = ("cap_rate_arbitrage", "mispriced", "distressed")
+    risks = ("low", "medium", "high")
+    statuses = ("new", "review", "offer", "closed")
+    return [
+        {
+            "id": f"D{i:07d}",
+            "title": f"Deal {i}",
+            "address": f"{i} Market St",
+            "city": cities[city[i]][0],
+            "country": cities[city[i]][1],
+            "marketId": cities[city[i]][0].lower(),
+            "currency": currencies[cities[city[i]][1]],
+            "price": float(price[i]),
+            "noi": float(price[i] * cap_rate[i] / 100),
+            "aiEstimatedValue": float(price[i] * (1 + rng.normal(0.05, 0.1))),
+            "risk": risks[i % 3],
+            "category": categories[i % 3 if i % 7 else 0],
+            "status": statuses[i % 5 % 4],
+        }
+        for i in range(n)
+    ]
+
+
+BENCHMARK_QUERIES = (
+    {},
+    {"sort": "price"},
+    {"sort": "capRate", "capRateMin": "8"},
+    {"maxPrice": "500000", "sort": "score"},
+    {"minPrice": "300000", "maxPrice": "320000", "sort": "discount"},
+    {"markets": "Mumbai", "category": "distressed", "risk": "low"},
+)
+
+
+def benchmark(sizes: Sequence[int] = (1_000, 10_000, 100_000, 1_000_000), repeats: int = 200,
+              queries: Sequence[Dict[str, str]] = BENCHMARK_QUERIES) -> List[Dict[str, Any]]:
+    """p50/p99 latency of ``handle_query`` plus JSON encoding, per store size"""
+    results = []
+    for n in sizes:
+        store = DealStore(synthetic_deals(n))
+        timings = []
+        for i in range(repeats * len(queries)):
+            params = queries[i % len(queries)]
+            start = time.perf_counter()
+            json.dumps(store.handle_query(params))
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1000
+        results.append({"deals": n, "p50_ms": float(np.percentile(timings, 50)),
+                        "p99_ms": float(np.percentile(timings, 99))})
+    return results
+
+
+def benchmark_startup(sizes: Sequence[int] = (10_000, 100_000, 1_000_000),
+                      directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Seconds to a first answered query when booting from JSON and from a snapshot, per store size"""
+    results = []
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        for n in sizes:
+            json_path, snapshot_path = os.path.join(tmp, "deals.json"), os.path.join(tmp, "deals.snapshot")
+            deals = synthetic_deals(n)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(deals, f)
+            write_deal_snapshot(DealStore(deals), snapshot_path)
+            del deals
+
+            start = time.perf_counter()
+            DealStore(load_deals(json_path)).handle_query({})
+            json_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            open_deal_snapshot(snapshot_path).handle_query({})
+            results.append({"deals": n, "json_s": json_seconds, "snapshot_s": time.perf_counter() - start,
+                            "snapshot_bytes": os.path.getsize(snapshot_path)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve /api/deals from the latest analysis")
+    parser.add_argument("--input", default=Config.ANALYSIS_FILE, help="Analysis JSON or deal list")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--snapshot", help="Serve a binary deals snapshot instead of parsing --input")
+    parser.add_argument("--write-snapshot", metavar="PATH", help="Write --input as a binary snapshot and exit")
+    parser.add_argument("--benchmark", action="store_true", help="Measure query latency on synthetic deals")
+    parser.add_argument("--startup", action="store_true", help="With --benchmark, measure boot time instead")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    if args.benchmark and args.startup:
+        print("⏱️  Deals service boot to first query:")
+        for row in benchmark_startup(args.sizes):
+            print(f"   {row['deals']:>9,} deals: JSON {row['json_s']:.2f} s, "
+                  f"snapshot {row['snapshot_s'] * 1000:.2f} ms ({row['snapshot_bytes'] / 1e6:,.0f} MB)")
+        return
+    if args.benchmark:
+        print("⏱️  Deals query latency (handle_query + JSON):")
+        for row in benchmark(args.sizes):
+            print(f"   {row['deals']:>9,} deals: p50 {row['p50_ms']:.2f} ms, p99 {row['p99_ms']:.2f} ms")
+        return
+    if args.write_snapshot:
+        size = write_deal_snapshot(versioned_deals(load_deals(args.input)).snapshot(), args.write_snapshot)
+        print(f"💾 Wrote {size / 1e6:,.1f} MB snapshot to {args.write_snapshot}")
+        return
+
+    groq_service = None
+    if Config.GROQ_API_KEY:
+        # The engine module reads the key at import, so it is only imported when one is set
+        from real_estate_ai_engine import GroqAIService
+        groq_service = GroqAIService(Config.GROQ_API_KEY, Config.GROQ_BASE_URL)
+
+    if args.snapshot:
+        store = open_deal_snapshot(args.snapshot)
+    else:
+        store = versioned_deals(load_deals(args.input))
+    server = serve(store, args.host, args.port, groq_service)
+    print(f"🏠 Serving {len(store)} deals on http://{args.host}:{args.port}/api/deals")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
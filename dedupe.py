@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for Real Estate AI Investment System
+Clusters scraped listings of one property with MinHash/LSH over addresses and a coordinate grid
+"""
+
+import re
+import zlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from spatial_index import KM_PER_DEGREE, haversine_km
+
+# Estimated address Jaccard similarity at which two listings are the same property
+DEFAULT_THRESHOLD = 0.5
+
+# Lower similarity accepted for listings geocoded within NEAR_KM of each other
+NEARBY_THRESHOLD = 0.3
+NEAR_KM = 0.05
+
+# Listings farther apart than this are never merged, however alike the addresses
+MAX_DISTANCE_KM = 0.5
+
+NUM_PERM = 64
+BANDS = 32
+
+SHINGLE_SIZE = 3
+
+# Addresses hashed per chunk, bounding temporary memory
+_CHUNK = 50_000
+
+ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr", "lane": "ln",
+    "court": "ct", "place": "pl", "terrace": "ter", "highway": "hwy", "parkway": "pkwy", "square": "sq",
+    "apartment": "apt", "suite": "ste", "unit": "apt", "flat": "apt", "floor": "fl", "building": "bldg",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "first": "1st", "second": "2nd", "third": "3rd", "fourth": "4th", "fifth": "5th",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ORDINAL = re.compile(r"^(\d+)(st|nd|rd|th)$")
+
+
+def normalize_address(address: str) -> str:
+    """Lower-case address with punctuation dropped and common words abbreviated"""
+    tokens = _TOKEN.findall((address or "").lower().replace("#", " apt "))
+    return " ".join(ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def address_numbers(normalized: str) -> str:
+    """House, unit and street numbers of a normalized address, order-independent.
+
+    Listings only merge when these agree, so neighbouring units whose
+    addresses differ by one digit are kept apart.
+    """
+    numbers = []
+    for token in normalized.split():
+        ordinal = _ORDINAL.match(token)
+        if ordinal:
+            numbers.append(ordinal.group(1))
+        elif token.isdigit():
+            numbers.append(token.lstrip("0") or "0")
+    return " ".join(sorted(numbers))
+
+
+def location_key(city: Optional[str], country: Optional[str]) -> str:
+    """Normalized city and country, which listings must share to merge"""
+    return "|".join(" ".join(_TOKEN.findall((part or "").lower())) for part in (city, country))
+
+
+def _shingle_codes(addresses: Sequence[str], size: int = SHINGLE_SIZE):
+    """Character shingles of every address as integers, with the address each belongs to"""
+    encoded = [a.encode("utf-8") for a in addresses]
+    lengths = np.fromiter((len(a) for a in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.int64)
+    owner = np.repeat(np.arange(len(encoded)), lengths)
+
+    positions = np.arange(len(data) - size + 1)
+    # A shingle may not run past the end of its address
+    positions = positions[owner[positions] == owner[positions + size - 1]] if len(positions) else positions
+    codes = np.zeros(len(positions), dtype=np.int64)
+    for offset in range(size):
+        codes = (codes << 8) | data[positions + offset]
+    return codes, owner[positions]
+
+
+def minhash_signatures(addresses: Sequence[str], num_perm: int = NUM_PERM, seed: int = 1) -> np.ndarray:
+    """MinHash signature of each address's character shingles, shape (n, num_perm).
+
+    Addresses shorter than one shingle get -1 in every slot and never match.
+    """
+    # Multiply-shift hashing: the high 32 bits of a * code + b for random odd a
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+    signatures = np.full((len(addresses), num_perm), -1, dtype=np.int64)
+
+    for chunk_start in range(0, len(addresses), _CHUNK):
+        chunk = addresses[chunk_start:chunk_start + _CHUNK]
+        codes, owner = _shingle_codes(chunk)
+        if not len(codes):
+            continue
+        codes = codes.astype(np.uint64)
+        owners, first = np.unique(owner, return_index=True)
+        for k in range(num_perm):
+            hashed = (a[k] * codes + b[k]) >> np.uint64(32)
+            signatures[chunk_start + owners, k] = np.minimum.reduceat(hashed, first)
+    return signatures
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return int(i)
+
+    def union(self, i: int, j: int) -> bool:
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
+        return True
+
+    def labels(self) -> np.ndarray:
+        """Root of every element, by pointer jumping until the parents stop changing"""
+        parent = self.parent
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                return grandparent
+            parent = grandparent
+
+
+def _bucket_pairs(keys: np.ndarray, valid: np.ndarray):
+    """Neighbouring rows of each group of equal keys, as candidate pairs"""
+    rows = np.flatnonzero(valid)
+    order = rows[np.argsort(keys[rows], kind="stable")]
+    same = keys[order[1:]] == keys[order[:-1]]
+    return order[:-1][same], order[1:][same]
+
+
+class ListingDeduplicator:
+    """Clusters listings that describe the same property.
+
+    Candidate pairs come from two blockings, both roughly linear in the
+    number of listings: locality-sensitive hashing of MinHash signatures
+    over normalized address shingles, split into ``bands`` bands, and a
+    coordinate grid whose cells are twice ``near_km`` across, shifted by
+    half a cell in each direction so that any two listings within
+    ``near_km`` share a cell in one of the four grids. Both blockings also
+    key on the address numbers, so units in one building stay separate, and
+    on the city and country when given, so the same street address in two
+    cities is never a candidate pair. A listing without a city is only
+    merged with others that lack one too.
+
+    A candidate pair is merged when its estimated Jaccard similarity
+    reaches ``threshold`` (``nearby_threshold`` for grid pairs within
+    ``near_km``) and, when both have coordinates, they are no more than
+    ``max_distance_km`` apart. Merges are transitive through union-find.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, nearby_threshold: float = NEARBY_THRESHOLD,
+                 near_km: float = NEAR_KM, max_distance_km: float = MAX_DISTANCE_KM,
+                 num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.nearby_threshold = nearby_threshold
+        self.near_km = near_km
+        self.max_distance_km = max_distance_km
+        self.num_perm = num_perm
+        self.bands = bands
+
+    def labels(self, addresses: Sequence[str], lat: Optional[Sequence[float]] = None,
+               lng: Optional[Sequence[float]] = None, locations: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Cluster label of each listing: the index of the first listing in its cluster.
+
+        ``locations`` are ``location_key`` values, one per listing.
+        """
+        n = len(addresses)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        normalized = [normalize_address(a) for a in addresses]
+        locations = [""] * n if locations is None else locations
+        numbers = np.array([zlib.crc32(f"{address_numbers(a)}\x00{location}".encode())
+                            for a, location in zip(normalized, locations)], dtype=np.int64)
+        signatures = minhash_signatures(normalized, self.num_perm)
+        lat = np.full(n, np.nan) if lat is None else np.asarray(lat, dtype=np.float64)
+        lng = np.full(n, np.nan) if lng is None else np.asarray(lng, dtype=np.float64)
+        located = np.isfinite(lat) & np.isfinite(lng)
+        hashed = signatures[:, 0] >= 0
+
+        sets = UnionFind(n)
+        for (left, right), threshold, max_km in (
+            (self._lsh_pairs(signatures, numbers, hashed), self.threshold, self.max_distance_km),
+            (self._grid_pairs(lat, lng, numbers, located & hashed), self.nearby_threshold, self.near_km),
+        ):
+            keep = self._similar(signatures, lat, lng, left, right, threshold, max_km)
+            for i, j in zip(left[keep].tolist(), right[keep].tolist()):
+                sets.union(i, j)
+
+        roots = sets.labels()
+        # Label clusters by their first member so labels do not depend on merge order
+        first = np.full(n, n, dtype=np.int64)
+        np.minimum.at(first, roots, np.arange(n))
+        return first[roots]
+
+    def _lsh_pairs(self, signatures, numbers, valid):
+        rows = self.num_perm // self.bands
+        weights = np.random.default_rng(2).integers(1, 1 << 62, rows + 1, dtype=np.int64).astype(np.uint64)
+        left, right = [], []
+        with np.errstate(over="ignore"):
+            for band in range(self.bands):
+                columns = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+                keys = columns @ weights[:rows] + numbers.astype(np.uint64) * weights[rows]
+                keys = keys + np.uint64(band)
+                i, j = _bucket_pairs(keys, valid)
+                left.append(i)
+                right.append(j)
+        return np.concatenate(left), np.concatenate(right)
+
+    def _grid_pairs(self, lat, lng, numbers, valid):
+        cell = 2 * self.near_km / KM_PER_DEGREE
+        # Longitude degrees shrink towards the poles, so widen the cells to match; the
+        # latitude is rounded so that neighbours almost always get the same width
+        lng_cell = cell / np.maximum(np.cos(np.radians(np.round(np.where(valid, lat, 0.0)))), 0.01)
+        left, right = [], []
+        with np.errstate(over="ignore", invalid="ignore"):
+            for lat_shift in (0.0, 0.5):
+                for lng_shift in (0.0, 0.5):
+                    row = np.floor(np.where(valid, lat, 0.0) / cell + lat_shift).astype(np.int64)
+                    column = np.floor(np.where(valid, lng, 0.0) / lng_cell + lng_shift).astype(np.int64)
+                    keys = (row * 1_000_003 + column) * 1_000_033 + numbers
+                    i, j = _bucket_pairs(keys, valid)
+                    left.append(i)
+                    right.append(j)
+        return np.concatenate(left), np.concatenate(right)
+
+    @staticmethod
+    def _similar(signatures, lat, lng, left, right, threshold, max_km) -> np.ndarray:
+        similarity = (signatures[left] == signatures[right]).mean(axis=1) if len(left) else np.zeros(0)
+        distance = haversine_km(lat[left], lng[left], lat[right], lng[right])
+        # Pairs missing a coordinate are judged on the address alone
+        return (similarity >= threshold) & ~(distance > max_km)
+
+    def clusters(self, properties: Sequence) -> List[List[int]]:
+        """Indices of each group of duplicate properties, first listing first, in input order"""
+        labels = self.labels([p.address for p in properties],
+                             [np.nan if p.lat is None else p.lat for p in properties],
+                             [np.nan if p.lng is None else p.lng for p in properties],
+                             [location_key(p.city, p.country) for p in properties])
+        groups = {}
+        for i, label in enumerate(labels.tolist()):
+            groups.setdefault(label, []).append(i)
+        return list(groups.values())
@@ -8,6 +8,16 @@ import json
 import time
 from datetime import datetime
 
+from investment_metrics import compute_metrics, row_metrics
+from monte_carlo import simulate_risk
+from portfolio_optimizer import optimize_portfolio
+from summary_cube import (
+    build_summary_cube,
+    classify_loss_probability,
+    classify_market_position,
+    distribution,
+)
+
 def print_header():
     """Print demo header"""
     print("🏠" * 60)
@@ -28,6 +38,7 @@ def demo_financial_calculations():
             "purchase_price": 500000,
             "annual_rent": 60000,
             "operating_expenses": 15000,
+            "market_cap_rate": 0.06,
             "property_type": "residential",
             "square_footage": 2000,
             "year_built": 1995
@@ -38,6 +49,7 @@ def demo_financial_calculations():
             "purchase_price": 750000,
             "annual_rent": 90000,
             "operating_expenses": 20000,
+            "market_cap_rate": 0.05,
             "property_type": "residential",
             "square_footage": 2800,
             "year_built": 2005
@@ -48,6 +60,7 @@ def demo_financial_calculations():
             "purchase_price": 350000,
             "annual_rent": 48000,
             "operating_expenses": 12000,
+            "market_cap_rate": 0.07,
             "property_type": "residential",
             "square_footage": 1800,
             "year_built": 1988
@@ -58,6 +71,7 @@ def demo_financial_calculations():
             "purchase_price": 1200000,
             "annual_rent": 144000,
             "operating_expenses": 36000,
+            "market_cap_rate": 0.045,
             "property_type": "commercial",
             "square_footage": 5000,
             "year_built": 2010
@@ -67,32 +81,41 @@ def demo_financial_calculations():
     print(f"📊 Analyzing {len(properties)} properties...")
     print()
     
-    # Calculate metrics for each property
+    # Calculate metrics for all properties at once (financing terms from Config)
+    metrics = compute_metrics(
+        [p["purchase_price"] for p in properties],
+        [p["annual_rent"] for p in properties],
+        [p["operating_expenses"] for p in properties],
+        [p["square_footage"] for p in properties]
+    )
+    
+    # Simulated risk (rent, vacancy, expenses and exit cap rate uncertainty)
+    simulation = simulate_risk(
+        [p["purchase_price"] for p in properties],
+        [p["annual_rent"] for p in properties],
+        [p["operating_expenses"] for p in properties],
+        [p["market_cap_rate"] for p in properties]
+    )
+    
     analysis_results = []
-    for prop in properties:
+    for i, prop in enumerate(properties):
         # Basic calculations
-        noi = prop["annual_rent"] - prop["operating_expenses"]
-        cap_rate = (noi / prop["purchase_price"]) * 100
-        cash_on_cash = (noi / (prop["purchase_price"] * 0.2)) * 100
-        price_per_sqft = prop["purchase_price"] / prop["square_footage"] if prop["square_footage"] else 0
+        noi = float(metrics["noi"][i])
+        cap_rate = float(metrics["cap_rate"][i])
         
         # Investment scoring (simplified)
         if cap_rate > 8.0:
             score = 90.0
             recommendation = "Strong buy - Excellent cap rate"
-            risk_level = "low"
         elif cap_rate > 6.0:
             score = 75.0
             recommendation = "Buy - Good cap rate"
-            risk_level = "low"
         elif cap_rate > 4.0:
             score = 60.0
             recommendation = "Hold - Moderate cap rate"
-            risk_level = "medium"
         else:
             score = 40.0
             recommendation = "Pass - Low cap rate"
-            risk_level = "high"
         
         result = {
             "property_id": prop["id"],
@@ -105,11 +128,14 @@ def demo_financial_calculations():
             "year_built": prop["year_built"],
             "noi": noi,
             "cap_rate": cap_rate,
-            "cash_on_cash_return": cash_on_cash,
-            "price_per_sqft": price_per_sqft,
+            **row_metrics(metrics, i),
             "score": score,
             "recommendation": recommendation,
-            "risk_level": risk_level
+            "probability_of_loss": float(simulation["probability_of_loss"][i]),
+            "irr_p50": float(simulation["irr_p50"][i]),
+            "risk_level": classify_loss_probability(simulation["probability_of_loss"][i]),
+            "market_position": classify_market_position(cap_rate, prop["market_cap_rate"]),
+            "category": "cap_rate_arbitrage"
         }
         analysis_results.append(result)
     
@@ -129,10 +155,12 @@ def demo_financial_calculations():
         print(f"   NOI: ${result['noi']:,.2f}")
         print(f"   Cap Rate: {result['cap_rate']:.2f}%")
         print(f"   Cash-on-Cash Return: {result['cash_on_cash_return']:.2f}%")
+        print(f"   DSCR: {result['dscr']:.2f}")
         if result['price_per_sqft'] > 0:
             print(f"   Price per Sq Ft: ${result['price_per_sqft']:.2f}")
         print(f"   Investment Score: {result['score']:.1f}/100")
-        print(f"   Risk Level: {result['risk_level'].title()}")
+        print(f"   Risk Level: {result['risk_level'].title()} "
+              f"(P(loss) {result['probability_of_loss']:.1%}, median IRR {result['irr_p50']:.1f}%)")
         print(f"   Recommendation: {result['recommendation']}")
         print()
     
@@ -167,16 +195,14 @@ def demo_portfolio_analysis(analysis_results):
     print("=" * 40)
     
     # Calculate portfolio metrics
+    cube = build_summary_cube(analysis_results)
     total_investment = sum(r["purchase_price"] for r in analysis_results)
-    total_noi = sum(r["noi"] for r in analysis_results)
-    average_cap_rate = sum(r["cap_rate"] for r in analysis_results) / len(analysis_results)
-    average_score = sum(r["score"] for r in analysis_results) / len(analysis_results)
+    total_noi = cube["total"]["noi_sum"]
+    average_cap_rate = cube["total"]["cap_rate_mean"]
+    average_score = cube["total"]["score_mean"]
     
     # Risk distribution
-    risk_distribution = {}
-    for result in analysis_results:
-        risk = result["risk_level"]
-        risk_distribution[risk] = risk_distribution.get(risk, 0) + 1
+    risk_distribution = distribution(cube, "risk_level")
     
     print(f"📊 Portfolio Summary:")
     print(f"   Total Properties: {len(analysis_results)}")
@@ -198,6 +224,15 @@ def demo_portfolio_analysis(analysis_results):
         print(f"   #{i}: {result['property_id']} - {result['recommendation']}")
         print(f"       Score: {result['score']:.1f}/100, Cap Rate: {result['cap_rate']:.2f}%")
     print()
+    
+    # Best NOI for a budget of 60% of the full portfolio
+    budget = total_investment * 0.6
+    selection = optimize_portfolio(analysis_results, budget, objective="noi")
+    print(f"💰 Optimized Portfolio (budget ${budget:,.0f}):")
+    print(f"   Selected: {', '.join(selection.property_ids)}")
+    print(f"   Capital Used: ${selection.total_cost:,.2f}")
+    print(f"   Annual NOI: ${selection.total_value:,.2f}")
+    print()
 
 def demo_data_export(analysis_results):
     """Demonstrate data export capabilities"""
@@ -205,6 +240,8 @@ def demo_data_export(analysis_results):
     print("=" * 40)
     
     # Create comprehensive output data
+    cube = build_summary_cube(analysis_results)
+    risk_distribution = distribution(cube, "risk_level")
     output_data = {
         "timestamp": datetime.now().isoformat(),
         "system_info": {
@@ -216,17 +253,18 @@ def demo_data_export(analysis_results):
         "analysis_results": analysis_results,
         "portfolio_summary": {
             "total_investment": sum(r["purchase_price"] for r in analysis_results),
-            "total_noi": sum(r["noi"] for r in analysis_results),
-            "average_cap_rate": sum(r["cap_rate"] for r in analysis_results) / len(analysis_results),
-            "average_score": sum(r["score"] for r in analysis_results) / len(analysis_results),
+            "total_noi": cube["total"]["noi_sum"],
+            "average_cap_rate": cube["total"]["cap_rate_mean"],
+            "average_score": cube["total"]["score_mean"],
             "best_property": max(analysis_results, key=lambda x: x["cap_rate"])["property_id"],
             "highest_score": max(analysis_results, key=lambda x: x["score"])["property_id"]
         },
         "risk_analysis": {
-            "low_risk": len([r for r in analysis_results if r["risk_level"] == "low"]),
-            "medium_risk": len([r for r in analysis_results if r["risk_level"] == "medium"]),
-            "high_risk": len([r for r in analysis_results if r["risk_level"] == "high"])
-        }
+            "low_risk": risk_distribution["low"],
+            "medium_risk": risk_distribution["medium"],
+            "high_risk": risk_distribution["high"]
+        },
+        "summary_cube": cube
     }
     
     # Export to JSON
@@ -282,7 +320,6 @@ def demo_future_features():
     print("   📊 Economic indicator integration")
     print("   🏘️  Zoning analysis for up-zoning opportunities")
     print("   📍 Geographic market analysis")
-    print("   💰 Portfolio optimization algorithms")
     print()
     
     print("🔗 External Integrations:")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Comparable-based fair value for Real Estate AI Investment System
+Estimates value from nearby comps' cap rates and price per square foot, matching /api/estimate
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from spatial_index import DEFAULT_COMPS, SpatialIndex
+
+# Used when neither the request nor any comp gives a market cap rate (percent),
+# as in src/app/api/estimate/route.ts
+FALLBACK_CAP_RATE = 7.5
+
+# Blend of the income (cap rate) and sales (price/sqft) approaches when both apply
+INCOME_APPROACH_WEIGHT = 0.6
+
+# Distance added before inverse-distance weighting, so an identical location
+# does not take all the weight
+DISTANCE_SMOOTHING_KM = 0.25
+
+# Comps farther away than this are not used; the subject's city comps are instead
+MAX_COMP_DISTANCE_KM = 50.0
+
+PREMIUM_CITIES = ("mumbai", "delhi", "bangalore", "new york", "san francisco", "london")
+
+
+def _number(record: Dict[str, Any], *keys: str) -> float:
+    """First present numeric field, NaN when none is"""
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != "":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                continue
+    return math.nan
+
+
+def _location_key(record: Dict[str, Any]) -> tuple:
+    return (str(record.get("city") or "").strip().lower(), str(record.get("country") or "").strip().lower())
+
+
+def location_multiplier(record: Dict[str, Any]) -> float:
+    """Heuristic price multiplier used when there is no income or comp data"""
+    city = str(record.get("city") or "").lower()
+    multiplier = 1.0
+    if city and any(premium in city for premium in PREMIUM_CITIES):
+        multiplier += 0.15
+    year_built = _number(record, "yearBuilt")
+    if year_built > 2015:
+        multiplier += 0.1
+    elif year_built < 1990:
+        multiplier -= 0.05
+    if _number(record, "sqft") > 5000:
+        multiplier += 0.08
+    return max(0.8, min(1.4, multiplier))
+
+
+class ComparableSet:
+    """Comparable properties in the deal schema (``src/types/property.ts``).
+
+    Columns are held as arrays with a spatial index over the comps that
+    have coordinates and a city/country lookup for the ones that do not.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.ids = [str(record.get("id", "")) for record in records]
+        price = np.array([_number(record, "price") for record in records])
+        noi = np.array([_number(record, "noi") for record in records])
+        sqft = np.array([_number(record, "sqft") for record in records])
+        self.lat = np.array([_number(record, "lat") for record in records])
+        self.lng = np.array([_number(record, "lng") for record in records])
+        self.price = price
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cap_rate = np.where(price > 0, noi / price, np.nan)
+            stated = np.array([_number(record, "capRate") for record in records]) / 100
+            self.cap_rate = np.where(np.isfinite(cap_rate) & (cap_rate > 0), cap_rate,
+                                     np.where(stated > 0, stated, np.nan))
+            self.price_per_sqft = np.where((price > 0) & (sqft > 0), price / sqft, np.nan)
+
+        self.index = SpatialIndex(self.lat, self.lng)
+        groups: Dict[tuple, List[int]] = defaultdict(list)
+        for i, record in enumerate(records):
+            groups[_location_key(record)].append(i)
+        # Members of each city sorted by price, so the closest-priced comps are a window
+        self.by_location = {}
+        self._location_prices = {}
+        for key, members in groups.items():
+            members = np.array(members, dtype=np.int64)
+            members = members[np.argsort(price[members], kind="stable")]
+            self.by_location[key] = members
+            self._location_prices[key] = price[members]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def neighbours(self, record: Dict[str, Any], k: int, max_distance_km: Optional[float]):
+        """Up to ``k`` comp positions and their weights for one subject.
+
+        Comps are the nearest by haversine distance, weighted by inverse
+        distance; subjects without coordinates, or without comps in range,
+        use comps in the same city and country closest in price, weighted
+        equally.
+        """
+        subject_id = str(record.get("id", ""))
+        lat, lng = _number(record, "lat"), _number(record, "lng")
+        if math.isfinite(lat) and math.isfinite(lng) and len(self.index):
+            positions, distances = self.index.nearest(lat, lng, k + 1, max_distance_km)
+            keep = np.array([not subject_id or self.ids[p] != subject_id for p in positions], dtype=bool)
+            positions, distances = positions[keep][:k], distances[keep][:k]
+            if len(positions):
+                return positions, 1 / (distances + DISTANCE_SMOOTHING_KM)
+
+        key = _location_key(record)
+        members = self.by_location.get(key) if key[0] else None
+        if members is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        price = _number(record, "price")
+        if price > 0:
+            start = int(np.searchsorted(self._location_prices[key], price))
+            members = members[max(0, start - k - 1):start + k + 1]
+        else:
+            members = members[:k + 1]
+        if subject_id:
+            members = members[np.array([self.ids[m] != subject_id for m in members], dtype=bool)]
+        if price > 0:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                gap = np.abs(np.log(self.price[members] / price))
+            members = members[np.argsort(np.where(np.isfinite(gap), gap, np.inf), kind="stable")]
+        members = members[:k]
+        return members, np.ones(len(members))
+
+
+def _weighted_mean(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise weighted mean over finite values, NaN for rows without any"""
+    valid = np.isfinite(values) & (weights > 0)
+    weights = np.where(valid, weights, 0.0)
+    total = weights.sum(axis=1)
+    weighted = (np.where(valid, values, 0.0) * weights).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, weighted / total, np.nan)
+
+
+def estimate_fair_values(records: Sequence[Dict[str, Any]], comps: ComparableSet, k: int = DEFAULT_COMPS,
+                         max_distance_km: Optional[float] = MAX_COMP_DISTANCE_KM) -> List[Dict[str, Any]]:
+    """Fair value for every subject in one pass.
+
+    Each subject's comps are gathered into a padded ``(n, k)`` matrix and
+    the weighted comp cap rate and price per square foot are computed for
+    all subjects at once. Value is NOI over the comp cap rate, the comp
+    price per square foot times size, or a blend of both; without comps the
+    request's ``marketCapRate`` (or 7.5%) and the location heuristic of
+    /api/estimate are used. Results carry the /api/estimate fields.
+    """
+    n = len(records)
+    positions = np.full((n, k), -1, dtype=np.int64)
+    weights = np.zeros((n, k))
+    for i, record in enumerate(records):
+        found, found_weights = comps.neighbours(record, k, max_distance_km)
+        positions[i, :len(found)] = found
+        weights[i, :len(found)] = found_weights
+
+    # Padding slots point at a trailing NaN, so they drop out of the means
+    has_comp = positions >= 0
+    padded = np.where(has_comp, positions, len(comps))
+    comp_cap = _weighted_mean(np.append(comps.cap_rate, np.nan)[padded], weights)
+    comp_psf = _weighted_mean(np.append(comps.price_per_sqft, np.nan)[padded], weights)
+
+    price = np.array([_number(record, "price") for record in records])
+    noi = np.array([_number(record, "noi") for record in records])
+    sqft = np.array([_number(record, "sqft") for record in records])
+    stated_cap = np.array([_number(record, "capRate") for record in records])
+    stated_market = np.array([_number(record, "marketCapRate") for record in records])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cap_rate = np.where((noi > 0) & (price > 0), noi / price * 100, stated_cap)
+        income = np.where(noi > 0, noi, price * cap_rate / 100)
+        market_cap = np.where(np.isfinite(comp_cap), comp_cap * 100,
+                              np.where(stated_market > 0, stated_market, FALLBACK_CAP_RATE))
+        income_value = np.where(income > 0, income / (market_cap / 100), np.nan)
+        sales_value = np.where(sqft > 0, sqft * comp_psf, np.nan)
+
+    both = np.isfinite(income_value) & np.isfinite(sales_value)
+    value = np.where(
+        both,
+        INCOME_APPROACH_WEIGHT * income_value + (1 - INCOME_APPROACH_WEIGHT) * sales_value,
+        np.where(np.isfinite(income_value), income_value, sales_value)
+    )
+
+    results = []
+    for i, record in enumerate(records):
+        estimated = value[i] if np.isfinite(value[i]) else price[i] * location_multiplier(record)
+        discount = (estimated - price[i]) / estimated * 100 if estimated > 0 else 0.0
+        results.append({
+            "aiEstimatedValue": int(round(estimated)) if math.isfinite(estimated) else None,
+            "capRate": round(float(cap_rate[i]), 2) if math.isfinite(cap_rate[i]) else None,
+            "discountPct": round(float(discount), 2) if math.isfinite(discount) else 0.0,
+            "marketCapRate": round(float(market_cap[i]), 2),
+            "comparables": int(has_comp[i].sum()),
+        })
+    return results
+
+
+def estimate_fair_value(record: Dict[str, Any], comps: Optional[ComparableSet] = None, **options) -> Dict[str, Any]:
+    """Single-property estimate with the /api/estimate validation"""
+    if not (_number(record, "price") > 0):
+        raise ValueError("Valid property price is required")
+    return estimate_fair_values([record], comps or ComparableSet([]), **options)[0]
+
+
+def property_record(prop: Any) -> Dict[str, Any]:
+    """Deal-schema record for an engine ``Property``"""
+    return {
+        "id": prop.id,
+        "address": prop.address,
+        "city": prop.city,
+        "country": prop.country,
+        "marketId": prop.market_id,
+        "lat": prop.lat,
+        "lng": prop.lng,
+        "price": prop.purchase_price,
+        "noi": prop.annual_rent - prop.operating_expenses,
+        "sqft": prop.square_footage or None,
+        "marketCapRate": prop.market_cap_rate * 100 if prop.market_cap_rate else None,
+    }
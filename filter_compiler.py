@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Filter compiler for Real Estate AI Investment System
+Compiles UserPrefs-style deal filters into packed row bitmaps combined with bitwise AND/OR
+"""
+
+import argparse
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from saved_search_matching import ANY_RISK
+
+# Deal field -> DealStore bitmap index
+INDEXED_FIELDS = {
+    "risk": "risk",
+    "category": "category",
+    "marketId": "market_id",
+    "status": "status",
+    "currency": "currency",
+}
+
+# Filter key -> (range field, bound), named as in UserPrefs and the deals route
+RANGE_KEYS = {
+    "minPrice": ("price", 0),
+    "maxPrice": ("price", 1),
+    "capRateMin": ("capRate", 0),
+    "capRateMax": ("capRate", 1),
+    "scoreMin": ("score", 0),
+    "discountMin": ("discountPct", 0),
+}
+
+# Columns with more distinct values than this keep codes only, not one bitmap per value
+MAX_BITMAP_VALUES = 64
+
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def word_count(size: int) -> int:
+    return -(-size // 64)
+
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """Boolean row mask as uint64 words, row i at bit i % 8 of byte i // 8"""
+    packed = np.zeros(word_count(len(mask)) * 8, dtype=np.uint8)
+    bits = np.packbits(mask, bitorder="little")
+    packed[:len(bits)] = bits
+    return packed.view(np.uint64)
+
+
+def full(size: int) -> np.ndarray:
+    """Bitmap of every row"""
+    return trim(np.full(word_count(size), np.iinfo(np.uint64).max, dtype=np.uint64), size)
+
+
+def trim(words: np.ndarray, size: int) -> np.ndarray:
+    """Clear the padding bits past row ``size`` in place, as needed after a NOT"""
+    data = words.view(np.uint8)
+    data[-(-size // 8):] = 0
+    if size % 8:
+        data[size // 8] &= np.uint8((1 << (size % 8)) - 1)
+    return words
+
+
+def popcount(words: np.ndarray) -> int:
+    return int(_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def positions(words: np.ndarray, size: int) -> np.ndarray:
+    """Rows set in a bitmap, ascending"""
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), count=size, bitorder="little"))
+
+
+def contains(words: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Whether each of ``rows`` is set in a bitmap"""
+    rows = np.asarray(rows, dtype=np.int64)
+    return ((words.view(np.uint8)[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1).astype(bool)
+
+
+class BitmapIndex:
+    """One packed bitmap per distinct value of a categorical column.
+
+    A set of values is the OR of their bitmaps, so a filter over a
+    low-cardinality field never reads its rows. Columns with more than
+    ``MAX_BITMAP_VALUES`` values keep only their codes, and a value set is
+    packed from a lookup over them instead.
+    """
+
+    def __init__(self, values: np.ndarray, codes: np.ndarray, bitmaps: Optional[np.ndarray] = None):
+        self.values = values
+        self.codes = codes
+        self.size = len(codes)
+        if bitmaps is None and len(values) <= MAX_BITMAP_VALUES:
+            bitmaps = np.zeros((len(values), word_count(self.size)), dtype=np.uint64)
+            for code in range(len(values)):
+                bitmaps[code] = pack(codes == code)
+        self.bitmaps = bitmaps
+
+    def select(self, matched: np.ndarray) -> np.ndarray:
+        """Bitmap of the rows whose value is flagged in ``matched``, a boolean per distinct value"""
+        if self.bitmaps is None:
+            return pack(matched[self.codes])
+        rows = self.bitmaps[matched]
+        if len(rows) == 1:
+            return rows[0].copy()
+        if not len(rows):
+            return np.zeros(word_count(self.size), dtype=np.uint64)
+        return np.bitwise_or.reduce(rows, axis=0)
+
+    def where(self, wanted: Iterable[Any]) -> np.ndarray:
+        """Bitmap of the rows holding any of ``wanted``"""
+        return self.select(np.isin(self.values, [str(value) for value in wanted]))
+
+
+class Predicate:
+    """A compiled deal filter; ``bitmap`` evaluates it over a store's columns and bitmap indexes"""
+
+    def bitmap(self, store) -> np.ndarray:
+        raise NotImplementedError
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+
+class Range(Predicate):
+    """Inclusive bounds on a numeric column; a deal without the value fails"""
+
+    def __init__(self, field: str, low: Optional[float] = None, high: Optional[float] = None):
+        self.field, self.low, self.high = field, low, high
+
+    def bitmap(self, store) -> np.ndarray:
+        column = store.columns[self.field]
+        if self.low is None and self.high is None:
+            return pack(~np.isnan(column))
+        if self.high is None:
+            return pack(column >= self.low)
+        if self.low is None:
+            return pack(column <= self.high)
+        return pack((column >= self.low) & (column <= self.high))
+
+
+class OneOf(Predicate):
+    """A categorical field holds one of the given values"""
+
+    def __init__(self, field: str, values: Sequence[Any]):
+        self.field, self.values = field, list(values)
+
+    def bitmap(self, store) -> np.ndarray:
+        return store.bitmaps[INDEXED_FIELDS[self.field]].where(self.values)
+
+
+class Markets(Predicate):
+    """City or country contains one of the markets, case-insensitively, as in the deals route"""
+
+    def __init__(self, markets: Sequence[str]):
+        self.markets = [market.strip().lower() for market in markets]
+
+    def bitmap(self, store) -> np.ndarray:
+        index = store.bitmaps["location"]
+        # Evaluated once per distinct location, not per deal
+        matched = np.array([
+            any(market in city or market in country for market in self.markets)
+            for city, country in (value.split("\x00") for value in index.values)
+        ], dtype=bool)
+        return index.select(matched)
+
+
+class And(Predicate):
+    def __init__(self, *parts: Predicate):
+        self.parts = parts
+
+    def bitmap(self, store) -> np.ndarray:
+        if not self.parts:
+            return full(len(store))
+        words = self.parts[0].bitmap(store)
+        for part in self.parts[1:]:
+            words &= part.bitmap(store)
+        return words
+
+
+class Or(Predicate):
+    def __init__(self, *parts: Predicate):
+        self.parts = parts
+
+    def bitmap(self, store) -> np.ndarray:
+        words = np.zeros(word_count(len(store)), dtype=np.uint64)
+        for part in self.parts:
+            words |= part.bitmap(store)
+        return words
+
+
+class Not(Predicate):
+    def __init__(self, part: Predicate):
+        self.part = part
+
+    def bitmap(self, store) -> np.ndarray:
+        return trim(~self.part.bitmap(store), len(store))
+
+
+def _listed(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def compile_filter(spec: Dict[str, Any]) -> Predicate:
+    """Predicate for a UserPrefs-style filter, every key of which must hold.
+
+    Ranges use the UserPrefs and route names (minPrice, maxPrice,
+    capRateMin, capRateMax, scoreMin, discountMin). ``markets`` matches
+    city or country as the deals route does, ``risk`` of "any" or "all"
+    accepts every deal, and ``categories``, ``category``, ``marketId``,
+    ``status`` and ``currency`` take a value or a list. ``and`` and
+    ``or`` take lists of filters and ``not`` one filter. Unknown keys
+    raise ``ValueError`` rather than being ignored.
+    """
+    parts: List[Predicate] = []
+    ranges: Dict[str, List[Optional[float]]] = {}
+    for key, value in spec.items():
+        if value is None:
+            continue
+        if key in RANGE_KEYS:
+            field, bound = RANGE_KEYS[key]
+            ranges.setdefault(field, [None, None])[bound] = float(value)
+        elif key == "markets":
+            if value:
+                parts.append(Markets(_listed(value)))
+        elif key == "risk":
+            if value not in ANY_RISK:
+                parts.append(OneOf("risk", _listed(value)))
+        elif key in ("categories", "category"):
+            if value:
+                parts.append(OneOf("category", _listed(value)))
+        elif key in INDEXED_FIELDS:
+            if value not in ("", []):
+                parts.append(OneOf(key, _listed(value)))
+        elif key == "and":
+            parts.extend(compile_filter(part) for part in value)
+        elif key == "or":
+            parts.append(Or(*(compile_filter(part) for part in value)))
+        elif key == "not":
+            parts.append(Not(compile_filter(value)))
+        else:
+            raise ValueError(f"Unknown filter key: {key}")
+    # Ranges go last, so the cheap bitmap ORs come first
+    parts.extend(Range(field, low, high) for field, (low, high) in ranges.items())
+    return parts[0] if len(parts) == 1 else And(*parts)
+
+
+BENCHMARK_FILTERS = (
+    {"risk": "medium", "categories": ["distressed", "mispriced"], "status": "new"},
+    {"markets": ["Mumbai", "Dubai"], "risk": "medium", "currency": ["INR", "AED"]},
+    {"or": [{"category": "distressed"}, {"status": ["offer", "review"]}], "not": {"risk": "high"}},
+    {"markets": ["London"], "categories": ["cap_rate_arbitrage"], "minPrice": 300000, "capRateMin": 7},
+)
+
+
+def benchmark(n: int = 1_000_000, repeats: int = 50,
+              filters: Sequence[Dict[str, Any]] = BENCHMARK_FILTERS) -> List[Dict[str, Any]]:
+    """p50 milliseconds to compile and evaluate each filter over ``n`` synthetic deals, against a row scan"""
+    from deals_service import DealStore, synthetic_deals
+
+    store = DealStore(synthetic_deals(n))
+    results = []
+    for spec in filters:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            matched = store.select(spec)
+            timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scanned = [i for i, deal in enumerate(store.deals) if scan_match(spec, deal)]
+        scan_seconds = time.perf_counter() - start
+        results.append({"filter": spec, "matches": len(matched), "p50_ms": float(np.median(timings)) * 1000,
+                        "scan_ms": scan_seconds * 1000, "agrees": scanned == matched.tolist()})
+    return results
+
+
+def scan_match(spec: Dict[str, Any], deal: Dict[str, Any]) -> bool:
+    """Row-at-a-time check of a filter, the baseline ``benchmark`` compares against"""
+    for key, value in spec.items():
+        if key in RANGE_KEYS:
+            field, bound = RANGE_KEYS[key]
+            actual = deal.get(field)
+            if field == "capRate" and not actual:
+                actual = None
+            if actual is None or (actual < value if bound == 0 else actual > value):
+                return False
+        elif key == "markets":
+            city, country = str(deal.get("city", "")).lower(), str(deal.get("country", "")).lower()
+            if value and not any(m.strip().lower() in city or m.strip().lower() in country for m in value):
+                return False
+        elif key == "risk":
+            if value not in ANY_RISK and deal.get("risk") not in _listed(value):
+                return False
+        elif key in ("categories", "category"):
+            if value and deal.get("category") not in _listed(value):
+                return False
+        elif key in INDEXED_FIELDS:
+            if str(deal.get(key) or "") not in [str(v) for v in _listed(value)]:
+                return False
+        elif key == "and":
+            if not all(scan_match(part, deal) for part in value):
+                return False
+        elif key == "or":
+            if not any(scan_match(part, deal) for part in value):
+                return False
+        elif key == "not":
+            if scan_match(value, deal):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled deal filters against a row scan")
+    parser.add_argument("--deals", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"⏱️  Compiled filters over {args.deals:,} synthetic deals:")
+    for row in benchmark(args.deals, args.repeats):
+        print(f"   {row['matches']:>9,} matches: bitmaps {row['p50_ms']:.2f} ms, "
+              f"row scan {row['scan_ms']:.0f} ms{'' if row['agrees'] else '  ❌ results differ'}")
+        print(f"      {row['filter']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Vectorized investment metrics for Real Estate AI Investment System
+Leveraged and unleveraged return metrics computed over whole arrays of properties
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from config import Config
+
+# Metrics written to every analysis result, in output order
+METRIC_NAMES = (
+    "cash_on_cash_return",
+    "dscr",
+    "debt_yield",
+    "break_even_occupancy",
+    "gross_rent_multiplier",
+    "price_per_sqft",
+    "annual_debt_service",
+)
+
+# Holding-period metrics from ``project_cash_flows``, also written to every result
+PROJECTION_METRIC_NAMES = (
+    "irr",
+    "npv",
+    "equity_multiple",
+)
+
+
+def _divide(numerator, denominator) -> np.ndarray:
+    """Elementwise division that yields 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+def annual_debt_service(loan_amount, interest_rate, amortization_years) -> np.ndarray:
+    """Annual payment on a fully amortizing loan with monthly payments.
+
+    ``interest_rate`` is an annual percentage. A zero rate falls back to
+    straight-line principal repayment.
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64)
+    monthly_rate = np.asarray(interest_rate, dtype=np.float64) / 100 / 12
+    payments = np.asarray(amortization_years, dtype=np.float64) * 12
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = np.power(1 + monthly_rate, payments)
+        amortizing = loan_amount * monthly_rate * growth / (growth - 1)
+    straight_line = _divide(loan_amount, payments)
+    return np.where(monthly_rate > 0, amortizing, straight_line) * 12
+
+
+def remaining_balance(loan_amount, interest_rate, amortization_years, elapsed_years) -> np.ndarray:
+    """Outstanding principal after ``elapsed_years`` of monthly payments.
+
+    All arguments broadcast, so a column of loans against a row of years
+    gives the whole amortization schedule.
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64)
+    monthly_rate = np.asarray(interest_rate, dtype=np.float64) / 100 / 12
+    payments = np.asarray(amortization_years, dtype=np.float64) * 12
+    paid = np.minimum(np.asarray(elapsed_years, dtype=np.float64) * 12, payments)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = np.power(1 + monthly_rate, payments)
+        amortizing = loan_amount * (growth - np.power(1 + monthly_rate, paid)) / (growth - 1)
+    straight_line = loan_amount * (1 - _divide(paid, payments))
+    return np.where(monthly_rate > 0, amortizing, straight_line)
+
+
+def compute_metrics(purchase_price, annual_rent, operating_expenses, square_footage=None,
+                    down_payment_percent=None, interest_rate=None,
+                    amortization_years=None) -> Dict[str, np.ndarray]:
+    """Compute every metric for arrays of properties in one pass.
+
+    Financing terms default to the values in ``Config`` and may be scalars or
+    per-property arrays. Percent metrics (cap rate, cash-on-cash, debt yield,
+    break-even occupancy) are returned in percent, like ``cap_rate``
+    elsewhere in the engine.
+    """
+    if down_payment_percent is None:
+        down_payment_percent = Config.DEFAULT_DOWN_PAYMENT_PERCENT
+    if interest_rate is None:
+        interest_rate = Config.DEFAULT_INTEREST_RATE
+    if amortization_years is None:
+        amortization_years = Config.DEFAULT_AMORTIZATION_YEARS
+
+    price = np.asarray(purchase_price, dtype=np.float64)
+    rent = np.asarray(annual_rent, dtype=np.float64)
+    expenses = np.asarray(operating_expenses, dtype=np.float64)
+    sqft = np.zeros_like(price) if square_footage is None else np.asarray(square_footage, dtype=np.float64)
+
+    noi = rent - expenses
+    equity = price * np.asarray(down_payment_percent, dtype=np.float64) / 100
+    loan = price - equity
+    debt_service = annual_debt_service(loan, interest_rate, amortization_years)
+    cash_flow = noi - debt_service
+
+    return {
+        "noi": noi,
+        "cap_rate": _divide(noi, price) * 100,
+        "loan_amount": loan,
+        "equity": equity,
+        "annual_debt_service": debt_service,
+        "annual_cash_flow": cash_flow,
+        "cash_on_cash_return": _divide(cash_flow, equity) * 100,
+        "dscr": _divide(noi, debt_service),
+        "debt_yield": _divide(noi, loan) * 100,
+        "break_even_occupancy": _divide(expenses + debt_service, rent) * 100,
+        "gross_rent_multiplier": _divide(price, rent),
+        "price_per_sqft": _divide(price, sqft),
+    }
+
+
+def metrics_for_properties(properties: Sequence[Any], **financing) -> Dict[str, np.ndarray]:
+    """Compute metrics for a list of ``Property`` objects"""
+    count = len(properties)
+
+    def column(name: str, default: Optional[float] = None) -> np.ndarray:
+        return np.fromiter((getattr(p, name, default) or 0.0 for p in properties),
+                           dtype=np.float64, count=count)
+
+    return compute_metrics(
+        column("purchase_price"),
+        column("annual_rent"),
+        column("operating_expenses"),
+        column("square_footage"),
+        **financing
+    )
+
+
+def row_metrics(metrics: Dict[str, np.ndarray], index: int,
+                names: Sequence[str] = METRIC_NAMES) -> Dict[str, float]:
+    """Plain-float metrics of one property, for JSON output"""
+    return {name: float(metrics[name][index]) for name in names}
+
+
+def npv(rate, cash_flows) -> np.ndarray:
+    """Net present value of cash flows along the last axis (``rate`` as a fraction)"""
+    cash_flows = np.asarray(cash_flows, dtype=np.float64)
+    periods = np.arange(cash_flows.shape[-1])
+    discount = np.power(1 + np.asarray(rate, dtype=np.float64)[..., None], -periods)
+    return np.sum(cash_flows * discount, axis=-1)
+
+
+def _npv_and_slope(flows: np.ndarray, rate: np.ndarray):
+    """NPV per row and its derivative with respect to the rate.
+
+    Evaluated with Horner's rule in the discount factor v = 1 / (1 + rate),
+    which avoids computing a power per period.
+    """
+    v = 1 / (1 + rate)
+    value = flows[:, -1].copy()
+    derivative = np.zeros_like(value)
+    for t in range(flows.shape[1] - 2, -1, -1):
+        derivative = derivative * v + value
+        value = value * v + flows[:, t]
+    return value, -derivative * v * v
+
+
+def solve_irr(cash_flows, low: float = -0.99, high: float = 10.0, tol: float = 1e-8,
+              max_iter: int = 60) -> np.ndarray:
+    """Internal rate of return for every cash-flow series along the last axis.
+
+    Safeguarded Newton iteration run on all series at once: each step is a
+    Newton step when it stays inside the current sign-change bracket and a
+    bisection step otherwise, so every series converges without a per-row
+    solver call. Series without a sign change in ``[low, high]`` return NaN.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=np.float64)
+    shape = cash_flows.shape[:-1]
+    flows = cash_flows.reshape(-1, cash_flows.shape[-1])
+
+    lo = np.full(flows.shape[0], low)
+    hi = np.full(flows.shape[0], high)
+    value_lo, _ = _npv_and_slope(flows, lo)
+    value_hi, _ = _npv_and_slope(flows, hi)
+    solvable = np.sign(value_lo) != np.sign(value_hi)
+
+    # Start from the average annual multiple, which is close for typical deals
+    invested = -np.minimum(flows, 0).sum(axis=1)
+    returned = np.maximum(flows, 0).sum(axis=1)
+    years = max(flows.shape[1] - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.power(returned / invested, 1 / years) - 1
+    rate = np.clip(np.where(np.isfinite(rate), rate, 0.1), low + 1e-6, high - 1e-6)
+
+    active = solvable.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        index = np.flatnonzero(active)
+        r = rate[index]
+        value, slope = _npv_and_slope(flows[index], r)
+
+        # Shrink the bracket, keeping lo on the same side of the root as before
+        same_as_lo = np.sign(value) == np.sign(value_lo[index])
+        lo[index] = np.where(same_as_lo, r, lo[index])
+        value_lo[index] = np.where(same_as_lo, value, value_lo[index])
+        hi[index] = np.where(same_as_lo, hi[index], r)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - value / slope
+        inside = np.isfinite(newton) & (newton > lo[index]) & (newton < hi[index])
+        new_rate = np.where(inside, newton, (lo[index] + hi[index]) / 2)
+
+        rate[index] = new_rate
+        converged = np.abs(new_rate - r) < tol
+        active[index[converged]] = False
+
+    return np.where(solvable, rate, np.nan).reshape(shape)
+
+
+def project_cash_flows(purchase_price, annual_rent, operating_expenses, market_cap_rate=None,
+                       years: int = None, rent_growth=None, expense_growth=None, selling_cost=None,
+                       discount_rate=None, down_payment_percent=None, interest_rate=None,
+                       amortization_years=None) -> Dict[str, np.ndarray]:
+    """Project levered cash flows over a holding period for arrays of properties.
+
+    Rent and expenses grow at their own rates from year one, debt service
+    follows the amortization schedule and the property is sold at the end
+    of year ``years`` at the final NOI over ``market_cap_rate`` (a fraction,
+    falling back to the going-in cap rate when missing), net of selling
+    costs and the outstanding loan. Rates are in percent, like the rest of
+    this module, and default to ``Config``; per-year arrays come back as
+    ``(n_properties, years)``.
+    """
+    years = years or Config.HOLD_PERIOD_YEARS
+    rent_growth = Config.RENT_GROWTH_PERCENT if rent_growth is None else rent_growth
+    expense_growth = Config.EXPENSE_GROWTH_PERCENT if expense_growth is None else expense_growth
+    selling_cost = Config.SELLING_COST_PERCENT if selling_cost is None else selling_cost
+    discount_rate = Config.DISCOUNT_RATE_PERCENT if discount_rate is None else discount_rate
+    if down_payment_percent is None:
+        down_payment_percent = Config.DEFAULT_DOWN_PAYMENT_PERCENT
+    if interest_rate is None:
+        interest_rate = Config.DEFAULT_INTEREST_RATE
+    if amortization_years is None:
+        amortization_years = Config.DEFAULT_AMORTIZATION_YEARS
+
+    price = np.asarray(purchase_price, dtype=np.float64)
+    rent = np.asarray(annual_rent, dtype=np.float64)
+    expenses = np.asarray(operating_expenses, dtype=np.float64)
+    elapsed = np.arange(years, dtype=np.float64)
+
+    rent_path = rent[:, None] * np.power(1 + np.asarray(rent_growth, dtype=np.float64)[..., None] / 100, elapsed)
+    expense_path = expenses[:, None] * np.power(
+        1 + np.asarray(expense_growth, dtype=np.float64)[..., None] / 100, elapsed)
+    noi = rent_path - expense_path
+
+    equity = price * np.asarray(down_payment_percent, dtype=np.float64) / 100
+    loan = price - equity
+    debt_service = annual_debt_service(loan, interest_rate, amortization_years)
+    balance = remaining_balance(loan[:, None], np.asarray(interest_rate, dtype=np.float64)[..., None],
+                                np.asarray(amortization_years, dtype=np.float64)[..., None], elapsed + 1)
+
+    going_in_cap = _divide(rent - expenses, price)
+    exit_cap = going_in_cap if market_cap_rate is None else np.asarray(market_cap_rate, dtype=np.float64)
+    exit_cap = np.where(exit_cap > 0, exit_cap, going_in_cap)
+    sale_price = _divide(noi[:, -1], exit_cap)
+    sale_proceeds = sale_price * (1 - np.asarray(selling_cost, dtype=np.float64) / 100) - balance[:, -1]
+
+    cash_flow = noi - debt_service[:, None]
+    equity_cash_flows = np.empty((price.shape[0], years + 1))
+    equity_cash_flows[:, 0] = -equity
+    equity_cash_flows[:, 1:] = cash_flow
+    equity_cash_flows[:, -1] += sale_proceeds
+
+    # Without a sign change there is no IRR: count never recovering the
+    # equity as a total loss and report 0 otherwise, as ``_divide`` does
+    irr = solve_irr(equity_cash_flows) * 100
+    lost = equity_cash_flows.sum(axis=1) < 0
+    irr = np.where(np.isnan(irr), np.where(lost, -100.0, 0.0), irr)
+
+    return {
+        "noi": noi,
+        "cash_flow": cash_flow,
+        "loan_balance": balance,
+        "annual_debt_service": debt_service,
+        "sale_price": sale_price,
+        "sale_proceeds": sale_proceeds,
+        "equity_cash_flows": equity_cash_flows,
+        "irr": irr,
+        "npv": npv(np.full(price.shape[0], np.asarray(discount_rate, dtype=np.float64) / 100),
+                   equity_cash_flows),
+        "equity_multiple": _divide(equity_cash_flows[:, 1:].sum(axis=1), equity),
+    }
+
+
+def projection_for_properties(properties: Sequence[Any], **options) -> Dict[str, np.ndarray]:
+    """Run ``project_cash_flows`` for a list of ``Property`` objects"""
+    count = len(properties)
+
+    def column(name: str) -> np.ndarray:
+        return np.fromiter((getattr(p, name, 0.0) or 0.0 for p in properties), dtype=np.float64, count=count)
+
+    return project_cash_flows(
+        column("purchase_price"),
+        column("annual_rent"),
+        column("operating_expenses"),
+        column("market_cap_rate"),
+        **options
+    )
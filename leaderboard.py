@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Property leaderboard for Real Estate AI Investment System
+Keeps properties ranked as they stream in or change, with O(log n) rank and top-K queries
+"""
+
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Level cap for the skiplist; 2**32 entries before search degrades
+MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, level: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkiplist:
+    """Sorted skiplist whose links carry widths, so positions are O(log n).
+
+    Each link records how many entries it skips, which lets ``index`` count
+    the entries before a key and ``at`` walk to a position without touching
+    the rest of the list.
+    """
+
+    def __init__(self, seed: int = 0):
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._head.width = [1] * MAX_LEVEL
+        self._level = 1
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _path(self, key) -> Tuple[List[_Node], List[int]]:
+        """Rightmost node before ``key`` on every level, and its position"""
+        update = [self._head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, position = self._head, 0
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = position
+        return update, positions
+
+    def insert(self, key, value=None):
+        update, positions = self._path(key)
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                positions[i] = 0
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        node = _Node(key, value, level)
+        position = positions[0] + 1
+        for i in range(level):
+            before = update[i]
+            node.next[i] = before.next[i]
+            before.next[i] = node
+            # Split the skipped span between the predecessor and the new node
+            node.width[i] = before.width[i] - (position - positions[i]) + 1
+            before.width[i] = position - positions[i]
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        update, _ = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+        for i in range(self._level):
+            if update[i].next[i] is node:
+                update[i].width[i] += node.width[i] - 1
+                update[i].next[i] = node.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def index(self, key) -> int:
+        """0-based position of ``key``, or -1 when absent"""
+        update, positions = self._path(key)
+        node = update[0].next[0]
+        return positions[0] if node is not None and node.key == key else -1
+
+    def at(self, index: int):
+        """(key, value) at a 0-based position"""
+        if not 0 <= index < self._size:
+            raise IndexError("skiplist index out of range")
+        node, remaining = self._head, index + 1
+        for level in range(self._level - 1, -1, -1):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node.key, node.value
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key, node.value
+            node = node.next[0]
+
+
+class Leaderboard:
+    """Properties ordered by a score, highest first.
+
+    ``update`` inserts or moves a property in O(log n), and ``rank`` and
+    ``top`` answer without re-sorting the book. Ties keep the order in
+    which properties first arrived, like the engine's stable sort.
+    """
+
+    def __init__(self):
+        self._entries = IndexableSkiplist()
+        self._keys: Dict[str, tuple] = {}
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, property_id: str) -> bool:
+        return property_id in self._keys
+
+    def update(self, property_id: str, score: float, item: Any = None) -> int:
+        """Insert or re-score a property and return its 1-based rank"""
+        key = self._keys.get(property_id)
+        if key is not None:
+            self._entries.remove(key)
+            sequence = key[1]
+        else:
+            sequence = self._sequence
+            self._sequence += 1
+        key = (-score, sequence, property_id)
+        self._keys[property_id] = key
+        self._entries.insert(key, item)
+        return self._entries.index(key) + 1
+
+    def remove(self, property_id: str) -> bool:
+        key = self._keys.pop(property_id, None)
+        return key is not None and self._entries.remove(key)
+
+    def rank(self, property_id: str) -> Optional[int]:
+        """1-based rank, or None for an unknown property"""
+        key = self._keys.get(property_id)
+        return self._entries.index(key) + 1 if key is not None else None
+
+    def score(self, property_id: str) -> Optional[float]:
+        key = self._keys.get(property_id)
+        return -key[0] if key is not None else None
+
+    def at_rank(self, rank: int) -> Tuple[str, float, Any]:
+        """(property_id, score, item) holding a 1-based rank"""
+        (score, _, property_id), item = self._entries.at(rank - 1)
+        return property_id, -score, item
+
+    def top(self, k: int) -> List[Tuple[str, float, Any]]:
+        """Best ``k`` entries as (property_id, score, item), best first"""
+        entries = []
+        for (score, _, property_id), item in self._entries:
+            if len(entries) >= k:
+                break
+            entries.append((property_id, -score, item))
+        return entries
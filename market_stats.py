@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Market aggregates for Real Estate AI Investment System
+Per-market running statistics and mergeable quantile sketches, updated as properties arrive or change
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Measures tracked per market, read from analysis rows
+MARKET_MEASURES = ("cap_rate", "purchase_price", "score")
+
+# Relative accuracy of quantile estimates
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+UNKNOWN_MARKET = "unknown"
+
+
+def market_key(row: Dict[str, Any]) -> str:
+    """Market of an analysis row: its market id, else "City, Country" """
+    market_id = row.get("market_id") or row.get("marketId")
+    if market_id:
+        return str(market_id)
+    city = str(row.get("city") or "").strip()
+    country = str(row.get("country") or "").strip()
+    if city:
+        return f"{city}, {country}" if country else city
+    return UNKNOWN_MARKET
+
+
+class RunningStats:
+    """Count, mean and variance with Welford updates.
+
+    Values can be removed again and two instances merged (Chan et al.), so
+    a market's statistics follow its properties without a rescan.
+    """
+
+    __slots__ = ("count", "total", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.__init__()
+            return
+        previous_mean = self.mean
+        self.count -= 1
+        self.total -= value
+        self.mean = (previous_mean * (self.count + 1) - value) / self.count
+        self._m2 = max(0.0, self._m2 - (value - self.mean) * (value - previous_mean))
+
+    def merge(self, other: "RunningStats"):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+
+    def to_state(self) -> List[float]:
+        """JSON-safe state for sending to another process"""
+        return [self.count, self.total, self.mean, self._m2]
+
+    @classmethod
+    def from_state(cls, state: List[float]) -> "RunningStats":
+        stats = cls()
+        count, stats.total, stats.mean, stats._m2 = state
+        stats.count = int(count)
+        return stats
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch in the style of DDSketch.
+
+    Each value falls in bucket ceil(log_gamma |x|), so any quantile is
+    returned within ``relative_accuracy`` of a true sample value. Bucket
+    counts can be decremented, which makes the sketch deletable, and
+    sketches merge by adding counts.
+    """
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Dict[int, int] = defaultdict(int)
+        self._negative: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self._ordered: Optional[List[Tuple[float, int]]] = None
+
+    def _bucket(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _bucket_value(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def _change(self, value: float, delta: int):
+        if value > 0:
+            store, key = self._positive, self._bucket(value)
+        elif value < 0:
+            store, key = self._negative, self._bucket(-value)
+        else:
+            self.zero_count += delta
+            self.count += delta
+            self._ordered = None
+            return
+        store[key] += delta
+        if store[key] <= 0:
+            del store[key]
+        self.count += delta
+        self._ordered = None
+
+    def add(self, value: float):
+        self._change(value, 1)
+
+    def remove(self, value: float):
+        self._change(value, -1)
+
+    def add_many(self, values):
+        """Add an array of values with one bucket count per distinct bucket"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        for store, part in ((self._positive, values[values > 0]), (self._negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] += count
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        self._ordered = None
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other._positive.items():
+            self._positive[key] += count
+        for key, count in other._negative.items():
+            self._negative[key] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self._ordered = None
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-safe state for sending to another process"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(key): count for key, count in self._positive.items()},
+            "negative": {str(key): count for key, count in self._negative.items()},
+            "zero_count": self.zero_count,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"])
+        for store, counts in ((sketch._positive, state["positive"]), (sketch._negative, state["negative"])):
+            for key, count in counts.items():
+                store[int(key)] = count
+        sketch.zero_count = state["zero_count"]
+        sketch.count = sketch.zero_count + sum(sketch._positive.values()) + sum(sketch._negative.values())
+        return sketch
+
+    def _buckets(self) -> List[Tuple[float, int]]:
+        """(representative value, count) in ascending value order, cached"""
+        if self._ordered is None:
+            ordered = [(-self._bucket_value(key), self._negative[key])
+                       for key in sorted(self._negative, reverse=True)]
+            if self.zero_count:
+                ordered.append((0.0, self.zero_count))
+            ordered.extend((self._bucket_value(key), self._positive[key]) for key in sorted(self._positive))
+            self._ordered = ordered
+        return self._ordered
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate ``q`` quantile (0..1), or None when empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._buckets():
+            seen += count
+            if seen > rank:
+                return value
+        return self._buckets()[-1][0]
+
+
+class MarketStats:
+    """Running statistics and a quantile sketch per measure for one market"""
+
+    def __init__(self, measures: Iterable[str] = MARKET_MEASURES):
+        self.stats = {measure: RunningStats() for measure in measures}
+        self.sketches = {measure: QuantileSketch() for measure in measures}
+        self.count = 0
+
+    def add(self, values: Dict[str, float]):
+        self.count += 1
+        for measure, value in values.items():
+            self.stats[measure].add(value)
+            self.sketches[measure].add(value)
+
+    def remove(self, values: Dict[str, float]):
+        self.count -= 1
+        for measure, value in values.items():
+            self.stats[measure].remove(value)
+            self.sketches[measure].remove(value)
+
+    def merge(self, other: "MarketStats"):
+        self.count += other.count
+        for measure in self.stats:
+            self.stats[measure].merge(other.stats[measure])
+            self.sketches[measure].merge(other.sketches[measure])
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "stats": {measure: stats.to_state() for measure, stats in self.stats.items()},
+            "sketches": {measure: sketch.to_state() for measure, sketch in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MarketStats":
+        market = cls(state["stats"])
+        market.count = state["count"]
+        market.stats = {measure: RunningStats.from_state(s) for measure, s in state["stats"].items()}
+        market.sketches = {measure: QuantileSketch.from_state(s) for measure, s in state["sketches"].items()}
+        return market
+
+    def value(self, measure: str, statistic: str) -> Optional[float]:
+        """One statistic: count, sum, mean, std, variance, median or pNN"""
+        stats = self.stats[measure]
+        if statistic == "count":
+            return stats.count
+        if statistic == "sum":
+            return stats.total
+        if statistic in ("mean", "std", "variance"):
+            return getattr(stats, statistic) if stats.count else None
+        if statistic == "median":
+            return self.sketches[measure].quantile(0.5)
+        if statistic.startswith("p") and statistic[1:].isdigit():
+            return self.sketches[measure].quantile(int(statistic[1:]) / 100)
+        raise ValueError(f"Unknown statistic: {statistic}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            **{
+                measure: {
+                    statistic: self.value(measure, statistic)
+                    for statistic in ("count", "sum", "mean", "std", "p25", "median", "p75")
+                }
+                for measure in self.stats
+            }
+        }
+
+
+class MarketAggregates:
+    """Per-market aggregates that follow properties as they arrive or change.
+
+    Each property's last contribution is remembered, so ``update`` removes
+    it from its old market before adding the new values, and queries only
+    read the per-market summaries.
+    """
+
+    def __init__(self, measures: Iterable[str] = MARKET_MEASURES):
+        self.measures = tuple(measures)
+        self.markets: Dict[str, MarketStats] = {}
+        self._contributions: Dict[str, Tuple[str, Dict[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def _values(self, row: Dict[str, Any]) -> Dict[str, float]:
+        values = {}
+        for measure in self.measures:
+            value = row.get(measure)
+            if value is not None and not (isinstance(value, float) and math.isnan(value)):
+                values[measure] = float(value)
+        return values
+
+    def update(self, row: Dict[str, Any]):
+        """Add an analysis row, or replace the last values of the same property"""
+        property_id = str(row["property_id"])
+        self.remove(property_id)
+        market = market_key(row)
+        values = self._values(row)
+        if market not in self.markets:
+            self.markets[market] = MarketStats(self.measures)
+        self.markets[market].add(values)
+        self._contributions[property_id] = (market, values)
+
+    def remove(self, property_id: str) -> bool:
+        contribution = self._contributions.pop(property_id, None)
+        if contribution is None:
+            return False
+        market, values = contribution
+        stats = self.markets[market]
+        stats.remove(values)
+        if stats.count == 0:
+            del self.markets[market]
+        return True
+
+    def merge(self, other: "MarketAggregates"):
+        """Fold in aggregates built elsewhere.
+
+        A property both sides remember is counted once, with ``other``'s
+        values. Aggregates from ``from_state`` remember no properties, so
+        merging them assumes the properties are disjoint.
+        """
+        for property_id in self._contributions.keys() & other._contributions.keys():
+            self.remove(property_id)
+        for market, stats in other.markets.items():
+            if market not in self.markets:
+                self.markets[market] = MarketStats(self.measures)
+            self.markets[market].merge(stats)
+        self._contributions.update(other._contributions)
+
+    def stats(self, market: str) -> Optional[MarketStats]:
+        return self.markets.get(market)
+
+    def rank_markets(self, measure: str = "cap_rate", statistic: str = "median",
+                     descending: bool = True, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Markets ordered by one statistic of one measure, from the summaries only"""
+        ranked = [(market, stats.value(measure, statistic)) for market, stats in self.markets.items()]
+        ranked = [(market, value) for market, value in ranked if value is not None]
+        ranked.sort(key=lambda item: item[1], reverse=descending)
+        return ranked[:limit] if limit else ranked
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {market: stats.to_dict() for market, stats in sorted(self.markets.items())}
+
+    def to_state(self) -> Dict[str, Any]:
+        """Per-market summaries for merging in another process; property contributions are left out"""
+        return {
+            "measures": list(self.measures),
+            "markets": {market: stats.to_state() for market, stats in self.markets.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MarketAggregates":
+        aggregates = cls(state["measures"])
+        aggregates.markets = {market: MarketStats.from_state(s) for market, s in state["markets"].items()}
+        return aggregates
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], measures: Iterable[str] = MARKET_MEASURES):
+        aggregates = cls(measures)
+        for row in rows:
+            aggregates.update(row)
+        return aggregates
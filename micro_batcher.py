@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Micro-batching for Real Estate AI Investment System
+Holds single-property requests for a few milliseconds and runs them as one vectorized pass
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from fair_value import estimate_fair_values
+
+# Largest batch handed to a handler; also bounds the size of one LLM prompt
+DEFAULT_MAX_BATCH_SIZE = 64
+
+# Longest a request waits for others to join its batch
+DEFAULT_MAX_DELAY_MS = 5.0
+
+
+class MicroBatcher:
+    """Collects items from many callers and hands them to ``handler`` together.
+
+    A batch is dispatched once it holds ``max_batch_size`` items or its
+    oldest item has waited ``max_delay_ms``, whichever comes first, so a
+    lone request pays at most the delay. ``handler`` takes a list of items
+    and returns one result per item, in order; a result that is an
+    exception is raised to that caller only, and an exception from the
+    handler itself is raised to every caller in the batch.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_delay_ms: float = DEFAULT_MAX_DELAY_MS):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._pending: Deque[Tuple[float, Any, Future]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the future resolves with its result"""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((time.monotonic(), item, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit one item and wait for its result"""
+        return self.submit(item).result(timeout)
+
+    def close(self):
+        """Dispatch whatever is pending and stop the collector thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_batch(self) -> List[Tuple[float, Any, Future]]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            deadline = self._pending[0][0] + self.max_delay if self._pending else 0.0
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[float, Any, Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = list(self.handler([item for _, item, _ in batch]))
+            if len(results) != len(batch):
+                raise ValueError(f"Handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def estimate_batcher(comps, **options) -> MicroBatcher:
+    """Batcher of /api/estimate records against one comparable set.
+
+    ``comps`` is a ``ComparableSet`` or a callable returning the current
+    one, read once per batch. Records with an invalid price fail
+    individually with the same ValueError as ``fair_value.estimate_fair_value``.
+    """
+    def valid_price(record: Dict[str, Any]) -> bool:
+        try:
+            return float(record.get("price")) > 0
+        except (TypeError, ValueError):
+            return False
+
+    def handler(records: List[Dict[str, Any]]) -> List[Any]:
+        valid = [i for i, record in enumerate(records) if valid_price(record)]
+        results: List[Any] = [ValueError("Valid property price is required")] * len(records)
+        current = comps() if callable(comps) else comps
+        for i, estimate in zip(valid, estimate_fair_values([records[i] for i in valid], current)):
+            results[i] = estimate
+        return results
+
+    return MicroBatcher(handler, **options)
+
+
+def property_batcher(engine, **options) -> MicroBatcher:
+    """Batcher of single-property re-scores through one engine.
+
+    Each batch is one ``analyze_properties`` call: metrics are computed for
+    the whole batch at once and every property goes into a single AI
+    prompt. Ranks are relative to the batch, or to the engine's leaderboard
+    when it has one.
+    """
+    def handler(properties: List[Any]) -> List[Any]:
+        by_id = {result.property_id: result for result in engine.analyze_properties(list(properties))}
+        return [by_id[prop.id] for prop in properties]
+
+    return MicroBatcher(handler, **options)
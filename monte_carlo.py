@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo risk engine for Real Estate AI Investment System
+Simulates rent, vacancy, expense and exit cap rate uncertainty per property
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from config import Config
+from investment_metrics import annual_debt_service, remaining_balance, solve_irr
+
+logger = logging.getLogger(__name__)
+
+# Input columns of the shared input matrix
+INPUT_COLUMNS = ("purchase_price", "annual_rent", "operating_expenses", "market_cap_rate")
+
+# Output columns, one row per property
+OUTPUT_COLUMNS = (
+    "noi_p5", "noi_p50", "noi_p95",
+    "irr_p5", "irr_p50", "irr_p95",
+    "probability_of_loss",
+)
+
+# Properties simulated together; fixed so results do not depend on worker count
+BLOCK_SIZE = 16
+
+# Below this many property-paths the pool start-up costs more than it saves
+PARALLEL_THRESHOLD = 2_000_000
+
+
+@dataclass
+class SimulationAssumptions:
+    """Distributions for the simulated drivers (rates as fractions)"""
+    horizon_years: int = 5
+    rent_growth_mean: float = 0.03
+    rent_growth_std: float = 0.02
+    vacancy_mean: float = 0.05
+    vacancy_std: float = 0.03
+    expense_growth_mean: float = 0.03
+    expense_shock_std: float = 0.10
+    exit_cap_drift: float = 0.0025
+    exit_cap_std: float = 0.01
+    min_exit_cap_rate: float = 0.02
+    selling_cost: float = 0.03
+
+
+def _simulate_block(inputs: np.ndarray, n_paths: int, assumptions: SimulationAssumptions,
+                    seed_sequence: np.random.SeedSequence) -> np.ndarray:
+    """Simulate every path for a block of properties and summarize them"""
+    rng = np.random.default_rng(seed_sequence)
+    a = assumptions
+    years = a.horizon_years
+    count = inputs.shape[0]
+    price, rent, expenses, market_cap = (inputs[:, i][:, None, None] for i in range(4))
+
+    shape = (count, n_paths, years)
+    rent_path = rent * np.cumprod(1 + rng.normal(a.rent_growth_mean, a.rent_growth_std, shape), axis=2)
+    vacancy = np.clip(rng.normal(a.vacancy_mean, a.vacancy_std, shape), 0.0, 0.5)
+    expense_shock = rng.lognormal(-0.5 * a.expense_shock_std ** 2, a.expense_shock_std, shape)
+    expense_path = expenses * np.power(1 + a.expense_growth_mean, np.arange(1, years + 1)) * expense_shock
+    noi = rent_path * (1 - vacancy) - expense_path
+
+    # Financing as in investment_metrics, balance repaid from the sale proceeds
+    equity = price[:, :, 0] * Config.DEFAULT_DOWN_PAYMENT_PERCENT / 100
+    loan = price[:, :, 0] - equity
+    debt_service = annual_debt_service(loan, Config.DEFAULT_INTEREST_RATE, Config.DEFAULT_AMORTIZATION_YEARS)
+    balance = remaining_balance(loan, Config.DEFAULT_INTEREST_RATE, Config.DEFAULT_AMORTIZATION_YEARS, years)
+
+    entry_cap = np.where(market_cap[:, :, 0] > 0, market_cap[:, :, 0], 0.06)
+    exit_cap = np.maximum(
+        entry_cap + rng.normal(a.exit_cap_drift, a.exit_cap_std, (count, n_paths)),
+        a.min_exit_cap_rate
+    )
+    sale_proceeds = noi[:, :, -1] / exit_cap * (1 - a.selling_cost) - balance
+
+    cash_flows = np.empty((count, n_paths, years + 1))
+    cash_flows[:, :, 0] = -equity
+    cash_flows[:, :, 1:] = noi - debt_service[:, :, None]
+    cash_flows[:, :, -1] += sale_proceeds
+
+    irr = solve_irr(cash_flows)
+    final_noi = noi[:, :, -1]
+
+    out = np.empty((count, len(OUTPUT_COLUMNS)))
+    out[:, 0:3] = np.percentile(final_noi, [5, 50, 95], axis=1).T
+    # No sign change means the equity is never recovered: count it as a total loss
+    out[:, 3:6] = np.percentile(np.where(np.isnan(irr), -1.0, irr), [5, 50, 95], axis=1).T * 100
+    out[:, 6] = np.mean(cash_flows.sum(axis=2) < 0, axis=1)
+    return out
+
+
+def _simulate_range(start: int, stop: int, n_properties: int, n_paths: int, seed: int,
+                    assumptions: Dict[str, Any], input_name: Optional[str] = None,
+                    output_name: Optional[str] = None, inputs: Optional[np.ndarray] = None,
+                    outputs: Optional[np.ndarray] = None):
+    """Simulate properties [start, stop) in fixed blocks.
+
+    In worker processes the input and output matrices are attached from
+    shared memory by name, so nothing but the range is pickled.
+    """
+    shm_in = shm_out = None
+    if input_name is not None:
+        shm_in = shared_memory.SharedMemory(name=input_name)
+        shm_out = shared_memory.SharedMemory(name=output_name)
+        inputs = np.ndarray((n_properties, len(INPUT_COLUMNS)), dtype=np.float64, buffer=shm_in.buf)
+        outputs = np.ndarray((n_properties, len(OUTPUT_COLUMNS)), dtype=np.float64, buffer=shm_out.buf)
+
+    try:
+        settings = SimulationAssumptions(**assumptions)
+        for block_start in range(start, stop, BLOCK_SIZE):
+            block_stop = min(block_start + BLOCK_SIZE, stop)
+            outputs[block_start:block_stop] = _simulate_block(
+                inputs[block_start:block_stop], n_paths, settings,
+                np.random.SeedSequence([seed, block_start])
+            )
+    finally:
+        del inputs, outputs
+        if shm_in is not None:
+            shm_in.close()
+            shm_out.close()
+
+
+def simulate_risk(purchase_price, annual_rent, operating_expenses, market_cap_rate,
+                  n_paths: int = 2000, seed: int = 42,
+                  assumptions: Optional[SimulationAssumptions] = None,
+                  workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Percentile NOI/IRR and probability of loss for every property.
+
+    ``market_cap_rate`` is a fraction. IRR is levered, on the equity from
+    ``Config.DEFAULT_DOWN_PAYMENT_PERCENT``, and in percent like every other
+    rate in the analysis rows (-100 is a total loss). The probability of loss is
+    the share of paths where total equity cash flow is negative. Large runs
+    are sharded across a process pool with shared-memory inputs and outputs;
+    results are identical for any worker count.
+    """
+    assumptions = asdict(assumptions or SimulationAssumptions())
+    inputs = np.column_stack([
+        np.asarray(column, dtype=np.float64)
+        for column in (purchase_price, annual_rent, operating_expenses, market_cap_rate)
+    ])
+    n_properties = inputs.shape[0]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or n_properties * n_paths < PARALLEL_THRESHOLD:
+        outputs = np.empty((n_properties, len(OUTPUT_COLUMNS)))
+        _simulate_range(0, n_properties, n_properties, n_paths, seed, assumptions,
+                        inputs=inputs, outputs=outputs)
+        return {name: outputs[:, i] for i, name in enumerate(OUTPUT_COLUMNS)}
+
+    shm_in = shared_memory.SharedMemory(create=True, size=inputs.nbytes)
+    shm_out = shared_memory.SharedMemory(create=True, size=n_properties * len(OUTPUT_COLUMNS) * 8)
+    try:
+        np.ndarray(inputs.shape, dtype=np.float64, buffer=shm_in.buf)[:] = inputs
+        shared_out = np.ndarray((n_properties, len(OUTPUT_COLUMNS)), dtype=np.float64, buffer=shm_out.buf)
+
+        # Shard on block boundaries so each block keeps its own seed
+        blocks = -(-n_properties // BLOCK_SIZE)
+        per_worker = -(-blocks // workers) * BLOCK_SIZE
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_simulate_range, start, min(start + per_worker, n_properties),
+                                n_properties, n_paths, seed, assumptions, shm_in.name, shm_out.name)
+                for start in range(0, n_properties, per_worker)
+            ]
+            for future in futures:
+                future.result()
+
+        outputs = shared_out.copy()
+        del shared_out
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        shm_out.close()
+        shm_out.unlink()
+
+    logger.info(f"🎲 Simulated {n_properties} properties × {n_paths} paths on {workers} workers")
+    return {name: outputs[:, i] for i, name in enumerate(OUTPUT_COLUMNS)}
+
+
+def simulate_property_risk(properties: Sequence[Any], **options) -> Dict[str, np.ndarray]:
+    """Run ``simulate_risk`` for a list of ``Property`` objects"""
+    def column(name: str) -> np.ndarray:
+        return np.fromiter((getattr(p, name) for p in properties), dtype=np.float64, count=len(properties))
+
+    return simulate_risk(*(column(name) for name in INPUT_COLUMNS), **options)
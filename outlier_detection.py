@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Outlier detection for Real Estate AI Investment System
+Flags mispriced and distressed listings against streaming robust statistics per market
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from market_stats import QuantileSketch, market_key
+
+# Robust z-score at which a high cap rate marks a listing as mispriced
+MISPRICED_Z = 2.5
+
+# Robust z-score at which a low price per square foot marks a listing as distressed
+DISTRESSED_Z = 3.0
+
+# Listings a market needs before anything in it is flagged
+MIN_MARKET_SAMPLES = 30
+
+# Interquartile range of a normal distribution, in standard deviations
+IQR_TO_SIGMA = 1.349
+
+# Scale floor relative to the median, so identical comps do not divide by zero
+MIN_RELATIVE_SCALE = 0.01
+
+MEASURES = ("cap_rate", "price_per_sqft")
+
+
+@dataclass
+class OutlierFlag:
+    """A listing that stands out from its market"""
+    property_id: str
+    market: str
+    category: str
+    cap_rate_z: float
+    price_per_sqft_z: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class OutlierDetector:
+    """Per-market robust z-scores over a stream of listings.
+
+    Each market keeps one quantile sketch per measure, so memory per market
+    is bounded by the sketch's bucket count rather than the listings seen.
+    The median is the centre and the interquartile range, scaled to a
+    standard deviation, the spread; both come from the sketch, so a few
+    extreme listings cannot drag them the way a mean and variance would.
+
+    A cap rate ``mispriced_z`` above its market flags a listing as
+    ``mispriced``; a price per square foot ``distressed_z`` below it,
+    without the income to explain it, flags it as ``distressed``.
+    """
+
+    def __init__(self, mispriced_z: float = MISPRICED_Z, distressed_z: float = DISTRESSED_Z,
+                 min_samples: int = MIN_MARKET_SAMPLES):
+        self.mispriced_z = mispriced_z
+        self.distressed_z = distressed_z
+        self.min_samples = min_samples
+        self.markets: Dict[str, Dict[str, QuantileSketch]] = {}
+
+    def _sketches(self, market: str) -> Dict[str, QuantileSketch]:
+        if market not in self.markets:
+            self.markets[market] = {measure: QuantileSketch() for measure in MEASURES}
+        return self.markets[market]
+
+    def _robust_z(self, sketch: QuantileSketch, values: np.ndarray) -> np.ndarray:
+        if sketch.count < self.min_samples:
+            return np.zeros(len(values))
+        median = sketch.quantile(0.5)
+        scale = max((sketch.quantile(0.75) - sketch.quantile(0.25)) / IQR_TO_SIGMA,
+                    MIN_RELATIVE_SCALE * abs(median), 1e-12)
+        z = (values - median) / scale
+        return np.where(np.isfinite(z), z, 0.0)
+
+    def observe_batch(self, markets: Sequence[str], cap_rate, price_per_sqft) -> Dict[str, np.ndarray]:
+        """Ingest a batch of listings and score each against its market.
+
+        Listings are added to their market's sketches first, so the first
+        batch in a market is judged against itself. Returns ``category``
+        (empty string when not flagged) and both z-scores as arrays.
+        """
+        cap_rate = np.asarray(cap_rate, dtype=np.float64)
+        price_per_sqft = np.asarray(price_per_sqft, dtype=np.float64)
+        keys, inverse = np.unique(np.asarray(markets, dtype=object).astype(str), return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        cap_z = np.zeros(len(cap_rate))
+        psf_z = np.zeros(len(cap_rate))
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+        for slot, market in enumerate(keys):
+            members = order[bounds[slot]:bounds[slot + 1]]
+            sketches = self._sketches(market)
+            for sketch, values, out in ((sketches["cap_rate"], cap_rate[members], cap_z),
+                                        (sketches["price_per_sqft"], price_per_sqft[members], psf_z)):
+                sketch.add_many(values)
+                out[members] = self._robust_z(sketch, values)
+
+        mispriced = cap_z >= self.mispriced_z
+        distressed = ~mispriced & (psf_z <= -self.distressed_z)
+        category = np.where(mispriced, "mispriced", np.where(distressed, "distressed", ""))
+        return {"category": category, "cap_rate_z": cap_z, "price_per_sqft_z": psf_z}
+
+    def observe_rows(self, rows: Sequence[Dict[str, Any]]) -> List[Optional[OutlierFlag]]:
+        """Score analysis rows (``cap_rate`` in percent, ``price_per_sqft``)"""
+        def column(name: str) -> np.ndarray:
+            return np.array([row.get(name) if row.get(name) else np.nan for row in rows], dtype=np.float64)
+
+        markets = [market_key(row) for row in rows]
+        scores = self.observe_batch(markets, column("cap_rate"), column("price_per_sqft"))
+        return [
+            OutlierFlag(str(row["property_id"]), markets[i], str(scores["category"][i]),
+                        float(scores["cap_rate_z"][i]), float(scores["price_per_sqft_z"][i]))
+            if scores["category"][i] else None
+            for i, row in enumerate(rows)
+        ]
+
+    def observe_properties(self, properties: Sequence[Any]) -> Dict[str, OutlierFlag]:
+        """Score ``Property`` objects; flags by property id"""
+        rows = [
+            {
+                "property_id": p.id,
+                "market_id": p.market_id,
+                "city": p.city,
+                "country": p.country,
+                "cap_rate": p.calculate_cap_rate(),
+                "price_per_sqft": p.purchase_price / p.square_footage if p.square_footage else None,
+            }
+            for p in properties
+        ]
+        return {flag.property_id: flag for flag in self.observe_rows(rows) if flag is not None}
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Portfolio optimizer for Real Estate AI Investment System
+Picks the subset of analyzed properties with the best total NOI or score under a capital budget
+"""
+
+import logging
+import math
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Budget units used by the dynamic program; costs are rounded up to a unit,
+# so selections always fit the real budget
+DEFAULT_RESOLUTION = 2000
+
+ShareCap = Union[float, Dict[str, float], None]
+
+
+@dataclass
+class PortfolioSelection:
+    """Chosen properties and their totals"""
+    property_ids: List[str]
+    objective: str
+    budget: float
+    total_cost: float
+    total_value: float
+    by_market: Dict[str, float] = field(default_factory=dict)
+    by_category: Dict[str, float] = field(default_factory=dict)
+    exact: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _cap_units(cap: ShareCap, key: str, budget_units: int) -> int:
+    """Budget units a market or category may use under a capital-share cap"""
+    share = cap.get(key) if isinstance(cap, dict) else cap
+    if share is None:
+        return budget_units
+    return min(budget_units, int(math.floor(share * budget_units + 1e-9)))
+
+
+def _knapsack(costs: np.ndarray, values: np.ndarray, capacity: int):
+    """0/1 knapsack: best value for every budget 0..capacity, plus the take table"""
+    best = np.zeros(capacity + 1)
+    take = np.zeros((len(costs), capacity + 1), dtype=bool)
+    for i, (cost, value) in enumerate(zip(costs, values)):
+        if cost > capacity:
+            continue
+        candidate = best[:capacity + 1 - cost] + value
+        better = candidate > best[cost:]
+        take[i, cost:] = better
+        best[cost:] = np.where(better, candidate, best[cost:])
+    return best, take
+
+
+def _knapsack_items(take: np.ndarray, costs: np.ndarray, units: int) -> List[int]:
+    chosen = []
+    for i in range(len(costs) - 1, -1, -1):
+        if take[i, units]:
+            chosen.append(i)
+            units -= costs[i]
+    return chosen
+
+
+def _grouped_knapsack(groups: Dict[str, List[int]], costs: np.ndarray, values: np.ndarray,
+                      budget_units: int, group_caps: Dict[str, int]) -> List[int]:
+    """Exact selection when every group has its own budget cap.
+
+    Each group is solved as a knapsack up to its cap, then groups are
+    combined with a max-plus convolution over the budget. Only budgets where
+    a group's best value steps up are tried, since the curves are monotone.
+    """
+    total = np.zeros(budget_units + 1)
+    steps = []
+    for key, members in groups.items():
+        capacity = group_caps[key]
+        member_costs = costs[members]
+        best, take = _knapsack(member_costs, values[members], capacity)
+
+        breakpoints = np.concatenate(([0], np.flatnonzero(np.diff(best) > 0) + 1))
+        combined = total.copy()
+        spent = np.zeros(budget_units + 1, dtype=np.int64)
+        for units in breakpoints:
+            candidate = total[:budget_units + 1 - units] + best[units]
+            better = candidate > combined[units:]
+            combined[units:] = np.where(better, candidate, combined[units:])
+            spent[units:] = np.where(better, units, spent[units:])
+        total = combined
+        steps.append((members, member_costs, take, spent))
+
+    chosen = []
+    units = budget_units
+    for members, member_costs, take, spent in reversed(steps):
+        group_units = int(spent[units])
+        chosen.extend(members[i] for i in _knapsack_items(take, member_costs, group_units))
+        units -= group_units
+    return chosen
+
+
+def optimize_portfolio(rows: Sequence[Dict[str, Any]], budget: float, objective: str = "noi",
+                       max_market_share: ShareCap = None, max_category_share: ShareCap = None,
+                       market_field: str = "market_id", cost_field: str = "purchase_price",
+                       resolution: int = DEFAULT_RESOLUTION) -> PortfolioSelection:
+    """Best subset of analysis rows under a capital budget.
+
+    ``objective`` is any numeric row field, usually ``noi`` or the engine's
+    risk-adjusted ``score``; rows with a non-positive objective are never
+    picked. Share caps limit the capital in one market or category, either
+    as one fraction for all or a mapping per key.
+
+    The budget is split into ``resolution`` units with costs rounded up,
+    and the selection is optimal for those rounded costs; budget left over
+    by the rounding is then filled greedily by value per dollar. With caps on a
+    single dimension the grouped program stays exact; when both market and
+    category caps are given, markets are solved exactly and categories are
+    repaired greedily, which is flagged with ``exact=False``.
+    """
+    step = budget / resolution if budget > 0 else 1.0
+    budget_units = resolution if budget > 0 else 0
+
+    costs = np.array([float(row.get(cost_field) or 0.0) for row in rows])
+    values = np.array([float(row.get(objective) or 0.0) for row in rows])
+    units = np.ceil(costs / step - 1e-9).astype(np.int64)
+    markets = [str(row.get(market_field) or "unknown") for row in rows]
+    categories = [str(row.get("category") or "unknown") for row in rows]
+
+    candidates = [i for i in range(len(rows)) if values[i] > 0 and units[i] <= budget_units]
+
+    # Group by the capped dimension; without caps everything is one group
+    if max_market_share is not None:
+        keys, cap = markets, max_market_share
+    elif max_category_share is not None:
+        keys, cap = categories, max_category_share
+    else:
+        keys, cap = ["all"] * len(rows), None
+
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for i in candidates:
+        groups[keys[i]].append(i)
+    group_caps = {key: _cap_units(cap, key, budget_units) for key in groups}
+    chosen = _grouped_knapsack(groups, units, values, budget_units, group_caps)
+
+    market_limits = _share_limits(max_market_share, markets, budget)
+    category_limits = _share_limits(max_category_share, categories, budget)
+    exact = True
+    if max_market_share is not None and max_category_share is not None:
+        chosen, exact = _repair_category_caps(chosen, costs, values, markets, categories, category_limits)
+
+    # Rounded-up costs leave slack in the real budget; spend it greedily
+    chosen = _fill_budget(chosen, candidates, costs, values, markets, categories, budget,
+                          market_limits, category_limits)
+
+    chosen.sort(key=lambda i: values[i], reverse=True)
+    by_market: Dict[str, float] = defaultdict(float)
+    by_category: Dict[str, float] = defaultdict(float)
+    for i in chosen:
+        by_market[markets[i]] += float(costs[i])
+        by_category[categories[i]] += float(costs[i])
+
+    selection = PortfolioSelection(
+        property_ids=[str(rows[i].get("property_id")) for i in chosen],
+        objective=objective,
+        budget=budget,
+        total_cost=float(costs[chosen].sum()) if chosen else 0.0,
+        total_value=float(values[chosen].sum()) if chosen else 0.0,
+        by_market=dict(by_market),
+        by_category=dict(by_category),
+        exact=exact
+    )
+    logger.info(f"💰 Selected {len(chosen)} of {len(rows)} properties "
+                f"(${selection.total_cost:,.0f} of ${budget:,.0f})")
+    return selection
+
+
+def _share_limits(cap: ShareCap, keys: List[str], budget: float) -> Dict[str, float]:
+    """Capital each market or category may use, in dollars"""
+    limits = {}
+    for key in set(keys):
+        share = cap.get(key) if isinstance(cap, dict) else cap
+        limits[key] = budget if share is None else share * budget
+    return limits
+
+
+def _density(costs: np.ndarray, values: np.ndarray, i: int) -> float:
+    return values[i] / costs[i] if costs[i] > 0 else math.inf
+
+
+def _repair_category_caps(chosen: List[int], costs: np.ndarray, values: np.ndarray, markets: List[str],
+                          categories: List[str], category_limits: Dict[str, float]):
+    """Drop the least value-dense picks from categories over their cap"""
+    category_used: Dict[str, float] = defaultdict(float)
+    for i in chosen:
+        category_used[categories[i]] += costs[i]
+
+    kept = sorted(chosen, key=lambda i: _density(costs, values, i), reverse=True)
+    for i in reversed(list(kept)):
+        category = categories[i]
+        if category_used[category] > category_limits[category] + 1e-6:
+            kept.remove(i)
+            category_used[category] -= costs[i]
+    return kept, len(kept) == len(chosen)
+
+
+def _fill_budget(chosen: List[int], candidates: List[int], costs: np.ndarray, values: np.ndarray,
+                 markets: List[str], categories: List[str], budget: float,
+                 market_limits: Dict[str, float], category_limits: Dict[str, float]) -> List[int]:
+    """Add the most value-dense remaining candidates that still fit every limit"""
+    market_used: Dict[str, float] = defaultdict(float)
+    category_used: Dict[str, float] = defaultdict(float)
+    for i in chosen:
+        market_used[markets[i]] += costs[i]
+        category_used[categories[i]] += costs[i]
+
+    used = float(sum(costs[i] for i in chosen))
+    selected = set(chosen)
+    chosen = list(chosen)
+    for i in sorted(candidates, key=lambda i: _density(costs, values, i), reverse=True):
+        if i in selected:
+            continue
+        market, category = markets[i], categories[i]
+        if (used + costs[i] <= budget
+                and market_used[market] + costs[i] <= market_limits[market] + 1e-6
+                and category_used[category] + costs[i] <= category_limits[category] + 1e-6):
+            chosen.append(i)
+            selected.add(i)
+            used += costs[i]
+            market_used[market] += costs[i]
+            category_used[category] += costs[i]
+    return chosen
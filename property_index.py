@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Property lookup index for Real Estate AI Investment System
+O(1) id lookup plus prefix and trigram search over property ids and addresses
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_SEARCH_LIMIT = 25
+
+# Minimum share of query trigrams a candidate must contain to count as a fuzzy match
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PropertyIndex:
+    """Index over analysis result rows.
+
+    Rows are kept by reference; ``get`` is a dict lookup and ``search`` only
+    touches the rows that share a prefix or trigrams with the query.
+    """
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], id_field: str = "property_id",
+                 text_fields: Sequence[str] = ("address",)):
+        self.rows = rows
+        self.id_field = id_field
+        self.by_id: Dict[str, int] = {}
+        # Prefix terms by weight, so heavier matches are found first
+        self._terms: List[List[tuple]] = [[], [], []]
+        self._trigrams: Dict[str, set] = defaultdict(set)
+
+        for position, row in enumerate(rows):
+            property_id = str(row[id_field])
+            self.by_id[property_id] = position
+
+            # Whole id and full text fields get the highest prefix weight,
+            # individual address words a lower one
+            self._terms[0].append((property_id.lower(), position))
+            for field in text_fields:
+                text = str(row.get(field) or "").lower()
+                if not text:
+                    continue
+                self._terms[1].append((text, position))
+                for token in _TOKEN_PATTERN.findall(text):
+                    self._terms[2].append((token, position))
+
+            for gram in _trigrams(" ".join(
+                    [property_id.lower()] + [str(row.get(field) or "").lower() for field in text_fields])):
+                self._trigrams[gram].add(position)
+
+        for terms in self._terms:
+            terms.sort()
+        self._keys = [[term for term, _ in terms] for terms in self._terms]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, property_id: str) -> Optional[Dict[str, Any]]:
+        """Row for a property id, or None"""
+        position = self.by_id.get(property_id)
+        return self.rows[position] if position is not None else None
+
+    def _prefix_matches(self, prefix: str, limit: int) -> Dict[int, int]:
+        # Lighter weights are only scanned once the heavier ones are exhausted,
+        # so stopping at ``limit`` never drops a better match
+        matches: Dict[int, int] = {}
+        for weight, (terms, keys) in enumerate(zip(self._terms, self._keys)):
+            for index in range(bisect_left(keys, prefix), len(terms)):
+                term, position = terms[index]
+                if not term.startswith(prefix):
+                    break
+                matches.setdefault(position, weight)
+                if len(matches) >= limit:
+                    return matches
+        return matches
+
+    def _trigram_matches(self, query: str) -> Dict[int, float]:
+        postings = sorted((self._trigrams.get(gram, set()) for gram in _trigrams(query)), key=len)
+        needed = max(1, math.ceil(MIN_TRIGRAM_SIMILARITY * len(postings)))
+
+        # A match must contain at least one of the rarest (total - needed + 1)
+        # trigrams, so only those postings are used to generate candidates
+        candidates = set().union(*postings[:len(postings) - needed + 1])
+        matches = {}
+        for position in candidates:
+            count = sum(1 for posting in postings if position in posting)
+            if count >= needed:
+                matches[position] = count / len(postings)
+        return matches
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Best matching rows for a partial id or address.
+
+        Prefix matches on the id come first, then prefix matches on the
+        address, then fuzzy trigram matches ordered by similarity.
+        """
+        query = query.strip().lower()
+        if not query:
+            return list(self.rows[:limit])
+
+        ranked: Dict[int, tuple] = {}
+        for position, weight in self._prefix_matches(query, limit).items():
+            ranked[position] = (weight, 0.0)
+        if len(ranked) < limit:
+            for position, similarity in self._trigram_matches(query).items():
+                ranked.setdefault(position, (3, -similarity))
+
+        best = sorted(ranked.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [self.rows[position] for position, _ in best]
@@ -1,14 +1,41 @@
 #!/usr/bin/env python3
 """AI-Powered Real Estate Investment System using Groq API"""
 
+import copy
 import requests
 import json
 import time
 import logging
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
+from config import Config
+from deals_service import deal_from_row, versioned_deals, write_deal_snapshot
+from dedupe import ListingDeduplicator
+from fair_value import ComparableSet, estimate_fair_values, property_record
+from investment_metrics import (
+    PROJECTION_METRIC_NAMES,
+    metrics_for_properties,
+    projection_for_properties,
+    row_metrics,
+)
+from leaderboard import Leaderboard
+from market_stats import MarketAggregates
+from monte_carlo import simulate_property_risk
+from outlier_detection import OutlierDetector
+from run_history import RunHistoryStore
+from sensitivity import evaluate_property_scenarios
+from single_flight import SingleFlight, fingerprint
+from spatial_index import fill_market_cap_rates
+from summary_cube import (
+    build_summary_cube,
+    classify_loss_probability,
+    classify_market_position,
+    classify_risk,
+    distribution,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -36,6 +63,11 @@ PREFERRED_MODELS = [
 MAX_RETRIES = 3
 BASE_DELAY = 2
 
+# Shared by every service and engine in the process, so identical concurrent
+# requests from different users or jobs run once
+_chat_flights = SingleFlight()
+_analysis_flights = SingleFlight()
+
 @dataclass
 class Property:
     id: str
@@ -44,6 +76,13 @@ class Property:
     annual_rent: float
     operating_expenses: float
     market_cap_rate: float
+    category: str = "cap_rate_arbitrage"
+    square_footage: float = 0.0
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    city: str = ""
+    country: str = ""
+    market_id: str = ""
     
     def calculate_noi(self) -> float:
         return self.annual_rent - self.operating_expenses
@@ -60,6 +99,9 @@ class AnalysisResult:
     rank: int
     recommendation: str
     score: float = 0.0
+    metrics: Dict[str, float] = field(default_factory=dict)
+    outlier: str = ""
+    duplicate_of: str = ""
 
 class GroqAIService:
     def __init__(self, api_key: str, base_url: str):
@@ -134,6 +176,13 @@ class GroqAIService:
         return None
     
     def send_chat_completion(self, messages: List[Dict[str, str]], model: str = None) -> Dict[str, Any]:
+        """Chat completion; identical concurrent requests share one API call"""
+        response, shared = _chat_flights.do(
+            fingerprint(self.base_url, self.api_key, model, messages), self._send_chat_completion, messages, model
+        )
+        return copy.deepcopy(response) if shared else response
+    
+    def _send_chat_completion(self, messages: List[Dict[str, str]], model: str = None) -> Dict[str, Any]:
         if not model:
             model = self.select_best_model()
             
@@ -190,32 +239,145 @@ class GroqAIService:
         raise Exception(f"All models failed after {MAX_RETRIES} retries. Tried models: {PREFERRED_MODELS[:self.current_model_index + 1]}")
 
 class RealEstateAnalysisEngine:
-    def __init__(self, groq_service: GroqAIService):
+    def __init__(self, groq_service: GroqAIService, leaderboard: Optional[Leaderboard] = None,
+                 outlier_detector: Optional[OutlierDetector] = None,
+                 deduplicator: Optional[ListingDeduplicator] = None):
         self.groq_service = groq_service
+        # When given, ranks are kept across calls instead of re-sorting each batch
+        self.leaderboard = leaderboard
+        # When given, only listings it flags are sent to the AI
+        self.outlier_detector = outlier_detector
+        # When given, each cluster of duplicate listings is analyzed once
+        self.deduplicator = deduplicator
     
     def analyze_properties(self, properties: List[Property]) -> List[AnalysisResult]:
+        if self.deduplicator is None:
+            return self._analyze_distinct(properties)
+        clusters = self.deduplicator.clusters(properties)
+        if len(clusters) == len(properties):
+            return self._analyze_distinct(properties)
+        
+        logger.info(f"🧬 Analyzing {len(clusters)} distinct listings for {len(properties)} scraped")
+        results = self._analyze_distinct([properties[cluster[0]] for cluster in clusters])
+        return self._fan_out(results, clusters, properties)
+    
+    def _fan_out(self, results: List[AnalysisResult], clusters: List[List[int]],
+                 properties: List[Property]) -> List[AnalysisResult]:
+        """Give the other members of each cluster the representative's recommendation.
+
+        Near-duplicates can be listed at different prices, so each member's
+        metrics are computed from its own listing; only the recommendation,
+        score and outlier flag are reused. Ranks are then reassigned over
+        every listing.
+        """
+        by_id = {properties[cluster[0]].id: cluster for cluster in clusters}
+        verdicts = {}
+        members = []
+        for result in results:
+            representative, *others = by_id[result.property_id]
+            for i in others:
+                prop = properties[i]
+                if not prop.market_cap_rate:
+                    prop.market_cap_rate = properties[representative].market_cap_rate
+                verdicts[prop.id] = result
+                members.append(prop)
+        
+        duplicates = self._metric_results(members)
+        for duplicate in duplicates:
+            result = verdicts[duplicate.property_id]
+            duplicate.recommendation = result.recommendation
+            duplicate.score = result.score
+            duplicate.outlier = result.outlier
+            duplicate.duplicate_of = result.property_id
+        return self._rank(results + duplicates)
+    
+    def _analyze_distinct(self, properties: List[Property]) -> List[AnalysisResult]:
+        if self.leaderboard is not None or self.outlier_detector is not None:
+            # Stateful engines see every call
+            return self._analyze_properties(properties)
+        
+        # Concurrent requests for the same portfolio through the same AI service share
+        # one run, including its AI calls
+        (results, market_cap_rates), shared = _analysis_flights.do(
+            fingerprint(id(self.groq_service), properties), self._analyze_with_market_cap_rates, properties
+        )
+        if not shared:
+            return results
+        for prop, market_cap_rate in zip(properties, market_cap_rates):
+            prop.market_cap_rate = market_cap_rate
+        return copy.deepcopy(results)
+    
+    def _analyze_with_market_cap_rates(self, properties: List[Property]):
+        results = self._analyze_properties(properties)
+        return results, [p.market_cap_rate for p in properties]
+    
+    def _analyze_properties(self, properties: List[Property]) -> List[AnalysisResult]:
+        filled = fill_market_cap_rates(properties)
+        if filled:
+            logger.info(f"📍 Derived market cap rates for {filled} properties from nearby comps")
+        analysis_results = self.compute_results(properties)
+        if self.outlier_detector is None:
+            self._generate_ai_recommendations(analysis_results, properties)
+            return analysis_results
+        
+        flags = self.outlier_detector.observe_properties(properties)
+        for result in analysis_results:
+            flag = flags.get(result.property_id)
+            result.outlier = flag.category if flag else ""
+        self._generate_basic_recommendations([r for r in analysis_results if not r.outlier])
+        flagged = [r for r in analysis_results if r.outlier]
+        if flagged:
+            logger.info(f"🔎 Escalating {len(flagged)} of {len(analysis_results)} outlier listings to AI")
+            self._generate_ai_recommendations(flagged, [p for p in properties if p.id in flags])
+        return analysis_results
+    
+    def compute_results(self, properties: List[Property]) -> List[AnalysisResult]:
+        """Financial metrics and cap-rate ranking, without recommendations"""
+        return self._rank(self._metric_results(properties))
+    
+    def _metric_results(self, properties: List[Property]) -> List[AnalysisResult]:
+        # All metrics are computed over the whole batch at once
+        metrics = metrics_for_properties(properties)
+        projection = projection_for_properties(properties)
+        noi = metrics["noi"]
+        cap_rate = metrics["cap_rate"]
+        
         analysis_results = []
-        for prop in properties:
-            noi = prop.calculate_noi()
-            cap_rate = prop.calculate_cap_rate()
-            
+        for i, prop in enumerate(properties):
             result = AnalysisResult(
                 property_id=prop.id,
-                noi=noi,
-                cap_rate=cap_rate,
+                noi=float(noi[i]),
+                cap_rate=float(cap_rate[i]),
                 rank=0,
                 recommendation="",
-                score=0.0
+                score=0.0,
+                metrics={
+                    **row_metrics(metrics, i),
+                    **row_metrics(projection, i, PROJECTION_METRIC_NAMES)
+                }
             )
             analysis_results.append(result)
+        return analysis_results
+    
+    def _rank(self, analysis_results: List[AnalysisResult]) -> List[AnalysisResult]:
+        if self.leaderboard is not None:
+            for result in analysis_results:
+                self.leaderboard.update(result.property_id, result.cap_rate, result)
+            for result in analysis_results:
+                result.rank = self.leaderboard.rank(result.property_id)
+            analysis_results.sort(key=lambda x: x.rank)
+            return analysis_results
         
         analysis_results.sort(key=lambda x: x.cap_rate, reverse=True)
         for i, result in enumerate(analysis_results):
             result.rank = i + 1
         
-        self._generate_ai_recommendations(analysis_results, properties)
         return analysis_results
     
+    def what_if(self, properties: List[Property], scenarios, **options) -> Dict[str, Any]:
+        """Cap rates and ranks under a grid of shocks, without calling the AI"""
+        return evaluate_property_scenarios(properties, scenarios, **options)
+    
     def _extract_json_from_response(self, content: str) -> Optional[Dict[str, Any]]:
         """Extract JSON from AI response, handling various response formats"""
         import re
@@ -333,14 +495,81 @@ Return JSON in this exact format:
                 result.recommendation = "Pass - Low cap rate"
                 result.score = 40.0
 
-def main():
-    print("🏠 AI-Powered Real Estate Investment System")
-    print("=" * 50)
+def build_output_data(properties: List[Property], results: List[AnalysisResult],
+                      simulation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the dashboard JSON document, including the precomputed summary cube.
     
-    groq_service = GroqAIService(API_KEY, BASE_URL)
-    analysis_engine = RealEstateAnalysisEngine(groq_service)
+    ``simulation`` is the output of ``monte_carlo.simulate_property_risk`` for
+    the same properties; when given, risk levels come from the simulated
+    probability of loss instead of the point score.
+    """
+    properties_by_id = {p.id: p for p in properties}
+    records = [property_record(p) for p in properties]
+    estimates = dict(zip((p.id for p in properties), estimate_fair_values(records, ComparableSet(records))))
+    simulated = {}
+    if simulation is not None:
+        positions = {p.id: i for i, p in enumerate(properties)}
+        simulated = {
+            property_id: {name: float(values[i]) for name, values in simulation.items()}
+            for property_id, i in positions.items()
+        }
+    
+    analysis_rows = []
+    for r in results:
+        prop = properties_by_id[r.property_id]
+        risk = simulated.get(r.property_id)
+        analysis_rows.append({
+            "property_id": r.property_id,
+            "address": prop.address,
+            "purchase_price": prop.purchase_price,
+            "noi": r.noi,
+            "cap_rate": r.cap_rate,
+            "market_cap_rate": prop.market_cap_rate,
+            "rank": r.rank,
+            "score": r.score,
+            "recommendation": r.recommendation,
+            "risk_level": classify_loss_probability(risk["probability_of_loss"]) if risk else classify_risk(r.score),
+            "market_position": classify_market_position(r.cap_rate, prop.market_cap_rate),
+            # A listing flagged against its market is shown in that category
+            "category": r.outlier or prop.category,
+            "market_id": prop.market_id,
+            "city": prop.city,
+            "country": prop.country,
+            "lat": prop.lat,
+            "lng": prop.lng,
+            "estimated_value": estimates[r.property_id]["aiEstimatedValue"],
+            "discount_pct": estimates[r.property_id]["discountPct"],
+            "outlier": r.outlier,
+            "duplicate_of": r.duplicate_of,
+            **r.metrics,
+            **(risk or {})
+        })
     
-    properties = [
+    cube = build_summary_cube(analysis_rows)
+    total = cube["total"]
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "total_properties": len(properties),
+        "analysis_results": analysis_rows,
+        "summary": {
+            "best_cap_rate": max((r.cap_rate for r in results), default=0.0),
+            "average_cap_rate": total["cap_rate_mean"],
+            "total_noi": total["noi_sum"],
+            "top_recommendation": next((r.property_id for r in results if r.rank == 1), None),
+            "risk_distribution": distribution(cube, "risk_level"),
+            "market_position_distribution": distribution(cube, "market_position"),
+            "category_distribution": distribution(cube, "category"),
+            "total_investment": sum(p.purchase_price for p in properties),
+            "average_score": total["score_mean"],
+            "market_stats": MarketAggregates.from_rows(analysis_rows).to_dict(),
+            "cube": cube
+        }
+    }
+
+def sample_properties() -> List[Property]:
+    """Sample portfolio used by the CLI, launcher and dashboard"""
+    return [
         Property(
             id="PROP001",
             address="123 Main St, Downtown",
@@ -374,6 +603,20 @@ def main():
             market_cap_rate=0.045
         )
     ]
+
+def properties_from_records(records: List[Dict[str, Any]]) -> List[Property]:
+    """Build Property objects from JSON records, ignoring unknown keys"""
+    field_names = set(Property.__dataclass_fields__)
+    return [Property(**{k: v for k, v in record.items() if k in field_names}) for record in records]
+
+def main():
+    print("🏠 AI-Powered Real Estate Investment System")
+    print("=" * 50)
+    
+    groq_service = GroqAIService(API_KEY, BASE_URL)
+    analysis_engine = RealEstateAnalysisEngine(groq_service)
+    
+    properties = sample_properties()
     
     print(f"📊 Analyzing {len(properties)} properties...")
     
@@ -389,46 +632,21 @@ def main():
             print(f"   NOI: ${result.noi:,.2f}")
             print(f"   Cap Rate: {result.cap_rate:.2f}%")
             print(f"   Rank: #{result.rank}")
+            print(f"   Cash-on-Cash Return: {result.metrics['cash_on_cash_return']:.2f}%")
+            print(f"   DSCR: {result.metrics['dscr']:.2f}")
+            print(f"   {Config.HOLD_PERIOD_YEARS}-Year IRR: {result.metrics['irr']:.2f}% "
+                  f"(equity multiple {result.metrics['equity_multiple']:.2f}x)")
             print(f"   Score: {result.score:.1f}/100")
             print(f"   Recommendation: {result.recommendation}")
         
-        # Calculate risk distribution
-        risk_distribution = {}
-        for result in results:
-            if result.score >= 80:
-                risk = "low"
-            elif result.score >= 60:
-                risk = "medium"
-            else:
-                risk = "high"
-            risk_distribution[risk] = risk_distribution.get(risk, 0) + 1
+        simulation = simulate_property_risk(properties)
+        print(f"\n🎲 Monte Carlo risk ({len(properties)} properties):")
+        for i, prop in enumerate(properties):
+            print(f"   {prop.id}: P(loss) {simulation['probability_of_loss'][i]:.1%}, "
+                  f"median IRR {simulation['irr_p50'][i]:.1f}% "
+                  f"(5th pct {simulation['irr_p5'][i]:.1f}%)")
         
-        output_data = {
-            "timestamp": datetime.now().isoformat(),
-            "total_properties": len(properties),
-            "analysis_results": [
-                {
-                    "property_id": r.property_id,
-                    "address": next(p.address for p in properties if p.id == r.property_id),
-                    "noi": r.noi,
-                    "cap_rate": r.cap_rate,
-                    "rank": r.rank,
-                    "score": r.score,
-                    "recommendation": r.recommendation,
-                    "risk_level": "low" if r.score >= 80 else "medium" if r.score >= 60 else "high"
-                }
-                for r in results
-            ],
-            "summary": {
-                "best_cap_rate": max(r.cap_rate for r in results),
-                "average_cap_rate": sum(r.cap_rate for r in results) / len(results),
-                "total_noi": sum(r.noi for r in results),
-                "top_recommendation": next(r.property_id for r in results if r.rank == 1),
-                "risk_distribution": risk_distribution,
-                "total_investment": sum(p.purchase_price for p in properties),
-                "average_score": sum(r.score for r in results) / len(results)
-            }
-        }
+        output_data = build_output_data(properties, results, simulation)
         
         print(f"\n📋 JSON Output for Dashboard:")
         print(json.dumps(output_data, indent=2))
@@ -437,6 +655,15 @@ def main():
             json.dump(output_data, f, indent=2)
         print(f"\n💾 Results saved to real_estate_analysis.json")
         
+        deals = versioned_deals([deal_from_row(row) for row in output_data["analysis_results"]])
+        write_deal_snapshot(deals.snapshot(), Config.DEALS_SNAPSHOT_FILE)
+        print(f"🗜️  Deals snapshot saved to {Config.DEALS_SNAPSHOT_FILE}")
+        
+        history = RunHistoryStore()
+        history.record_run(output_data)
+        history.close()
+        print(f"🗂️  Run {output_data['timestamp']} recorded in {history.path}")
+        
     except Exception as e:
         logger.error(f"❌ Analysis failed: {e}")
         print(f"❌ Analysis failed: {e}")
@@ -25,26 +25,58 @@ def print_menu():
     print("4. 📋 Install Dependencies")
     print("5. 🔧 Test API Connection")
     print("6. 📖 Show Help")
+    print("7. 📈 Show Analysis Jobs")
     print("0. 🚪 Exit")
     print()
 
+_worker_pool = None
+
+def get_worker_pool():
+    """Create the background analysis worker pool on first use"""
+    global _worker_pool
+    if _worker_pool is None:
+        from analysis_worker import AnalysisWorkerPool
+        from config import config
+        _worker_pool = AnalysisWorkerPool(history_path=config.HISTORY_DB)
+    return _worker_pool
+
 def run_analysis_engine():
-    """Run the AI analysis engine"""
+    """Submit an AI analysis job to the background worker pool"""
     print("🚀 Starting AI Analysis Engine...")
     print("This will analyze properties and generate investment recommendations.")
     print()
     
     try:
-        result = subprocess.run([sys.executable, "real_estate_ai_engine.py"], 
-                              capture_output=False, text=True)
-        if result.returncode == 0:
-            print("✅ Analysis completed successfully!")
-            print("📁 Results saved to real_estate_analysis.json")
-        else:
-            print("❌ Analysis failed. Check the error messages above.")
-    except FileNotFoundError:
+        from config import config
+        from real_estate_ai_engine import sample_properties
+        
+        job_id = get_worker_pool().submit(sample_properties(), output_path=config.ANALYSIS_FILE)
+        print(f"📥 Analysis job {job_id} submitted and running in the background.")
+        print("📈 Use option 7 to follow its progress.")
+        print(f"📁 Results will be saved to {config.ANALYSIS_FILE}")
+    except ImportError:
         print("❌ real_estate_ai_engine.py not found!")
         print("Make sure you're in the correct directory.")
+    except ValueError as e:
+        print(f"❌ {e}")
+
+def show_analysis_jobs():
+    """Show progress of background analysis jobs"""
+    print("📈 Analysis Jobs:")
+    print("-" * 30)
+    
+    if _worker_pool is None or not _worker_pool.jobs():
+        print("No analysis jobs submitted yet. Run option 1 first.")
+        return
+    
+    for job in _worker_pool.jobs():
+        eta = f"{job.eta_seconds:.0f}s" if job.eta_seconds is not None else "n/a"
+        print(f"   {job.job_id}: {job.status.upper()} "
+              f"{job.completed_chunks}/{job.total_chunks} chunks ({job.percent_complete:.0f}%)")
+        print(f"      {job.processed_properties}/{job.total_properties} properties, "
+              f"{job.throughput:.1f} properties/s, ETA {eta}")
+        if job.error:
+            print(f"      ❌ {job.error}")
 
 def launch_dashboard():
     """Launch the Streamlit dashboard"""
@@ -173,6 +205,7 @@ def show_help():
     print("This system provides AI-powered analysis of real estate investment opportunities.")
     print()
     print("🚀 AI Analysis Engine:")
+    print("   - Runs in a background worker pool; follow progress with option 7")
     print("   - Analyzes property data using Groq's language models")
     print("   - Calculates NOI, Cap Rate, and other financial metrics")
     print("   - Generates investment recommendations and scores")
@@ -192,6 +225,7 @@ def show_help():
     print("📁 Files Generated:")
     print("   - real_estate_analysis.json: Main analysis results")
     print("   - real_estate_analysis.csv: Spreadsheet-friendly format")
+    print("   - analysis_history.db: Every run, for comparisons (python run_history.py --diff)")
     print()
     print("🔗 For more information, see README_REAL_ESTATE_AI.md")
 
@@ -203,9 +237,12 @@ def main():
         print_menu()
         
         try:
-            choice = input("Enter your choice (0-6): ").strip()
+            choice = input("Enter your choice (0-7): ").strip()
             
             if choice == "0":
+                if _worker_pool is not None and _worker_pool.active_jobs():
+                    print("⏳ Waiting for running analysis jobs to finish...")
+                    _worker_pool.shutdown(wait=True)
                 print("👋 Goodbye!")
                 break
             elif choice == "1":
@@ -220,8 +257,10 @@ def main():
                 test_api_connection()
             elif choice == "6":
                 show_help()
+            elif choice == "7":
+                show_analysis_jobs()
             else:
-                print("❌ Invalid choice. Please enter a number between 0-6.")
+                print("❌ Invalid choice. Please enter a number between 0-7.")
             
             print()
             input("Press Enter to continue...")
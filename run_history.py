@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Run history store for Real Estate AI Investment System
+Persists every analysis run to SQLite, keyed by run timestamp and property id
+"""
+
+import argparse
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    total_properties INTEGER NOT NULL,
+    summary_json TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS run_results (
+    run_id TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    score REAL NOT NULL,
+    cap_rate REAL NOT NULL,
+    noi REAL NOT NULL,
+    risk_level TEXT,
+    market_position TEXT,
+    category TEXT,
+    recommendation TEXT,
+    PRIMARY KEY (run_id, property_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_run_results_rank ON run_results (run_id, rank);
+CREATE INDEX IF NOT EXISTS idx_run_results_property ON run_results (property_id, run_id);
+"""
+
+RESULT_COLUMNS = (
+    "property_id", "rank", "score", "cap_rate", "noi",
+    "risk_level", "market_position", "category", "recommendation",
+)
+
+# Both sides of a diff are read through the (run_id, property_id) primary key,
+# so SQLite walks one run and probes the other instead of materializing either.
+DIFF_QUERY = """
+SELECT a.property_id,
+       a.rank AS rank_before, b.rank AS rank_after, a.rank - b.rank AS rank_change,
+       a.score AS score_before, b.score AS score_after, b.score - a.score AS score_delta,
+       a.cap_rate AS cap_rate_before, b.cap_rate AS cap_rate_after
+FROM run_results AS a
+JOIN run_results AS b ON b.run_id = :run_b AND b.property_id = a.property_id
+WHERE a.run_id = :run_a AND abs(a.rank - b.rank) > :min_rank_change
+ORDER BY abs(a.rank - b.rank) DESC, a.property_id
+"""
+
+
+class RunHistoryStore:
+    """SQLite-backed history of analysis runs"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.HISTORY_DB
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, output_data: Dict[str, Any]) -> str:
+        """Persist one engine output document; the run id is its timestamp"""
+        run_id = output_data["timestamp"]
+        summary = {key: value for key, value in output_data.get("summary", {}).items() if key != "cube"}
+
+        with self.conn:
+            self.conn.execute("DELETE FROM run_results WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, total_properties, summary_json) VALUES (?, ?, ?)",
+                (run_id, output_data.get("total_properties", 0), json.dumps(summary))
+            )
+            self.conn.executemany(
+                f"INSERT INTO run_results (run_id, {', '.join(RESULT_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in RESULT_COLUMNS)})",
+                (
+                    (run_id, *(row.get(column) for column in RESULT_COLUMNS))
+                    for row in output_data.get("analysis_results", [])
+                )
+            )
+        return run_id
+
+    def list_runs(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Runs, newest first"""
+        query = "SELECT run_id, total_properties FROM runs ORDER BY run_id DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.conn.execute(query)]
+
+    def latest_run_ids(self, count: int = 2) -> List[str]:
+        return [run["run_id"] for run in self.list_runs(count)]
+
+    def run_summary(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT summary_json FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row["summary_json"]) if row else None
+
+    def top_properties(self, run_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best ranked properties of one run, read through the rank index"""
+        return [
+            dict(row) for row in self.conn.execute(
+                "SELECT * FROM run_results WHERE run_id = ? ORDER BY rank LIMIT ?", (run_id, limit)
+            )
+        ]
+
+    def rank_movers(self, run_a: str, run_b: str, min_rank_change: int = 10) -> List[Dict[str, Any]]:
+        """Score deltas for properties whose rank moved by more than ``min_rank_change``.
+
+        ``rank_change`` is positive when a property climbed between ``run_a``
+        and ``run_b``.
+        """
+        return [
+            dict(row) for row in self.conn.execute(
+                DIFF_QUERY, {"run_a": run_a, "run_b": run_b, "min_rank_change": min_rank_change}
+            )
+        ]
+
+    def score_deltas(self, run_a: str, run_b: str) -> List[Dict[str, Any]]:
+        """Score deltas for every property present in both runs"""
+        return self.rank_movers(run_a, run_b, min_rank_change=-1)
+
+    def property_history(self, property_id: str) -> List[Dict[str, Any]]:
+        """One property across all runs, oldest first"""
+        return [
+            dict(row) for row in self.conn.execute(
+                "SELECT * FROM run_results WHERE property_id = ? ORDER BY run_id", (property_id,)
+            )
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the analysis run history")
+    parser.add_argument("--db", default=Config.HISTORY_DB, help="History database path")
+    parser.add_argument("--diff", nargs="*", metavar="RUN_ID",
+                        help="Compare two runs (defaults to the latest two)")
+    parser.add_argument("--min-rank-change", type=int, default=10)
+    args = parser.parse_args()
+
+    store = RunHistoryStore(args.db)
+
+    if args.diff is not None:
+        run_ids = args.diff or list(reversed(store.latest_run_ids(2)))
+        if len(run_ids) != 2:
+            print("❌ Need two runs to compare.")
+            return
+        print(f"📊 Rank movers between {run_ids[0]} and {run_ids[1]}:")
+        for row in store.rank_movers(run_ids[0], run_ids[1], args.min_rank_change):
+            print(f"   {row['property_id']}: #{row['rank_before']} → #{row['rank_after']} "
+                  f"({row['rank_change']:+d}), score {row['score_delta']:+.1f}")
+    else:
+        print("🗂️  Recorded runs:")
+        for run in store.list_runs():
+            print(f"   {run['run_id']} ({run['total_properties']} properties)")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
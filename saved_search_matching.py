@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Saved-search matching for Real Estate AI Investment System
+Matches incoming deals against many users' UserPrefs with interval trees and inverted indexes
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# UserPrefs fields (src/types/property.ts) -> deal field, for the numeric ranges
+RANGES = {
+    "price": ("minPrice", "maxPrice"),
+    "capRate": ("capRateMin", "capRateMax"),
+}
+
+RISK_LEVELS = ("low", "medium", "high")
+CATEGORIES = ("cap_rate_arbitrage", "mispriced", "distressed")
+
+# Risk preferences that accept every deal
+ANY_RISK = (None, "", "any", "all")
+
+# Intervals per interval-tree leaf, checked directly instead of split further
+LEAF_SIZE = 32
+
+
+def market_key(market: str) -> str:
+    """Index key of a saved market: the city of "City, Country", else the whole name"""
+    return market.split(",", 1)[0].strip().lower()
+
+
+def saved_market_keys(prefs: Dict[str, Any]) -> set:
+    """Keys of a search's saved markets; blank entries are no preference, as in the deals route"""
+    return {market_key(market) for market in prefs.get("markets") or ()} - {""}
+
+
+def deal_market_keys(deal: Dict[str, Any]) -> List[str]:
+    """Keys a deal is found under: its city, country and market id"""
+    keys = {str(deal.get(field) or "").strip().lower() for field in ("city", "country", "marketId")}
+    keys.discard("")
+    return sorted(keys)
+
+
+def _deal_value(deal: Dict[str, Any], field: str) -> float:
+    value = deal.get(field)
+    # The deals route skips a missing or zero cap rate, so it fails any cap rate bound
+    if value is None or (field == "capRate" and not value):
+        return np.nan
+    return float(value)
+
+
+def prefs_match(prefs: Dict[str, Any], deal: Dict[str, Any]) -> bool:
+    """Whether one saved search matches one deal, checked directly.
+
+    Unset bounds and empty lists accept anything, and a deal missing a
+    value fails any bound on it. A saved market matches the deal's city,
+    country or market id; blank markets are ignored.
+    """
+    for field, (low_name, high_name) in RANGES.items():
+        low, high = prefs.get(low_name), prefs.get(high_name)
+        if low is None and high is None:
+            continue
+        value = _deal_value(deal, field)
+        if np.isnan(value) or (low is not None and value < low) or (high is not None and value > high):
+            return False
+    if prefs.get("risk") not in ANY_RISK and deal.get("risk") != prefs["risk"]:
+        return False
+    if prefs.get("categories") and deal.get("category") not in prefs["categories"]:
+        return False
+    markets = saved_market_keys(prefs)
+    if markets and markets.isdisjoint(deal_market_keys(deal)):
+        return False
+    return True
+
+
+class IntervalTree:
+    """Static centered interval tree over closed intervals, answering stabbing queries.
+
+    Each node keeps the intervals that contain its centre twice, sorted by
+    low end and by high end, so the intervals a point stabs at that node
+    are a prefix found with one ``searchsorted``. A query visits one node
+    per level. ``count`` uses two binary searches over all endpoints and
+    does not touch the tree.
+    """
+
+    def __init__(self, lows, highs, ids=None):
+        lows = np.asarray(lows, dtype=np.float64)
+        highs = np.asarray(highs, dtype=np.float64)
+        ids = np.arange(len(lows)) if ids is None else np.asarray(ids, dtype=np.int64)
+        self._sorted_lows = np.sort(lows)
+        self._sorted_highs = np.sort(highs)
+        self._nodes: List[Tuple] = []
+        self._root = self._build(lows, highs, ids) if len(ids) else -1
+
+    def __len__(self) -> int:
+        return len(self._sorted_lows)
+
+    def _build(self, lows: np.ndarray, highs: np.ndarray, ids: np.ndarray) -> int:
+        index = len(self._nodes)
+        self._nodes.append(None)
+        if len(ids) <= LEAF_SIZE:
+            self._nodes[index] = ("leaf", lows, highs, ids)
+            return index
+
+        endpoints = np.concatenate((lows, highs))
+        endpoints = endpoints[np.isfinite(endpoints)]
+        center = float(np.median(endpoints)) if len(endpoints) else 0.0
+        left, right = highs < center, lows > center
+        here = ~(left | right)
+        by_low = np.argsort(lows[here], kind="stable")
+        by_high = np.argsort(-highs[here], kind="stable")
+        node_ids = ids[here]
+        node = ["node", center,
+                lows[here][by_low], node_ids[by_low],
+                -highs[here][by_high], node_ids[by_high],
+                -1, -1]
+        self._nodes[index] = node
+        node[6] = self._build(lows[left], highs[left], ids[left]) if left.any() else -1
+        node[7] = self._build(lows[right], highs[right], ids[right]) if right.any() else -1
+        return index
+
+    def count(self, x: float) -> int:
+        """Number of intervals containing ``x``"""
+        return int(np.searchsorted(self._sorted_lows, x, side="right")
+                   - np.searchsorted(self._sorted_highs, x, side="left"))
+
+    def stab(self, x: float) -> np.ndarray:
+        """Ids of the intervals containing ``x``"""
+        found = []
+        index = self._root
+        while index >= 0:
+            node = self._nodes[index]
+            if node[0] == "leaf":
+                _, lows, highs, ids = node
+                found.append(ids[(lows <= x) & (highs >= x)])
+                break
+            _, center, lows, by_low, negative_highs, by_high, left, right = node
+            if x < center:
+                found.append(by_low[:np.searchsorted(lows, x, side="right")])
+                index = left
+            elif x > center:
+                found.append(by_high[:np.searchsorted(negative_highs, -x, side="right")])
+                index = right
+            else:
+                found.append(by_low)
+                break
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return found[0] if len(found) == 1 else np.concatenate(found)
+
+
+class SavedSearchIndex:
+    """Saved searches indexed for reverse matching: which searches does a deal satisfy?
+
+    Each numeric range gets an interval tree over the searches that bound
+    it; markets, categories and risk get inverted indexes from value to
+    searches. Searches that leave a dimension open are kept in that
+    dimension's ``any`` list. A deal starts from whichever dimension
+    yields the fewest candidates, counted without materializing them, and
+    the remaining conditions are checked on those candidates only, as
+    arrays. ``match_batch`` answers a whole batch at once instead, joining
+    deal values against the search ranges in sorted order.
+
+    The index is built once per batch of searches; rebuild it when they
+    change.
+    """
+
+    def __init__(self, searches: Sequence[Dict[str, Any]]):
+        self.ids = [str(search["id"]) for search in searches]
+        n = len(searches)
+        positions = np.arange(n)
+
+        self.bounds: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.trees: Dict[str, IntervalTree] = {}
+        self.unbounded: Dict[str, np.ndarray] = {}
+        self._open_range: Dict[str, np.ndarray] = {}
+        for field, (low_name, high_name) in RANGES.items():
+            low = np.array([_bound(s, low_name, -np.inf) for s in searches], dtype=np.float64)
+            high = np.array([_bound(s, high_name, np.inf) for s in searches], dtype=np.float64)
+            bounded = np.isfinite(low) | np.isfinite(high)
+            self.bounds[field] = (low, high)
+            # An inverted range matches nothing, so it is left out of the tree
+            indexed = bounded & (low <= high)
+            self.trees[field] = IntervalTree(low[indexed], high[indexed], positions[indexed])
+            self.unbounded[field] = positions[~bounded]
+            self._open_range[field] = ~bounded
+
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self.open: Dict[str, np.ndarray] = {}
+        for dimension, values_of in (
+            ("market", saved_market_keys),
+            ("category", lambda s: set(s.get("categories") or ())),
+            ("risk", lambda s: set() if s.get("risk") in ANY_RISK else {s["risk"]}),
+        ):
+            postings: Dict[str, List[int]] = defaultdict(list)
+            open_searches = []
+            for i, search in enumerate(searches):
+                values = values_of(search)
+                if not values:
+                    open_searches.append(i)
+                for value in values:
+                    postings[value].append(i)
+            self.postings[dimension] = {value: np.array(ids, dtype=np.int64) for value, ids in postings.items()}
+            self.open[dimension] = np.array(open_searches, dtype=np.int64)
+
+        # Per-search columns for checking candidates; risk -1 accepts any
+        self._risk_codes = {risk: code for code, risk in enumerate(sorted(self.postings["risk"]))}
+        self._risk = np.array([self._risk_codes.get(s.get("risk"), -1) for s in searches], dtype=np.int64)
+        self._categories = np.zeros(n, dtype=np.int64)
+        for i, search in enumerate(searches):
+            for category in search.get("categories") or ():
+                self._categories[i] |= _category_bit(category)
+        self._any_market = np.zeros(n, dtype=bool)
+        self._any_market[self.open["market"]] = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _posting(self, dimension: str, values: Iterable[str]) -> np.ndarray:
+        lists = [self.postings[dimension][v] for v in values if v in self.postings[dimension]]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(lists)) if len(lists) > 1 else lists[0]
+
+    def match(self, deal: Dict[str, Any]) -> np.ndarray:
+        """Positions of the saved searches ``deal`` satisfies, ascending"""
+        values = {field: _deal_value(deal, field) for field in RANGES}
+        markets = self._posting("market", deal_market_keys(deal))
+        category, risk = deal.get("category"), deal.get("risk")
+        category_list = self.postings["category"].get(category, np.empty(0, dtype=np.int64))
+        risk_list = self.postings["risk"].get(risk, np.empty(0, dtype=np.int64))
+
+        # Candidate counts per dimension, without building the lists
+        sizes = {
+            field: len(self.unbounded[field]) + (self.trees[field].count(value) if np.isfinite(value) else 0)
+            for field, value in values.items()
+        }
+        sizes["market"] = len(self.open["market"]) + len(markets)
+        sizes["category"] = len(self.open["category"]) + len(category_list)
+        sizes["risk"] = len(self.open["risk"]) + len(risk_list)
+        start = min(sizes, key=sizes.get)
+        if sizes[start] == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if start in RANGES:
+            value = values[start]
+            stabbed = self.trees[start].stab(value) if np.isfinite(value) else np.empty(0, dtype=np.int64)
+            candidates = np.concatenate((self.unbounded[start], stabbed))
+        else:
+            listed = {"market": markets, "category": category_list, "risk": risk_list}[start]
+            candidates = np.concatenate((self.open[start], listed))
+
+        keep = np.ones(len(candidates), dtype=bool)
+        for field, value in values.items():
+            if field == start:
+                continue
+            low, high = self.bounds[field]
+            keep &= self._open_range[field][candidates] | ((low[candidates] <= value) & (value <= high[candidates]))
+        if start != "risk":
+            code = self._risk_codes.get(risk, -2)
+            wanted = self._risk[candidates]
+            keep &= (wanted == -1) | (wanted == code)
+        if start != "category":
+            wanted = self._categories[candidates]
+            keep &= (wanted == 0) | ((wanted & _category_bit(category)) != 0)
+        if start != "market":
+            keep &= self._any_market[candidates] | np.isin(candidates, markets)
+        return np.sort(candidates[keep])
+
+    def match_ids(self, deal: Dict[str, Any]) -> List[str]:
+        return [self.ids[i] for i in self.match(deal).tolist()]
+
+    def _group_candidates(self, market_keys: Sequence[str], category: Optional[str], risk: Optional[str]) -> np.ndarray:
+        """Searches whose market, category and risk all accept deals with these values"""
+        keep = np.ones(len(self), dtype=bool)
+        for dimension, values in (("market", market_keys), ("category", [category]), ("risk", [risk])):
+            accepts = np.zeros(len(self), dtype=bool)
+            accepts[self.open[dimension]] = True
+            accepts[self._posting(dimension, [v for v in values if v is not None])] = True
+            keep &= accepts
+        return np.flatnonzero(keep)
+
+    def match_batch(self, deals: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Every (search position, deal position) match in a batch, grouped by search.
+
+        Deals sharing market keys, category and risk share one candidate
+        list from the inverted indexes. Within such a group the deals are
+        sorted by price, so each candidate's price range selects a
+        contiguous run of them with two binary searches; only the pairs in
+        those runs are checked against the remaining ranges.
+        """
+        groups: Dict[Tuple, List[int]] = defaultdict(list)
+        for j, deal in enumerate(deals):
+            groups[(tuple(deal_market_keys(deal)), deal.get("category"), deal.get("risk"))].append(j)
+        values = {field: np.array([_deal_value(deal, field) for deal in deals], dtype=np.float64) for field in RANGES}
+        sweep, *others = RANGES
+
+        found_searches, found_deals = [], []
+        for (market_keys, category, risk), members in groups.items():
+            candidates = self._group_candidates(market_keys, category, risk)
+            if not len(candidates):
+                continue
+            members = np.array(members, dtype=np.int64)
+            order = np.argsort(values[sweep][members], kind="stable")
+            members = members[order]
+            # Deals without the value sort last and only meet searches that leave it open
+            sorted_values = values[sweep][members]
+            known = sorted_values[:int(np.count_nonzero(~np.isnan(sorted_values)))]
+            low, high = (bound[candidates] for bound in self.bounds[sweep])
+            starts = np.searchsorted(known, low, side="left")
+            ends = np.maximum(np.searchsorted(known, high, side="right"), starts)
+            is_open = self._open_range[sweep][candidates]
+            starts[is_open], ends[is_open] = 0, len(members)
+            counts = ends - starts
+            total = int(counts.sum())
+            if not total:
+                continue
+            searches = np.repeat(candidates, counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+            matched = members[offsets]
+            keep = np.ones(total, dtype=bool)
+            for field in others:
+                value = values[field][matched]
+                low, high = (bound[searches] for bound in self.bounds[field])
+                keep &= self._open_range[field][searches] | ((low <= value) & (value <= high))
+            found_searches.append(searches[keep])
+            found_deals.append(matched[keep])
+
+        if not found_searches:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Sorting one combined key is far cheaper than a two-key lexsort
+        keys = np.concatenate(found_searches) * len(deals) + np.concatenate(found_deals)
+        keys.sort()
+        return np.divmod(keys, len(deals))
+
+    def alerts(self, deals: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Saved search id -> ids of the deals in the batch it matches, for searches with any match"""
+        deals = list(deals)
+        searches, deal_positions = self.match_batch(deals)
+        deal_ids = [str(deal.get("id")) for deal in deals]
+        starts = np.flatnonzero(np.diff(searches, prepend=-1))
+        ends = np.append(starts[1:], len(searches))
+        return {
+            self.ids[int(searches[start])]: [deal_ids[j] for j in deal_positions[start:end].tolist()]
+            for start, end in zip(starts.tolist(), ends.tolist())
+        }
+
+
+def _bound(search: Dict[str, Any], name: str, default: float) -> float:
+    value = search.get(name)
+    return default if value is None else float(value)
+
+
+_CATEGORY_BITS: Dict[str, int] = {category: 1 << i for i, category in enumerate(CATEGORIES)}
+
+
+def _category_bit(category: Optional[str]) -> int:
+    """Bit of a category; categories beyond the known ones get bits of their own as they appear"""
+    if category is None:
+        return 0
+    if category not in _CATEGORY_BITS:
+        _CATEGORY_BITS[category] = 1 << len(_CATEGORY_BITS)
+    return _CATEGORY_BITS[category]
+
+
+def synthetic_searches(n: int, markets: Sequence[str], seed: int = 0) -> List[Dict[str, Any]]:
+    """Random saved searches in the UserPrefs schema, for benchmarks"""
+    rng = np.random.default_rng(seed)
+    searches = []
+    for i in range(n):
+        search: Dict[str, Any] = {"id": f"S{i:06d}"}
+        if rng.random() < 0.9:
+            low = float(np.round(rng.lognormal(12.8, 0.6), -4))
+            search["minPrice"] = low
+            if rng.random() < 0.8:
+                search["maxPrice"] = low * float(np.round(rng.uniform(1.2, 2), 1))
+        if rng.random() < 0.6:
+            search["capRateMin"] = float(np.round(rng.uniform(5, 9), 1))
+        if rng.random() < 0.2:
+            search["capRateMax"] = float(np.round(rng.uniform(8, 12), 1))
+        if rng.random() < 0.9:
+            count = min(len(markets), int(rng.integers(1, 3)))
+            search["markets"] = [str(m) for m in rng.choice(markets, count, replace=False)]
+        if rng.random() < 0.5:
+            search["risk"] = str(rng.choice(RISK_LEVELS))
+        if rng.random() < 0.6:
+            search["categories"] = [str(c) for c in rng.choice(CATEGORIES, int(rng.integers(1, 3)), replace=False)]
+        searches.append(search)
+    return searches
+
+
+def benchmark(deals: Sequence[Dict[str, Any]], searches: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    index = SavedSearchIndex(searches)
+    built = time.perf_counter()
+    searches_matched, _ = index.match_batch(deals)
+    matched = time.perf_counter()
+    return {"build_s": built - start, "match_s": matched - built,
+            "alerts": len(searches_matched), "searches_alerted": len(np.unique(searches_matched))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match new deals against saved searches")
+    parser.add_argument("--searches", help="JSON list of saved searches: an id plus UserPrefs fields")
+    parser.add_argument("--deals", help="Analysis JSON or deal list")
+    parser.add_argument("--output", help="Write saved search id -> deal ids to this JSON file")
+    parser.add_argument("--benchmark", action="store_true", help="Match synthetic deals against synthetic searches")
+    parser.add_argument("--deal-count", type=int, default=10_000)
+    parser.add_argument("--search-count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from deals_service import load_deals, scored_deal, synthetic_deals
+
+    if args.benchmark:
+        deals = [scored_deal(deal) for deal in synthetic_deals(args.deal_count)]
+        cities = sorted({f"{deal['city']}, {deal['country']}" for deal in deals})
+        result = benchmark(deals, synthetic_searches(args.search_count, cities))
+        print(f"🔔 {args.deal_count:,} deals against {args.search_count:,} saved searches: "
+              f"index {result['build_s']:.2f} s, match {result['match_s']:.2f} s, "
+              f"{result['alerts']:,} alerts for {result['searches_alerted']:,} searches")
+        return
+
+    if not args.searches or not args.deals:
+        parser.error("--searches and --deals are required unless --benchmark is given")
+    with open(args.searches, "r", encoding="utf-8") as f:
+        index = SavedSearchIndex(json.load(f))
+    alerts = index.alerts(scored_deal(deal) for deal in load_deals(args.deals))
+    print(f"🔔 {sum(map(len, alerts.values())):,} alerts for {len(alerts):,} of {len(index):,} saved searches")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(alerts, f, indent=2)
+        print(f"💾 Alerts saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Sensitivity analysis for Real Estate AI Investment System
+Evaluates grids of price, rent, expense and market cap rate shocks over every property at once
+"""
+
+import argparse
+import itertools
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from investment_metrics import _divide
+from summary_cube import MARKET_POSITION_TOLERANCE
+
+# Shocked inputs, in the column order of a scenario matrix
+SHOCK_AXES = ("purchase_price", "annual_rent", "operating_expenses", "market_cap_rate")
+
+# Per-scenario × property outputs that ``evaluate_scenarios`` can return
+SCENARIO_FIELDS = ("noi", "cap_rate", "cap_rate_spread", "rank")
+
+# Scenarios evaluated together; bounds the temporaries to a few hundred MB
+SCENARIO_CHUNK = 256
+
+
+def scenario_grid(purchase_price: Sequence[float] = (0.0,), annual_rent: Sequence[float] = (0.0,),
+                  operating_expenses: Sequence[float] = (0.0,),
+                  market_cap_rate: Sequence[float] = (0.0,)) -> np.ndarray:
+    """Every combination of the given shocks, one scenario per row.
+
+    Shocks are fractional changes, so ``annual_rent=(-0.1, 0.0)`` means rents
+    10% lower and unchanged. Columns follow ``SHOCK_AXES``.
+    """
+    return np.array(
+        list(itertools.product(purchase_price, annual_rent, operating_expenses, market_cap_rate)),
+        dtype=np.float64
+    ).reshape(-1, len(SHOCK_AXES))
+
+
+def _rank_descending(values: np.ndarray) -> np.ndarray:
+    """1-based rank of every value within its row, highest first"""
+    order = np.argsort(-values, axis=1)
+    ranks = np.empty(values.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[1] + 1, dtype=np.int32)[None, :], axis=1)
+    return ranks
+
+
+def evaluate_scenarios(purchase_price, annual_rent, operating_expenses, market_cap_rate,
+                       scenarios, fields: Sequence[str] = ("cap_rate", "rank"),
+                       dtype=np.float32) -> Dict[str, Any]:
+    """Evaluate every scenario × property as one broadcast computation.
+
+    ``scenarios`` is a matrix from ``scenario_grid`` (or any ``(n, 4)``
+    array of fractional shocks). Each requested field comes back as an
+    ``(n_scenarios, n_properties)`` array; ranks follow the engine, 1 for
+    the highest cap rate. Per-scenario ``average_cap_rate`` and
+    ``above_market_count`` are always included.
+
+    A price shock scales every cap rate in a scenario by the same factor, so
+    ranks are only computed once per distinct rent and expense shock pair.
+    """
+    unknown = set(fields) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown scenario fields: {', '.join(sorted(unknown))}")
+
+    scenarios = np.asarray(scenarios, dtype=np.float64).reshape(-1, len(SHOCK_AXES))
+    price, rent, expenses, market_cap = (
+        np.asarray(column, dtype=np.float64)[None, :]
+        for column in (purchase_price, annual_rent, operating_expenses, market_cap_rate)
+    )
+    n_scenarios, n_properties = scenarios.shape[0], price.shape[1]
+
+    results: Dict[str, Any] = {
+        field: np.empty((n_scenarios, n_properties), dtype=np.int32 if field == "rank" else dtype)
+        for field in fields
+    }
+    results["scenarios"] = scenarios
+    results["average_cap_rate"] = np.empty(n_scenarios)
+    results["above_market_count"] = np.empty(n_scenarios, dtype=np.int64)
+
+    if "rank" in fields:
+        pairs, pair_index = np.unique(scenarios[:, 1:3], axis=0, return_inverse=True)
+        pair_index = pair_index.reshape(-1)
+        for start in range(0, len(pairs), SCENARIO_CHUNK):
+            chunk = pairs[start:start + SCENARIO_CHUNK]
+            noi = rent * (1 + chunk[:, 0:1]) - expenses * (1 + chunk[:, 1:2])
+            pair_ranks = _rank_descending(_divide(noi, price).astype(dtype))
+            for offset, ranks in enumerate(pair_ranks):
+                results["rank"][pair_index == start + offset] = ranks
+
+    for start in range(0, n_scenarios, SCENARIO_CHUNK):
+        shocks = scenarios[start:start + SCENARIO_CHUNK]
+        rows = slice(start, start + len(shocks))
+
+        noi = rent * (1 + shocks[:, 1:2]) - expenses * (1 + shocks[:, 2:3])
+        cap_rate = _divide(noi, price * (1 + shocks[:, 0:1])) * 100
+        spread = cap_rate - market_cap * (1 + shocks[:, 3:4]) * 100
+
+        results["average_cap_rate"][rows] = cap_rate.mean(axis=1) if n_properties else 0.0
+        results["above_market_count"][rows] = np.count_nonzero(spread > MARKET_POSITION_TOLERANCE, axis=1)
+        for field, values in (("noi", noi), ("cap_rate", cap_rate), ("cap_rate_spread", spread)):
+            if field in fields:
+                results[field][rows] = values
+
+    return results
+
+
+def evaluate_property_scenarios(properties: Sequence[Any], scenarios, **options) -> Dict[str, Any]:
+    """Run ``evaluate_scenarios`` for a list of ``Property`` objects"""
+    def column(name: str) -> np.ndarray:
+        return np.fromiter((getattr(p, name) for p in properties), dtype=np.float64, count=len(properties))
+
+    return evaluate_scenarios(*(column(name) for name in SHOCK_AXES), scenarios, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if grid over the sample properties")
+    for axis, flag in zip(SHOCK_AXES, ("--price", "--rent", "--expenses", "--market-cap")):
+        parser.add_argument(flag, dest=axis, type=float, nargs="+", default=[0.0], metavar="PCT",
+                            help=f"Percent shocks to {axis.replace('_', ' ')}")
+    args = parser.parse_args()
+
+    from real_estate_ai_engine import sample_properties
+
+    properties = sample_properties()
+    grid = scenario_grid(*([value / 100 for value in getattr(args, axis)] for axis in SHOCK_AXES))
+    results = evaluate_property_scenarios(properties, grid)
+
+    print(f"🔀 {len(grid)} scenarios × {len(properties)} properties")
+    for i, shocks in enumerate(grid):
+        label = ", ".join(f"{axis} {shock:+.0%}" for axis, shock in zip(SHOCK_AXES, shocks) if shock)
+        print(f"\n   Scenario {i + 1}: {label or 'base case'} "
+              f"(average cap rate {results['average_cap_rate'][i]:.2f}%)")
+        for j in np.argsort(results["rank"][i]):
+            print(f"      #{results['rank'][i, j]} {properties[j].id}: {results['cap_rate'][i, j]:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Sharded analysis for Real Estate AI Investment System
+Partitions properties into shards, analyzes them on worker processes over a socket protocol and merges the results
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from market_stats import MarketAggregates, market_key
+from monte_carlo import simulate_property_risk
+from summary_cube import distribution, merge_summary_cubes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 3003
+DEFAULT_TOP_K = 10
+
+# Shards per worker, so that faster workers pick up more of the work
+SHARDS_PER_WORKER = 4
+
+PARTITIONS = ("market", "hash")
+
+# Frames are a 4-byte big-endian length followed by that many bytes of UTF-8 JSON
+_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 1 << 30
+
+Address = Tuple[str, int]
+
+
+class ShardError(RuntimeError):
+    """Raised when shards could not be analyzed by any worker"""
+
+
+def send_frame(sock: socket.socket, message: Dict[str, Any]):
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _read_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(min(size - len(buffer), 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed in the middle of a frame")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Next message on the socket, or None when the peer closed it between frames"""
+    first = sock.recv(1)
+    if not first:
+        return None
+    (size,) = _HEADER.unpack(first + _read_exact(sock, _HEADER.size - 1))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"Frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    return json.loads(_read_exact(sock, size))
+
+
+def partition(properties: Sequence[Any], shards: int, by: str = "market") -> List[List[Any]]:
+    """Split properties into at most ``shards`` non-empty shards.
+
+    ``market`` keeps each market whole, so comps, market cap rates and fair
+    values are computed against the same market as in a single-process
+    run; markets are placed largest first on the lightest shard. ``hash``
+    spreads properties evenly by id, which balances better when one market
+    dominates but analyzes each property against its shard's comps only.
+    """
+    if by not in PARTITIONS:
+        raise ValueError(f"Unknown partitioning: {by} (expected one of {', '.join(PARTITIONS)})")
+    buckets: List[List[Any]] = [[] for _ in range(max(1, shards))]
+    if by == "hash":
+        for prop in properties:
+            buckets[zlib.crc32(str(prop.id).encode("utf-8")) % len(buckets)].append(prop)
+        return [bucket for bucket in buckets if bucket]
+
+    markets: Dict[str, List[Any]] = defaultdict(list)
+    for prop in properties:
+        markets[market_key(vars(prop))].append(prop)
+    loads = [(0, i) for i in range(len(buckets))]
+    for members in sorted(markets.values(), key=len, reverse=True):
+        load, i = heapq.heappop(loads)
+        buckets[i].extend(members)
+        heapq.heappush(loads, (load + len(members), i))
+    return [bucket for bucket in buckets if bucket]
+
+
+def analyze_shard(records: List[Dict[str, Any]], use_ai: bool = True, top_k: int = DEFAULT_TOP_K,
+                  simulate: bool = True) -> Dict[str, Any]:
+    """Analyze one shard and return only its mergeable outputs.
+
+    With ``simulate`` risk levels come from Monte Carlo loss probability, as
+    on every other entry point; without it they fall back to the score.
+    Imported lazily for the same reason as ``analysis_worker.analyze_chunk``:
+    the engine needs GROQ_API_KEY when it is imported.
+    """
+    from analysis_worker import analyze_chunk
+    from real_estate_ai_engine import build_output_data, properties_from_records
+
+    properties = properties_from_records(records)
+    simulation = simulate_property_risk(properties) if simulate else None
+    output = build_output_data(properties, analyze_chunk(properties, use_ai), simulation)
+    rows = output["analysis_results"]
+    return {
+        "properties": len(rows),
+        "total_investment": output["summary"]["total_investment"],
+        "top": heapq.nlargest(top_k, rows, key=lambda row: row["cap_rate"]),
+        "cube": output["summary"]["cube"],
+        "market_stats": MarketAggregates.from_rows(rows).to_state(),
+    }
+
+
+def merge_partials(partials: Iterable[Dict[str, Any]], top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """Reduce shard outputs into one report shaped like ``build_output_data``'s summary"""
+    partials = list(partials)
+    top = heapq.nlargest(top_k, (row for p in partials for row in p["top"]), key=lambda row: row["cap_rate"])
+    for rank, row in enumerate(top, 1):
+        row["rank"] = rank
+    cube = merge_summary_cubes(p["cube"] for p in partials)
+    market_stats = MarketAggregates()
+    for p in partials:
+        market_stats.merge(MarketAggregates.from_state(p["market_stats"]))
+    total = cube["total"]
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "total_properties": sum(p["properties"] for p in partials),
+        "top_results": top,
+        "summary": {
+            "best_cap_rate": top[0]["cap_rate"] if top else 0.0,
+            "average_cap_rate": total["cap_rate_mean"],
+            "total_noi": total["noi_sum"],
+            "top_recommendation": top[0]["property_id"] if top else None,
+            "risk_distribution": distribution(cube, "risk_level"),
+            "market_position_distribution": distribution(cube, "market_position"),
+            "category_distribution": distribution(cube, "category"),
+            "total_investment": sum(p["total_investment"] for p in partials),
+            "average_score": total["score_mean"],
+            "market_stats": market_stats.to_dict(),
+            "cube": cube
+        }
+    }
+
+
+class ShardRequestHandler(socketserver.BaseRequestHandler):
+    """Answers ``ping`` and ``analyze`` frames until the coordinator disconnects"""
+
+    def handle(self):
+        while True:
+            try:
+                message = recv_frame(self.request)
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"⚠️ Dropping shard connection from {self.client_address}: {e}")
+                return
+            if message is None:
+                return
+
+            op = message.get("op")
+            start = time.perf_counter()
+            try:
+                if op == "ping":
+                    reply = {"ok": True, "pid": os.getpid()}
+                elif op == "analyze":
+                    partial = analyze_shard(message["properties"], message.get("use_ai", True),
+                                            message.get("top_k", DEFAULT_TOP_K), message.get("simulate", True))
+                    reply = {"ok": True, "partial": partial, "seconds": time.perf_counter() - start}
+                else:
+                    reply = {"ok": False, "error": f"Unknown op: {op}"}
+            except Exception as e:
+                logger.error(f"❌ Shard analysis failed: {e}")
+                reply = {"ok": False, "error": str(e)}
+            send_frame(self.request, reply)
+
+
+class ShardWorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve_worker(host: str = "localhost", port: int = DEFAULT_PORT) -> ShardWorkerServer:
+    """Bind a shard worker; call ``serve_forever`` on the result"""
+    return ShardWorkerServer((host, port), ShardRequestHandler)
+
+
+def _run_local_worker(host: str, ports):
+    server = serve_worker(host, 0)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+class LocalWorkers:
+    """Shard worker processes on this machine, one per core by default"""
+
+    def __init__(self, count: Optional[int] = None, host: str = "localhost"):
+        ports = multiprocessing.Queue()
+        self.processes = [
+            multiprocessing.Process(target=_run_local_worker, args=(host, ports), daemon=True)
+            for _ in range(count or os.cpu_count() or 1)
+        ]
+        for process in self.processes:
+            process.start()
+        self.addresses: List[Address] = [(host, ports.get(timeout=60)) for _ in self.processes]
+
+    def close(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+
+    def __enter__(self) -> "LocalWorkers":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardCoordinator:
+    """Runs shards on a set of workers and merges what they return.
+
+    Each worker gets one connection and pulls the next shard when it
+    finishes one, so a slow or busy host simply takes fewer shards. Only
+    top-K rows, the summary cube and per-market statistics travel back,
+    which keeps the reduce step small whatever the shard size. A worker
+    that drops its connection is retired and its shard goes back to the
+    others; a shard that fails inside a worker is reported, not retried.
+    """
+
+    def __init__(self, workers: Sequence[Address], top_k: int = DEFAULT_TOP_K, timeout: Optional[float] = None):
+        if not workers:
+            raise ValueError("At least one worker address is needed")
+        self.workers = [tuple(address) for address in workers]
+        self.top_k = top_k
+        self.timeout = timeout
+
+    def ping(self) -> List[Dict[str, Any]]:
+        replies = []
+        for address in self.workers:
+            with socket.create_connection(address, self.timeout) as sock:
+                send_frame(sock, {"op": "ping"})
+                replies.append(recv_frame(sock))
+        return replies
+
+    def run(self, properties: Sequence[Any], by: str = "market", shards: Optional[int] = None,
+            use_ai: bool = True, simulate: bool = True) -> Dict[str, Any]:
+        parts = partition(properties, shards or len(self.workers) * SHARDS_PER_WORKER, by)
+        partials: Dict[int, Dict[str, Any]] = {}
+        timings: List[Dict[str, Any]] = []
+        errors: Dict[int, str] = {}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        live = list(self.workers)
+        remaining = list(range(len(parts)))
+        while remaining:
+            if not live:
+                raise ShardError(f"No workers left with {len(remaining)} of {len(parts)} shards unanalyzed")
+            pending = list(reversed(remaining))
+            lost: List[Address] = []
+
+            def drive(address: Address):
+                try:
+                    sock = socket.create_connection(address, self.timeout)
+                except OSError as e:
+                    logger.warning(f"⚠️ Shard worker {address[0]}:{address[1]} unreachable: {e}")
+                    with lock:
+                        lost.append(address)
+                    return
+                with sock:
+                    while True:
+                        with lock:
+                            if not pending:
+                                return
+                            i = pending.pop()
+                        try:
+                            send_frame(sock, {"op": "analyze", "properties": [vars(p) for p in parts[i]],
+                                              "use_ai": use_ai, "top_k": self.top_k,
+                                              "simulate": simulate})
+                            reply = recv_frame(sock)
+                            if reply is None:
+                                raise ConnectionError("Worker closed the connection")
+                        except (OSError, ValueError) as e:
+                            logger.warning(f"⚠️ Shard worker {address[0]}:{address[1]} lost: {e}")
+                            with lock:
+                                lost.append(address)
+                            return
+                        with lock:
+                            if reply["ok"]:
+                                partials[i] = reply["partial"]
+                                timings.append({"shard": i, "worker": f"{address[0]}:{address[1]}",
+                                                "properties": len(parts[i]), "seconds": reply["seconds"]})
+                            else:
+                                errors[i] = reply["error"]
+
+            threads = [threading.Thread(target=drive, args=(address,), daemon=True) for address in live]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            live = [address for address in live if address not in lost]
+            remaining = [i for i in range(len(parts)) if i not in partials and i not in errors]
+
+        if errors:
+            raise ShardError(f"{len(errors)} of {len(parts)} shards failed: {next(iter(errors.values()))}")
+
+        report = merge_partials((partials[i] for i in range(len(parts))), self.top_k)
+        report["shards"] = sorted(timings, key=lambda timing: timing["shard"])
+        report["elapsed_seconds"] = time.perf_counter() - start
+        logger.info(f"✅ {report['total_properties']} properties in {len(parts)} shards on "
+                    f"{len(self.workers)} workers in {report['elapsed_seconds']:.2f}s")
+        return report
+
+
+def parse_address(value: str) -> Address:
+    host, _, port = value.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze properties in shards across worker processes and hosts")
+    parser.add_argument("--worker", action="store_true", help="Run a shard worker instead of a coordinator")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--input", help="JSON list of property records to analyze")
+    parser.add_argument("--workers", nargs="+", default=[], metavar="HOST:PORT", help="Remote shard workers")
+    parser.add_argument("--local", type=int, default=0, help="Shard workers to start on this machine")
+    parser.add_argument("--by", choices=PARTITIONS, default="market")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--no-ai", action="store_true", help="Use rule-based recommendations only")
+    parser.add_argument("--output", help="Write the merged report to this JSON file")
+    args = parser.parse_args()
+
+    if args.worker:
+        server = serve_worker(args.host, args.port)
+        print(f"🧩 Shard worker listening on {args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    if not args.input:
+        parser.error("--input is required for a coordinator")
+    from real_estate_ai_engine import properties_from_records
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        properties = properties_from_records(json.load(f))
+
+    local = LocalWorkers(args.local) if args.local or not args.workers else None
+    try:
+        workers = [parse_address(worker) for worker in args.workers] + (local.addresses if local else [])
+        report = ShardCoordinator(workers, args.top_k).run(properties, args.by, use_ai=not args.no_ai)
+    finally:
+        if local:
+            local.close()
+
+    print(f"📊 {report['total_properties']} properties on {len(workers)} workers "
+          f"in {report['elapsed_seconds']:.2f}s")
+    for row in report["top_results"]:
+        print(f"   #{row['rank']} {row['property_id']}: {row['cap_rate']:.2f}% cap rate")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
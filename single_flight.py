@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Request coalescing for Real Estate AI Investment System
+Concurrent calls with the same input fingerprint share one in-flight computation
+"""
+
+import dataclasses
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+def _encode(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return repr(value)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-like values, dataclasses included"""
+    payload = json.dumps(parts, sort_keys=True, default=_encode, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """At most one in-flight call per key.
+
+    The first caller for a key runs the function; callers that arrive
+    while it runs wait for it and receive the same result or exception.
+    Nothing is cached: once the call finishes, the next caller starts a
+    new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """Run or join the call for ``key``; returns (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.followers += 1
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.followers > 0
+            call.done.set()
+        return call.result, shared
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
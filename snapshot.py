@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Binary snapshots for Real Estate AI Investment System
+Versioned files of named arrays and JSON records that open by memory-mapping, without parsing rows
+"""
+
+import json
+import mmap
+import os
+import struct
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"RESNAP\x00\x00"
+FORMAT_VERSION = 1
+
+# Magic, format version, header length; the JSON header follows
+_PREAMBLE = struct.Struct("<8sIQ")
+
+# Arrays start on cache-line boundaries
+ALIGNMENT = 64
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a file is not a snapshot or was written in another format version"""
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None) -> int:
+    """Write named arrays and JSON metadata to ``path``; returns the file size.
+
+    The file is written next to the target and swapped in, so a reader that
+    opens it mid-write still maps the previous snapshot.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout: Dict[str, Tuple[int, str, List[int]]] = {}
+    # Offsets are relative to the end of the header, so they do not depend on its length
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = (offset, array.dtype.str, list(array.shape))
+        offset += array.nbytes
+
+    header = json.dumps({"meta": meta or {}, "arrays": layout}, separators=(",", ":")).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header))
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][0])
+            f.write(array.tobytes())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class Snapshot:
+    """A snapshot file mapped read-only into memory.
+
+    Opening reads only the preamble and JSON header; every array is a
+    zero-copy view of the mapping, so pages are loaded by the OS as
+    queries touch them and the open cost does not grow with row count.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < _PREAMBLE.size:
+                raise SnapshotFormatError(f"{path} is too short to be a snapshot")
+            magic, format_version, header_length = _PREAMBLE.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise SnapshotFormatError(f"{path} is not a snapshot")
+            if format_version != FORMAT_VERSION:
+                raise SnapshotFormatError(
+                    f"{path} has snapshot format {format_version}; this build reads format {FORMAT_VERSION}"
+                )
+            header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        except Exception:
+            self._map.close()
+            raise
+        self.meta: Dict[str, Any] = header["meta"]
+        data_start = _aligned(_PREAMBLE.size + header_length)
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in header["arrays"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape)) if shape else 1
+            if count == 0:
+                self.arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            array = np.frombuffer(self._map, dtype=dtype, count=count, offset=data_start + offset)
+            self.arrays[name] = array.reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._map)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def close(self):
+        """Drop the arrays and unmap the file; views still held elsewhere keep the mapping alive"""
+        self.arrays = {}
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_records(records: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """JSON records as one byte blob and the offsets between them"""
+    encoded = [json.dumps(record, separators=(",", ":"), default=float).encode("utf-8") for record in records]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(record) for record in encoded], out=offsets[1:])
+    return {"blob": np.frombuffer(b"".join(encoded), dtype=np.uint8), "offsets": offsets}
+
+
+class LazyRecords(Sequence):
+    """Records of ``encode_records`` decoded one at a time, when they are read"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return json.loads(self.blob[start:end].tobytes())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def encode_keys(keys: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Keys sorted as fixed-width UTF-8 bytes, with each key's original position"""
+    encoded = np.array([str(key).encode("utf-8") for key in keys], dtype=bytes)
+    positions = np.argsort(encoded, kind="stable")
+    return {"sorted": encoded[positions], "positions": positions}
+
+
+class KeyIndex:
+    """Position lookup over ``encode_keys`` arrays by binary search, with ``dict.get`` semantics.
+
+    When a key repeats, the last position wins, as it would in a dict.
+    """
+
+    def __init__(self, keys: np.ndarray, positions: np.ndarray):
+        self.keys = keys
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        encoded = str(key).encode("utf-8")
+        i = int(np.searchsorted(self.keys, encoded, side="right")) - 1
+        if i < 0 or self.keys[i] != encoded:
+            return default
+        return int(self.positions[i])
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Spatial index for Real Estate AI Investment System
+Grid-hashed property coordinates with haversine k-nearest and radius queries
+"""
+
+import math
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometres per degree of latitude
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+DEFAULT_CELL_KM = 2.0
+
+# Nearest comps used for a local market cap rate
+DEFAULT_COMPS = 10
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in kilometres; arguments broadcast"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Points bucketed into a lat/lng grid and stored sorted by cell.
+
+    A query only reads the cells overlapping its bounding box: the cells
+    are found with one ``searchsorted`` over the occupied cell keys and
+    their points are contiguous slices, so exact haversine distances are
+    computed for a few hundred candidates instead of every point. Points
+    without coordinates (NaN) are left out.
+    """
+
+    def __init__(self, lat, lng, cell_km: float = DEFAULT_CELL_KM):
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        self.cell_degrees = cell_km / KM_PER_DEGREE
+        self.rows = int(math.ceil(180 / self.cell_degrees)) + 1
+        self.cols = int(math.ceil(360 / self.cell_degrees))
+
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lng))
+        keys = self._cell_keys(lat[valid], lng[valid])
+        order = np.argsort(keys, kind="stable")
+        self.ids = valid[order]
+        self.lat = lat[self.ids]
+        self.lng = lng[self.ids]
+
+        sorted_keys = keys[order]
+        self._keys, self._starts = np.unique(sorted_keys, return_index=True)
+        self._ends = np.append(self._starts[1:], len(sorted_keys))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _row(self, lat) -> np.ndarray:
+        return np.clip(np.floor((np.asarray(lat) + 90) / self.cell_degrees), 0, self.rows - 1).astype(np.int64)
+
+    def _col(self, lng) -> np.ndarray:
+        return np.floor((np.asarray(lng) + 180) / self.cell_degrees).astype(np.int64) % self.cols
+
+    def _cell_keys(self, lat, lng) -> np.ndarray:
+        return self._row(lat) * self.cols + self._col(lng)
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """Positions of every point in the cells overlapping the query box"""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(abs(lat) + lat_span, 90.0)))
+        lng_span = 180.0 if cos_lat < 1e-9 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+
+        first_row, last_row = int(self._row(lat - lat_span)), int(self._row(lat + lat_span))
+        first = math.floor((lng - lng_span + 180) / self.cell_degrees)
+        last = math.floor((lng + lng_span + 180) / self.cell_degrees)
+        all_cols = lng_span >= 180.0 or last - first + 1 >= self.cols
+        width = self.cols if all_cols else last - first + 1
+
+        if (last_row - first_row + 1) * width > len(self._keys):
+            # A box with more cells than are occupied (a wide search over a
+            # sparse index) filters the occupied keys instead of listing cells
+            key_rows, key_cols = np.divmod(self._keys, self.cols)
+            inside = (key_rows >= first_row) & (key_rows <= last_row)
+            if not all_cols:
+                inside &= (key_cols - first) % self.cols < width
+            slots = np.flatnonzero(inside)
+        else:
+            rows = np.arange(first_row, last_row + 1)
+            cols = np.arange(first, first + width) % self.cols
+            keys = (rows[:, None] * self.cols + cols[None, :]).ravel()
+            slots = np.searchsorted(self._keys, keys)
+            found = slots < len(self._keys)
+            found[found] = self._keys[slots[found]] == keys[found]
+            slots = slots[found]
+
+        # Expand the occupied cells' [start, end) slices without a Python loop
+        starts = self._starts[slots]
+        lengths = self._ends[slots] - starts
+        offsets = np.cumsum(lengths) - lengths
+        return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+    def radius(self, lat: float, lng: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of every point within ``radius_km``, nearest first"""
+        positions = self._candidates(lat, lng, radius_km)
+        distances = haversine_km(lat, lng, self.lat[positions], self.lng[positions])
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.ids[positions[order]], distances[order]
+
+    def nearest(self, lat: float, lng: float, k: int = DEFAULT_COMPS,
+                max_distance_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of the ``k`` nearest points, nearest first.
+
+        The search radius starts at one cell and doubles until it holds
+        ``k`` points, so only the neighbourhood of the query is read. An
+        index of at most ``k`` points is searched directly.
+        """
+        limit = max_distance_km if max_distance_km is not None else math.pi * EARTH_RADIUS_KM
+        if len(self) <= k:
+            distances = haversine_km(lat, lng, self.lat, self.lng)
+            order = np.argsort(distances, kind="stable")
+            order = order[distances[order] <= limit]
+            return self.ids[order], distances[order]
+        radius_km = min(self.cell_degrees * KM_PER_DEGREE, limit)
+        while True:
+            ids, distances = self.radius(lat, lng, radius_km)
+            if len(ids) >= k or radius_km >= limit:
+                return ids[:k], distances[:k]
+            radius_km = min(radius_km * 2, limit)
+
+
+def local_market_cap_rates(lat, lng, cap_rate, k: int = DEFAULT_COMPS,
+                           max_distance_km: Optional[float] = None,
+                           index: Optional[SpatialIndex] = None,
+                           query_rows: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Median cap rate of each property's ``k`` nearest comps.
+
+    ``cap_rate`` is a fraction per property and the property itself is
+    never its own comp. Properties without coordinates, or without comps in
+    range, get NaN so callers can keep their own market cap rate.
+
+    Every property is a comp, but only ``query_rows`` (default: all) are
+    looked up; the others get NaN, so the cost follows the rows asked for.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    cap_rate = np.asarray(cap_rate, dtype=np.float64)
+    index = index or SpatialIndex(lat, lng)
+
+    local = np.full(len(lat), np.nan)
+    rows = np.arange(len(lat)) if query_rows is None else np.asarray(query_rows, dtype=np.int64)
+    for i in rows[np.isfinite(lat[rows]) & np.isfinite(lng[rows])]:
+        ids, _ = index.nearest(lat[i], lng[i], k + 1, max_distance_km)
+        comps = cap_rate[ids[ids != i][:k]]
+        comps = comps[np.isfinite(comps)]
+        if len(comps):
+            local[i] = np.median(comps)
+    return local
+
+
+def property_coordinates(properties: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude and longitude columns of ``Property`` objects, NaN when missing"""
+    def column(name: str) -> np.ndarray:
+        return np.array([np.nan if getattr(p, name, None) is None else getattr(p, name) for p in properties],
+                        dtype=np.float64)
+
+    return column("lat"), column("lng")
+
+
+def fill_market_cap_rates(properties: Sequence[Any], k: int = DEFAULT_COMPS,
+                          max_distance_km: Optional[float] = None) -> int:
+    """Set a comp-based ``market_cap_rate`` on properties that lack one.
+
+    Comps are the other properties in the batch, valued at their own going-in
+    cap rate. Returns how many properties were filled.
+    """
+    lat, lng = property_coordinates(properties)
+    missing = [i for i, p in enumerate(properties) if not p.market_cap_rate and np.isfinite(lat[i])]
+    if not missing:
+        return 0
+
+    cap_rate = np.array([p.calculate_cap_rate() / 100 if p.purchase_price > 0 else np.nan for p in properties])
+    local = local_market_cap_rates(lat, lng, cap_rate, k, max_distance_km, query_rows=missing)
+    filled = 0
+    for i in missing:
+        if np.isfinite(local[i]):
+            properties[i].market_cap_rate = float(local[i])
+            filled += 1
+    return filled
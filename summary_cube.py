@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Summary cube for Real Estate AI Investment System
+Single-pass group-by of analysis results over risk level, market position and category
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+# Dimension values are fixed so every band is always present in the output,
+# even when no property falls into it.
+RISK_LEVELS = ("low", "medium", "high")
+MARKET_POSITIONS = ("above_market", "at_market", "below_market")
+CATEGORIES = ("cap_rate_arbitrage", "mispriced", "distressed")
+
+DIMENSIONS = ("risk_level", "market_position", "category")
+MEASURES = ("noi", "cap_rate", "score")
+
+# Cap rate spread (percentage points) treated as "at market"
+MARKET_POSITION_TOLERANCE = 0.5
+
+
+def classify_risk(score: float) -> str:
+    """Map an investment score (0-100) to a risk band"""
+    if score >= 80:
+        return "low"
+    elif score >= 60:
+        return "medium"
+    return "high"
+
+
+def classify_loss_probability(probability_of_loss: float) -> str:
+    """Map a simulated probability of loss (0-1) to a risk band"""
+    if probability_of_loss < 0.10:
+        return "low"
+    elif probability_of_loss < 0.30:
+        return "medium"
+    return "high"
+
+
+def classify_market_position(cap_rate: float, market_cap_rate: float) -> str:
+    """Compare a property cap rate (%) with its market cap rate (fraction)"""
+    spread = cap_rate - market_cap_rate * 100
+    if spread > MARKET_POSITION_TOLERANCE:
+        return "above_market"
+    elif spread < -MARKET_POSITION_TOLERANCE:
+        return "below_market"
+    return "at_market"
+
+
+def cell_key(risk_level: str, market_position: str, category: str) -> str:
+    """JSON-friendly key for a cube cell"""
+    return f"{risk_level}|{market_position}|{category}"
+
+
+def _empty_aggregate() -> Dict[str, float]:
+    aggregate = {"count": 0}
+    for measure in MEASURES:
+        aggregate[f"{measure}_sum"] = 0.0
+        aggregate[f"{measure}_mean"] = 0.0
+    return aggregate
+
+
+def _add(aggregate: Dict[str, float], values: Dict[str, float]):
+    aggregate["count"] += 1
+    for measure in MEASURES:
+        aggregate[f"{measure}_sum"] += values[measure]
+
+
+def _finalize(aggregate: Dict[str, float]):
+    count = aggregate["count"]
+    for measure in MEASURES:
+        aggregate[f"{measure}_mean"] = aggregate[f"{measure}_sum"] / count if count else 0.0
+
+
+def empty_summary_cube() -> Dict[str, Any]:
+    """Cube with every cell and margin present and zeroed"""
+    dimension_values = dict(zip(DIMENSIONS, (RISK_LEVELS, MARKET_POSITIONS, CATEGORIES)))
+    return {
+        "dimensions": {name: list(values) for name, values in dimension_values.items()},
+        "measures": list(MEASURES),
+        "cells": {
+            cell_key(risk, position, category): _empty_aggregate()
+            for risk in RISK_LEVELS
+            for position in MARKET_POSITIONS
+            for category in CATEGORIES
+        },
+        "margins": {
+            name: {value: _empty_aggregate() for value in values}
+            for name, values in dimension_values.items()
+        },
+        "total": _empty_aggregate(),
+    }
+
+
+def build_summary_cube(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate analysis rows into the summary cube in one pass.
+
+    Each row needs ``risk_level``, ``market_position``, ``category``, ``noi``,
+    ``cap_rate`` and ``score``. Unknown dimension values are added on the fly
+    rather than dropped.
+    """
+    cube = empty_summary_cube()
+    cells = cube["cells"]
+    margins = cube["margins"]
+
+    for row in rows:
+        values = {measure: float(row.get(measure) or 0.0) for measure in MEASURES}
+        coordinates = tuple(row[name] for name in DIMENSIONS)
+
+        _add(cells.setdefault(cell_key(*coordinates), _empty_aggregate()), values)
+        for name, value in zip(DIMENSIONS, coordinates):
+            if value not in margins[name]:
+                margins[name][value] = _empty_aggregate()
+                cube["dimensions"][name].append(value)
+            _add(margins[name][value], values)
+        _add(cube["total"], values)
+
+    return finalize_summary_cube(cube)
+
+
+def finalize_summary_cube(cube: Dict[str, Any]) -> Dict[str, Any]:
+    """Recompute means from sums and counts"""
+    for aggregate in cube["cells"].values():
+        _finalize(aggregate)
+    for margin in cube["margins"].values():
+        for aggregate in margin.values():
+            _finalize(aggregate)
+    _finalize(cube["total"])
+    return cube
+
+
+def merge_summary_cubes(cubes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine cubes built over disjoint sets of rows into one.
+
+    Counts and sums add, and means are recomputed from them, so merging
+    per-shard cubes gives the cube of all rows.
+    """
+    merged = empty_summary_cube()
+
+    def add(target: Dict[str, float], source: Dict[str, float]):
+        target["count"] += source["count"]
+        for measure in MEASURES:
+            target[f"{measure}_sum"] += source[f"{measure}_sum"]
+
+    for cube in cubes:
+        for key, aggregate in cube["cells"].items():
+            add(merged["cells"].setdefault(key, _empty_aggregate()), aggregate)
+        for name, margin in cube["margins"].items():
+            for value, aggregate in margin.items():
+                if value not in merged["margins"][name]:
+                    merged["margins"][name][value] = _empty_aggregate()
+                    merged["dimensions"][name].append(value)
+                add(merged["margins"][name][value], aggregate)
+        add(merged["total"], cube["total"])
+
+    return finalize_summary_cube(merged)
+
+
+def distribution(cube: Dict[str, Any], dimension: str) -> Dict[str, int]:
+    """Counts per value of one dimension, every value included"""
+    return {value: aggregate["count"] for value, aggregate in cube["margins"][dimension].items()}
+
+
+def cube_cell(cube: Dict[str, Any], risk_level: str, market_position: str,
+              category: str) -> Optional[Dict[str, float]]:
+    """Look up a single cell of the cube"""
+    return cube["cells"].get(cell_key(risk_level, market_position, category))
+
+
+def ensure_dimensions(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in cube dimensions missing from rows written by older engine versions"""
+    if "risk_level" not in row:
+        row["risk_level"] = classify_risk(float(row.get("score") or 0.0))
+    if "market_position" not in row:
+        if row.get("market_cap_rate") is not None:
+            row["market_position"] = classify_market_position(
+                float(row.get("cap_rate") or 0.0), float(row["market_cap_rate"])
+            )
+        else:
+            row["market_position"] = "unknown"
+    row.setdefault("category", "unknown")
+    return row
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for local chat query answering
+"""
+
+import json
+import threading
+import time
+import urllib.request
+
+from chat_query_planner import CONTEXT_DEALS, CONTEXT_FIELDS, ChatAssistant, plan_query
+from deals_service import DealStore, serve, synthetic_deals
+
+LOCATIONS = [("mumbai", "india"), ("austin", "usa"), ("london", "uk")]
+
+class RecordingService:
+    """Stands in for GroqAIService and records the messages it is sent"""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_chat_completion(self, messages, model=None):
+        self.messages.append(messages)
+        return {"choices": [{"message": {"content": "• Consider the Mumbai deals"}}]}
+
+def test_plans():
+    """Test intent recognition on common questions"""
+    print("🧭 Testing Query Plans...")
+
+    plan = plan_query("What are the top 3 deals by cap rate?", LOCATIONS)
+    assert (plan.intent, plan.measure, plan.descending, plan.limit) == ("top", "capRate", True, 3)
+
+    plan = plan_query("Best five deals under $500k in Mumbai", LOCATIONS)
+    assert plan.intent == "top" and plan.limit == 5 and plan.measure == "score"
+    assert plan.ranges == {"price": (None, 500000.0)} and plan.markets == ["mumbai"]
+
+    plan = plan_query("How many distressed high-risk deals are in London?", LOCATIONS)
+    assert (plan.intent, plan.category, plan.risk, plan.markets) == ("count", "distressed", "high", ["london"])
+
+    plan = plan_query("median cap rate of deals between $200k and $400k", LOCATIONS)
+    assert (plan.intent, plan.statistic, plan.measure) == ("aggregate", "median", "capRate")
+    assert plan.ranges == {"price": (200000.0, 400000.0)}
+
+    plan = plan_query("discount over 10% and cap rate above 7%", LOCATIONS)
+    assert plan.ranges == {"discountPct": (10.0, None), "capRate": (7.0, None)}
+
+    plan = plan_query("cheapest two properties", LOCATIONS)
+    assert (plan.measure, plan.descending, plan.limit) == ("price", False, 2)
+
+    plan = plan_query("list properties with price over 2 million", LOCATIONS)
+    assert (plan.intent, plan.measure, plan.descending) == ("top", "price", True)
+    assert plan.ranges == {"price": (2000000.0, None)}
+    plan = plan_query("list properties with price under 2 million", LOCATIONS)
+    assert (plan.measure, plan.descending) == ("price", False)
+
+    for question in ("Should I invest in Mumbai or London?", "Why is the top deal so cheap?",
+                     "What are the main risks in Austin?", "Tell me about the market"):
+        assert plan_query(question, LOCATIONS).intent == "open", question
+
+    print("✅ Query plan test passed!\n")
+
+def test_local_answers():
+    """Test local answers against direct store queries"""
+    print("🏠 Testing Local Answers...")
+
+    store = DealStore(synthetic_deals(20000, seed=4))
+    service = RecordingService()
+    assistant = ChatAssistant(store, service)
+
+    answer = assistant.answer("What are the top 3 deals by cap rate?")
+    expected, _ = store.query("capRate", 3)
+    assert answer["source"] == "local" and answer["intent"] == "top"
+    assert all(deal["title"] in answer["response"] for deal in expected)
+
+    answer = assistant.answer("How many low risk deals in Mumbai?")
+    total = len(store.matches(markets=["mumbai"], risk="low"))
+    assert f"{total:,} deals" in answer["response"] and answer["dealsCount"] == total
+
+    answer = assistant.answer("Average cap rate in London")
+    london = store.columns["capRate"][store.matches(markets=["london"])]
+    assert f"{london.mean():.2f}%" in answer["response"]
+
+    answer = assistant.answer("lowest cap rate deals in Dubai")
+    deals, _ = store.top("capRate", False, 5, markets=["dubai"])
+    assert deals[0]["title"] in answer["response"] and deals[0]["capRate"] <= deals[-1]["capRate"]
+
+    assert not service.messages
+
+    start = time.perf_counter()
+    for _ in range(100):
+        assistant.answer("Top 10 distressed deals under $400k by discount")
+    elapsed = (time.perf_counter() - start) / 100
+    print(f"   {elapsed * 1000:.2f} ms per structured answer over {len(store):,} deals")
+    assert elapsed < 0.05
+
+    print("✅ Local answer test passed!\n")
+
+def test_llm_fallback():
+    """Test that open-ended questions get a small, pre-filtered context"""
+    print("🤖 Testing LLM Fallback...")
+
+    store = DealStore(synthetic_deals(5000, seed=5))
+    service = RecordingService()
+    answer = ChatAssistant(store, service).answer("Should I invest in Mumbai right now?")
+
+    assert answer["source"] == "llm" and answer["response"] == "• Consider the Mumbai deals"
+    system = service.messages[0][0]["content"]
+    deals = json.loads(system.split("DEALS:\n", 1)[1])
+    assert len(deals) == answer["dealsCount"] == CONTEXT_DEALS
+    assert all(deal["city"] == "Mumbai" and set(deal) <= set(CONTEXT_FIELDS) for deal in deals)
+    assert service.messages[0][1] == {"role": "user", "content": "Should I invest in Mumbai right now?"}
+
+    disabled = ChatAssistant(store).answer("Why are prices rising?")
+    assert disabled["disabled"] and "error" in disabled
+
+    print("✅ LLM fallback test passed!\n")
+
+def test_chat_endpoint():
+    """Test /api/chat on the deals service"""
+    print("🌐 Testing Chat Endpoint...")
+
+    server = serve(DealStore(synthetic_deals(500)), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://localhost:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/api/chat") as response:
+            status = json.loads(response.read())
+        assert status["enabled"] and status["provider"] == "local"
+
+        request = urllib.request.Request(f"{base}/api/chat", method="POST",
+                                         data=json.dumps({"message": "What are the top 3 deals by cap rate?"}).encode())
+        with urllib.request.urlopen(request) as response:
+            data = json.loads(response.read())
+        assert data["response"].startswith("Top 3 deals") and data["dealsCount"] == 500 and data["timestamp"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Chat endpoint test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Chat Query Planner Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_plans()
+        test_local_answers()
+        test_llm_fallback()
+        test_chat_endpoint()
+        print("🎉 All chat query planner tests passed!")
+    except AssertionError as e:
+        print(f"❌ Chat query planner test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming data export
+"""
+
+import csv
+import gzip
+import io
+import json
+
+from data_export import export_file_name, iter_export, preview_rows, select_rows, write_export
+
+def sample_rows(count=12000):
+    """Generate analysis-like rows"""
+    return [
+        {
+            "property_id": f"PROP{i:05d}",
+            "score": float(i % 100),
+            "risk_level": "low" if i % 3 == 0 else "high",
+            "cap_rate": 4.0 + (i % 7),
+        }
+        for i in range(count)
+    ]
+
+def test_filters_and_columns():
+    """Test that filters and column selection are applied before serialization"""
+    print("🔎 Testing Filters and Columns...")
+
+    rows = list(select_rows(sample_rows(300), ["property_id", "score"],
+                            {"risk_level": {"low"}, "score": (50, None)}))
+    assert rows and all(set(row) == {"property_id", "score"} for row in rows)
+    assert all(row["score"] >= 50 for row in rows)
+    assert len(preview_rows(select_rows(sample_rows()), 50)) == 50
+
+    print("✅ Filters and columns test passed!\n")
+
+def test_jsonl_gzip_roundtrip():
+    """Test chunked JSONL with gzip compression"""
+    print("📦 Testing JSONL + gzip...")
+
+    chunks = list(iter_export(sample_rows(), fmt="jsonl", compression="gzip", chunk_size=1000))
+    assert len(chunks) > 1
+    lines = gzip.decompress(b"".join(chunks)).decode("utf-8").splitlines()
+    assert len(lines) == 12000
+    assert json.loads(lines[0])["property_id"] == "PROP00000"
+
+    print(f"   {len(chunks)} compressed chunks")
+    print("✅ JSONL + gzip test passed!\n")
+
+def test_csv_export():
+    """Test chunked CSV keeps a single header"""
+    print("📄 Testing CSV...")
+
+    buffer = io.BytesIO()
+    written = write_export(buffer, sample_rows(2500), fmt="csv", columns=["property_id", "cap_rate"],
+                           chunk_size=1000)
+    assert written == len(buffer.getvalue())
+    records = list(csv.reader(io.StringIO(buffer.getvalue().decode("utf-8"))))
+    assert records[0] == ["property_id", "cap_rate"]
+    assert len(records) == 2501
+
+    assert export_file_name("analysis", "csv", "gzip") == "analysis.csv.gz"
+    assert export_file_name("analysis", "parquet", "zstd") == "analysis.parquet"
+
+    print("✅ CSV test passed!\n")
+
+def test_parquet_types():
+    """Test that Parquet types hold across row groups and that empty exports stay valid"""
+    print("🧱 Testing Parquet Types...")
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("   pyarrow not installed, Parquet checks skipped\n")
+        return
+
+    rows = [{"property_id": f"P{i}", "x": i, "duplicate_of": None, "irr": None, "outlier": False}
+            for i in range(10)]
+    rows += [{"property_id": "P10", "x": 1.5, "duplicate_of": "P1", "irr": 12.5, "outlier": True,
+              "notes": "ignored"}]
+    table = pq.read_table(io.BytesIO(b"".join(iter_export(rows, fmt="parquet", chunk_size=4))))
+    assert table.num_rows == 11 and table.column_names == ["property_id", "x", "duplicate_of", "irr", "outlier"]
+    last = table.slice(10).to_pylist()[0]
+    assert last == {"property_id": "P10", "x": 1.5, "duplicate_of": "P1", "irr": 12.5, "outlier": True}
+
+    columns = ["property_id", "score"]
+    empty = pq.read_table(io.BytesIO(b"".join(iter_export([], fmt="parquet", columns=columns))))
+    assert empty.num_rows == 0 and empty.column_names == columns
+    assert b"".join(iter_export([], fmt="csv", columns=columns)).decode("utf-8").strip() == "property_id,score"
+    assert pq.read_table(io.BytesIO(b"".join(iter_export([], fmt="parquet")))).num_rows == 0
+
+    print("✅ Parquet types test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Data Export Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_filters_and_columns()
+        test_jsonl_gzip_roundtrip()
+        test_csv_export()
+        test_parquet_types()
+        print("🎉 All data export tests passed!")
+    except AssertionError as e:
+        print(f"❌ Data export test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
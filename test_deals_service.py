@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for the Python deals service
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from deals_service import DealStore, benchmark, deal_from_row, serve, synthetic_deals
+
+def reference_query(store, sort, ranges, markets, category, risk):
+    """Filter and sort the whole list, the way the deals route does"""
+    deals = list(store.deals)
+    for field, (low, high) in ranges.items():
+        deals = [d for d in deals if d.get(field) and (low is None or d[field] >= low)
+                 and (high is None or d[field] <= high)]
+    if markets:
+        wanted = [m.lower() for m in markets]
+        deals = [d for d in deals if any(m in d["city"].lower() or m in d["country"].lower() for m in wanted)]
+    if category:
+        deals = [d for d in deals if d["category"] == category]
+    if risk:
+        deals = [d for d in deals if d["risk"] == risk]
+    field, descending = {"price": ("price", False), "capRate": ("capRate", True),
+                         "discount": ("discountPct", True)}.get(sort, ("score", True))
+    return sorted(deals, key=lambda d: -(d.get(field) or 0) if descending else d.get(field) or 0)
+
+def test_queries_match_reference():
+    """Test indexed queries against a full filter and sort"""
+    print("🔍 Testing Indexed Deal Queries...")
+
+    store = DealStore(synthetic_deals(3000, seed=1))
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        sort = str(rng.choice(["price", "score", "capRate", "discount"]))
+        ranges = {}
+        if rng.random() < 0.5:
+            low = float(rng.uniform(2e5, 6e5))
+            ranges["price"] = (low if rng.random() < 0.5 else None, low * float(rng.uniform(1, 3)))
+        if rng.random() < 0.3:
+            ranges["capRate"] = (float(rng.uniform(4, 9)), None)
+        markets = ["mumbai", "UK"] if rng.random() < 0.3 else None
+        category = "distressed" if rng.random() < 0.3 else None
+        risk = "low" if rng.random() < 0.3 else None
+        offset, limit = int(rng.integers(0, 20)), int(rng.integers(1, 60))
+
+        expected = reference_query(store, sort, ranges, markets, category, risk)
+        deals, total = store.query(sort, limit, offset, ranges, markets, category, risk)
+        assert total == len(expected), (total, len(expected))
+        assert [d["id"] for d in deals] == [d["id"] for d in expected[offset:offset + limit]]
+
+    print("✅ Indexed deal query test passed!\n")
+
+def test_deal_from_row():
+    """Test mapping engine rows to deals and scoring them like the route"""
+    print("🏷️  Testing Deal Mapping...")
+
+    row = {"property_id": "PROP001", "address": "123 Main St", "purchase_price": 500000, "noi": 45000,
+           "cap_rate": 9.0, "market_cap_rate": 0.065, "risk_level": "low", "category": "mispriced",
+           "estimated_value": 600000, "discount_pct": 16.67, "city": "Austin", "country": "USA"}
+    store = DealStore([deal_from_row(row)], year=2025)
+    deal = store.get("PROP001")
+    assert deal["title"] == "123 Main St" and deal["price"] == 500000 and deal["marketCapRate"] == 6.5
+    # 33.34 discount + 15 cap rate + 20 spread + 10 low risk
+    assert abs(deal["score"] - 78.34) < 1e-9
+
+    legacy = deal_from_row({"property_id": "P2", "noi": 36000, "cap_rate": 10.0})
+    assert legacy["price"] == 360000
+
+    print("✅ Deal mapping test passed!\n")
+
+def test_http_service():
+    """Test the HTTP endpoints end to end"""
+    print("🌐 Testing Deals HTTP Service...")
+
+    server = serve(DealStore(synthetic_deals(500)), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://localhost:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/api/deals?maxPrice=500000&sort=score") as response:
+            data = json.loads(response.read())
+        assert data["deals"] and all(d["price"] <= 500000 for d in data["deals"])
+        assert all(field in data["deals"][0] for field in ("id", "title", "price", "capRate", "discountPct", "score"))
+        scores = [d["score"] for d in data["deals"]]
+        assert scores == sorted(scores, reverse=True) and data["filters"]["maxPrice"] == 500000
+
+        request = urllib.request.Request(f"{base}/api/estimate", method="POST",
+                                         data=json.dumps({"price": 300000, "noi": 24000, "city": "Mumbai",
+                                                          "country": "India"}).encode())
+        with urllib.request.urlopen(request) as response:
+            estimate = json.loads(response.read())
+        assert estimate["capRate"] == 8.0 and estimate["comparables"] > 0
+
+        try:
+            urllib.request.urlopen(f"{base}/api/deals?maxPrice=abc")
+            assert False, "invalid filter accepted"
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Deals HTTP service test passed!\n")
+
+def test_latency():
+    """Test that query latency stays flat as the store grows"""
+    print("⚡ Testing Deal Query Latency...")
+
+    small, large = benchmark((1_000, 100_000), repeats=50)
+    print(f"   p99 {small['p99_ms']:.2f} ms at 1k deals, {large['p99_ms']:.2f} ms at 100k deals")
+    assert large["p99_ms"] < 25
+
+    print("✅ Deal query latency test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Deals Service Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_queries_match_reference()
+        test_deal_from_row()
+        test_http_service()
+        test_latency()
+        print("🎉 All deals service tests passed!")
+    except AssertionError as e:
+        print(f"❌ Deals service test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
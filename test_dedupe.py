@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate listing detection
+"""
+
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+from dedupe import ListingDeduplicator, UnionFind, address_numbers, normalize_address
+from real_estate_ai_engine import Property, RealEstateAnalysisEngine, build_output_data
+
+STREETS = ["Main", "Oak", "Maple", "Cedar", "Lakeview", "Sunset", "Highland", "Riverside", "Park", "Hill"]
+SUFFIXES = [("Street", "St"), ("Avenue", "Ave."), ("Road", "Rd"), ("Boulevard", "Blvd"), ("Drive", "Dr.")]
+CITIES = ["Austin", "Denver", "Phoenix", "Tampa", "Raleigh"]
+
+class RecordingService:
+    """Stands in for GroqAIService and records prompts"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def send_chat_completion(self, messages, model=None):
+        self.prompts.append(messages[0]["content"])
+        return {"success": False, "content": ""}
+
+def scraped_listings(n, duplicate_share=0.3, seed=0):
+    """Distinct addresses plus re-scraped variants of some of them; returns listings and true labels"""
+    rng = np.random.default_rng(seed)
+    distinct = int(n / (1 + duplicate_share))
+    addresses, lat, lng, truth = [], [], [], []
+    for i in range(distinct):
+        street, (suffix, _) = STREETS[rng.integers(10)], SUFFIXES[rng.integers(5)]
+        unit = f" Apt {rng.integers(1, 40)}" if rng.random() < 0.3 else ""
+        addresses.append(f"{rng.integers(1, 9999)} {street} {rng.integers(1, 400)}th {suffix}{unit}, "
+                         f"{CITIES[rng.integers(5)]}")
+        lat.append(30 + rng.random() * 10)
+        lng.append(-100 + rng.random() * 20)
+        truth.append(i)
+    for _ in range(n - distinct):
+        i = int(rng.integers(distinct))
+        address = addresses[i]
+        for long_form, short_form in SUFFIXES:
+            address = address.replace(f" {long_form}", f" {short_form}")
+        if rng.random() < 0.5:
+            address = address.upper().replace(" APT ", " # ")
+        if rng.random() < 0.5:
+            # A typo in the street name
+            cut = address.index(" ") + 2
+            address = address[:cut] + address[cut + 1:]
+        addresses.append(address)
+        located = rng.random() < 0.8
+        lat.append(lat[i] + rng.normal(0, 0.0001) if located else np.nan)
+        lng.append(lng[i] + rng.normal(0, 0.0001) if located else np.nan)
+        truth.append(i)
+    return addresses, np.array(lat), np.array(lng), np.array(truth)
+
+def pairs_of(labels):
+    """Number of listing pairs placed in the same cluster"""
+    _, counts = np.unique(labels, return_counts=True)
+    return int((counts * (counts - 1) // 2).sum())
+
+def test_normalization():
+    """Test address normalization and number extraction"""
+    print("🔤 Testing Address Normalization...")
+
+    assert normalize_address("123 North Main Street, Apt. #4") == "123 n main st apt apt 4"
+    assert normalize_address("123 N. MAIN ST #4") == "123 n main st apt 4"
+    assert address_numbers(normalize_address("Flat 4, 12 Fifth Avenue")) == address_numbers("12 5th ave apt 04")
+    assert address_numbers("12 main st apt 4") != address_numbers("12 main st apt 5")
+
+    sets = UnionFind(6)
+    sets.union(0, 3)
+    sets.union(3, 5)
+    sets.union(1, 2)
+    labels = sets.labels()
+    assert labels[0] == labels[3] == labels[5] and labels[1] == labels[2] and len(set(labels.tolist())) == 3
+
+    print("✅ Address normalization test passed!\n")
+
+def test_clustering():
+    """Test that variants cluster together and neighbouring units do not"""
+    print("🧬 Testing Duplicate Clustering...")
+
+    deduplicator = ListingDeduplicator()
+    labels = deduplicator.labels(
+        ["12 Oak Street, Austin", "12 OAK ST., AUSTIN", "12 Oak Stret Austin", "14 Oak Street, Austin",
+         "500 Lakeview Blvd Apt 7, Denver", "500 Lakeview Boulevard #7, Denver", "500 Lakeview Blvd Apt 8, Denver",
+         "Lakeview Tower unit 7, 500 Lakeview", "12 Oak Street, Austin"],
+        [30.1, 30.1, 30.1003, 30.1, 39.7, 39.7, 39.7, 39.70001, 45.0],
+        [-97.7, -97.7, -97.7, -97.7, -105.0, -105.0, -105.0, -105.00001, -97.7],
+    )
+    assert list(labels[:4]) == [0, 0, 0, 3]
+    assert list(labels[4:8]) == [4, 4, 6, 4], labels
+    # Same address but hundreds of kilometres away
+    assert labels[8] == 8
+
+    addresses, lat, lng, truth = scraped_listings(20000, seed=1)
+    labels = deduplicator.labels(addresses, lat, lng)
+    true_pairs = pairs_of(truth)
+    found_pairs = pairs_of(labels)
+    combined = pairs_of(truth * len(truth) + labels)
+    precision, recall = combined / found_pairs, combined / true_pairs
+    print(f"   {len(set(labels.tolist())):,} clusters for {len(set(truth.tolist())):,} properties; "
+          f"pair precision {precision:.3f}, recall {recall:.3f}")
+    assert precision > 0.99 and recall > 0.95
+
+    print("✅ Duplicate clustering test passed!\n")
+
+def test_engine_fan_out():
+    """Test that each cluster is analyzed once and its result fanned out"""
+    print("🤖 Testing Analysis Fan-Out...")
+
+    addresses = ["12 Oak Street, Austin", "12 OAK ST., AUSTIN", "40 Pine Road, Denver", "40 Pine Rd Denver",
+                 "40 PINE RD, DENVER", "7 Hill Drive, Tampa"]
+    properties = [
+        Property(id=f"L{i}", address=address, purchase_price=300000 + 1000 * i, annual_rent=30000,
+                 operating_expenses=9000, market_cap_rate=0.06 if i != 1 else 0.0)
+        for i, address in enumerate(addresses)
+    ]
+    service = RecordingService()
+    results = RealEstateAnalysisEngine(service, deduplicator=ListingDeduplicator()).analyze_properties(properties)
+
+    assert sorted(r.property_id for r in results) == [p.id for p in properties]
+    by_id = {r.property_id: r for r in results}
+    assert by_id["L1"].duplicate_of == "L0" and by_id["L1"].recommendation == by_id["L0"].recommendation
+    # Each duplicate keeps the numbers of its own listing
+    for prop in properties:
+        assert abs(by_id[prop.id].cap_rate - 2100000 / prop.purchase_price) < 1e-9, prop.id
+        assert by_id[prop.id].noi == 21000
+    assert sorted(r.rank for r in results) == list(range(1, len(properties) + 1))
+    assert [r.property_id for r in results] == [p.id for p in properties]
+    assert by_id["L3"].duplicate_of == by_id["L4"].duplicate_of == "L2"
+    assert not by_id["L0"].duplicate_of and not by_id["L5"].duplicate_of
+    assert by_id["L1"].metrics is not by_id["L0"].metrics and properties[1].market_cap_rate == 0.06
+    assert len(service.prompts) == 1
+    assert "L0" in service.prompts[0] and "L1" not in service.prompts[0] and "L4" not in service.prompts[0]
+
+    # The same street address in another city is another property
+    elsewhere = [
+        Property(id="A", address="100 Main Street", purchase_price=300000, annual_rent=30000,
+                 operating_expenses=9000, market_cap_rate=0.06, city="Austin", country="USA"),
+        Property(id="T", address="100 Main St", purchase_price=300000, annual_rent=30000,
+                 operating_expenses=9000, market_cap_rate=0.06, city="Toronto", country="Canada"),
+        Property(id="A2", address="100 MAIN ST.", purchase_price=300000, annual_rent=30000,
+                 operating_expenses=9000, market_cap_rate=0.06, city="austin", country="USA "),
+    ]
+    assert ListingDeduplicator().clusters(elsewhere) == [[0, 2], [1]]
+
+    rows = build_output_data(properties, results)["analysis_results"]
+    assert {row["property_id"]: row["duplicate_of"] for row in rows}["L3"] == "L2"
+
+    print("✅ Analysis fan-out test passed!\n")
+
+def test_scaling():
+    """Test that clustering time grows roughly linearly"""
+    print("⏱️ Testing Clustering Throughput...")
+
+    deduplicator = ListingDeduplicator()
+    timings = {}
+    for n in (25000, 100000):
+        addresses, lat, lng, _ = scraped_listings(n, seed=2)
+        start = time.perf_counter()
+        deduplicator.labels(addresses, lat, lng)
+        timings[n] = time.perf_counter() - start
+        print(f"   {n:,} listings clustered in {timings[n]:.2f}s")
+    assert timings[100000] / timings[25000] < 8
+
+    print("✅ Clustering throughput test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Listing Dedupe Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_normalization()
+        test_clustering()
+        test_engine_fan_out()
+        test_scaling()
+        print("🎉 All dedupe tests passed!")
+    except AssertionError as e:
+        print(f"❌ Dedupe test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
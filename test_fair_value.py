@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the comparable-based fair value estimator
+"""
+
+import time
+
+import numpy as np
+
+from fair_value import ComparableSet, estimate_fair_value, estimate_fair_values
+
+def test_api_contract_fallback():
+    """Test the /api/estimate fields and fallback without comps"""
+    print("🧾 Testing Estimate Contract...")
+
+    # The payload posted by test_apis.py
+    result = estimate_fair_value({
+        "title": "Test Property",
+        "price": 300000,
+        "noi": 24000,
+        "city": "Mumbai",
+        "country": "India",
+        "category": "mispriced"
+    })
+    assert set(result) >= {"capRate", "aiEstimatedValue", "discountPct", "marketCapRate"}
+    assert result["capRate"] == 8.0
+    assert result["aiEstimatedValue"] == 320000  # 24,000 / 7.5%
+    assert result["discountPct"] == 6.25
+    assert result["comparables"] == 0
+
+    # No income: location heuristic, as in the Next.js route
+    result = estimate_fair_value({"price": 100000, "city": "London", "yearBuilt": 2020})
+    assert result["aiEstimatedValue"] == 125000
+
+    try:
+        estimate_fair_value({"price": 0})
+        assert False, "zero price accepted"
+    except ValueError:
+        pass
+
+    print("✅ Estimate contract test passed!\n")
+
+def test_comparable_model():
+    """Test income and sales approaches against hand calculations"""
+    print("🏘️  Testing Comparable Model...")
+
+    comps = ComparableSet([
+        {"id": "C1", "price": 1000000, "noi": 60000, "sqft": 2000, "lat": 40.700, "lng": -74.000,
+         "city": "New York", "country": "US"},
+        {"id": "C2", "price": 1000000, "noi": 60000, "sqft": 2000, "lat": 40.701, "lng": -74.001,
+         "city": "New York", "country": "US"},
+        {"id": "FAR", "price": 1000000, "noi": 100000, "sqft": 1000, "lat": 34.05, "lng": -118.24,
+         "city": "Los Angeles", "country": "US"},
+    ])
+
+    # Comps at 6% and $500/sqft: income 54,000 / 6% = 900,000, sales 1,500 × 500 = 750,000
+    subject = {"id": "S", "price": 720000, "noi": 54000, "sqft": 1500, "lat": 40.7005, "lng": -74.0005}
+    result = estimate_fair_values([subject], comps, k=2)[0]
+    assert result["marketCapRate"] == 6.0 and result["comparables"] == 2
+    assert result["aiEstimatedValue"] == round(0.6 * 900000 + 0.4 * 750000)
+    assert result["discountPct"] == round((840000 - 720000) / 840000 * 100, 2)
+
+    # Without coordinates the city's comps are used, excluding the subject itself
+    result = estimate_fair_values([{"id": "C1", "price": 1000000, "noi": 70000, "city": "new york",
+                                    "country": "US"}], comps, k=5)[0]
+    assert result["comparables"] == 1 and result["marketCapRate"] == 6.0
+
+    print("✅ Comparable model test passed!\n")
+
+def test_small_geocoded_book():
+    """Test a handful of far-apart geocoded properties, as in one engine run"""
+    print("🗺️  Testing Small Geocoded Book...")
+
+    records = [
+        {"id": "NY", "price": 900000, "noi": 54000, "lat": 40.71, "lng": -74.00, "city": "New York", "country": "US"},
+        {"id": "LA", "price": 800000, "noi": 64000, "lat": 34.05, "lng": -118.24, "city": "Los Angeles",
+         "country": "US"},
+        {"id": "LA2", "price": 700000, "noi": 49000, "lat": 34.06, "lng": -118.25, "city": "Los Angeles",
+         "country": "US"},
+    ]
+    start = time.perf_counter()
+    results = estimate_fair_values(records, ComparableSet(records))
+    elapsed = time.perf_counter() - start
+
+    # New York has no comp within range and none in its city; each LA listing has the other
+    assert [r["comparables"] for r in results] == [0, 1, 1]
+    assert results[1]["marketCapRate"] == 7.0 and results[2]["marketCapRate"] == 8.0
+    print(f"   3 estimates in {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.5
+
+    print("✅ Small geocoded book test passed!\n")
+
+def test_batch_scale():
+    """Test thousands of estimates in one call"""
+    print("⚡ Testing Batch Estimation...")
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    price = rng.uniform(2e5, 2e6, n)
+    records = [
+        {"id": f"P{i}", "price": price[i], "noi": price[i] * rng.uniform(0.05, 0.08),
+         "sqft": price[i] / rng.uniform(300, 600), "lat": 40.7 + rng.normal(0, 0.1),
+         "lng": -74.0 + rng.normal(0, 0.1), "city": "New York", "country": "US"}
+        for i in range(n)
+    ]
+    comps = ComparableSet(records)
+
+    start = time.perf_counter()
+    results = estimate_fair_values(records[:5000], comps)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 5000 and all(r["comparables"] == 10 for r in results)
+    assert 5.0 < np.median([r["marketCapRate"] for r in results]) < 8.0
+
+    print(f"   5,000 estimates against 20k comps in {elapsed:.2f}s")
+    print("✅ Batch estimation test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Fair Value Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_api_contract_fallback()
+        test_comparable_model()
+        test_small_geocoded_book()
+        test_batch_scale()
+        print("🎉 All fair value tests passed!")
+    except AssertionError as e:
+        print(f"❌ Fair value test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for compiled deal filters and bitmap indexes
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import filter_compiler
+from deals_service import DealStore, open_deal_snapshot, synthetic_deals, write_deal_snapshot
+from filter_compiler import (
+    BitmapIndex,
+    OneOf,
+    Range,
+    compile_filter,
+    contains,
+    pack,
+    popcount,
+    positions,
+)
+from snapshot import Snapshot, SnapshotFormatError, write_snapshot
+
+FILTERS = [
+    {},
+    {"risk": "any", "markets": []},
+    {"minPrice": 200000, "maxPrice": 600000},
+    {"capRateMin": 6.5, "capRateMax": 8, "risk": "low"},
+    {"markets": ["mumbai", "UK"], "categories": ["distressed", "mispriced"], "status": ["new", "offer"]},
+    {"marketId": "dubai", "currency": "AED", "risk": ["medium", "high"], "scoreMin": 40},
+    {"category": "cap_rate_arbitrage", "status": "closed", "discountMin": 5},
+    {"or": [{"risk": "high", "status": "review"}, {"markets": ["Toronto"], "maxPrice": 300000}]},
+    {"not": {"or": [{"category": "distressed"}, {"currency": ["USD", "GBP"]}]}, "capRateMin": 7},
+    {"and": [{"status": "new"}, {"not": {"risk": "low"}}], "currency": "XYZ"},
+]
+
+def test_bitmaps():
+    """Test packing, counting and membership at sizes around word boundaries"""
+    print("🧮 Testing Bitmaps...")
+
+    rng = np.random.default_rng(0)
+    for size in (0, 1, 7, 8, 63, 64, 65, 130, 1000):
+        mask = rng.random(size) < 0.4
+        words = pack(mask)
+        assert len(words) == -(-size // 64)
+        assert popcount(words) == mask.sum()
+        assert np.array_equal(positions(words, size), np.flatnonzero(mask))
+        assert np.array_equal(contains(words, np.arange(size)), mask)
+        inverted = filter_compiler.trim(~words, size)
+        assert np.array_equal(positions(inverted, size), np.flatnonzero(~mask)) and popcount(inverted) == size - mask.sum()
+
+    codes = rng.integers(0, 5, 300)
+    values = np.array(["a", "b", "c", "d", "e"])
+    index = BitmapIndex(values, codes)
+    assert index.bitmaps.shape == (5, 5)
+    assert np.array_equal(positions(index.where(["b", "e"]), 300), np.flatnonzero(np.isin(codes, [1, 4])))
+    assert popcount(index.where(["missing"])) == 0
+
+    print("✅ Bitmap test passed!\n")
+
+def test_filters_match_row_scan():
+    """Test compiled filters and combined query filters against checking each deal"""
+    print("🔎 Testing Filters Against Row Scan...")
+
+    deals = synthetic_deals(20_000, seed=1)
+    deals[5] = dict(deals[5], noi=0)
+    deals[6] = {key: value for key, value in deals[6].items() if key not in ("status", "currency", "marketId")}
+    store = DealStore(deals)
+    for spec in FILTERS:
+        expected = [i for i, deal in enumerate(store.deals) if filter_compiler.scan_match(spec, deal)]
+        assert store.select(spec).tolist() == expected, spec
+        assert store.count(spec) == len(expected), spec
+    assert store.select({"status": [""]}).tolist() == [6] and store.count({"status": ""}) == len(store)
+
+    predicate = (OneOf("risk", ["low"]) | Range("price", high=150000)) & ~OneOf("category", ["mispriced"])
+    expected = [i for i, deal in enumerate(store.deals)
+                if (deal["risk"] == "low" or deal["price"] <= 150000) and deal["category"] != "mispriced"]
+    assert store.select(predicate).tolist() == expected
+
+    try:
+        compile_filter({"minprice": 5})
+        assert False, "unknown key accepted"
+    except ValueError:
+        pass
+
+    for params in ({"markets": "Mumbai,dubai", "category": "distressed", "risk": "low", "sort": "price"},
+                   {"markets": "London", "risk": "high", "limit": "500"},
+                   {"category": "mispriced", "risk": "medium", "capRateMin": "7", "sort": "capRate"}):
+        body = store.handle_query(params)
+        scan = filter_compiler.scan_match
+        wanted = {k: v for k, v in (("markets", params["markets"].split(",") if "markets" in params else None),
+                                    ("category", params.get("category")), ("risk", params.get("risk")),
+                                    ("capRateMin", float(params["capRateMin"]) if "capRateMin" in params else None))
+                  if v is not None}
+        assert body["total"] == sum(1 for deal in store.deals if scan(wanted, deal)), params
+        assert all(scan(wanted, deal) for deal in body["deals"])
+
+    print("✅ Row scan test passed!\n")
+
+def test_many_values_and_snapshots():
+    """Test code lookups past the bitmap limit and bitmaps read back from snapshots"""
+    print("🗂️  Testing High Cardinality and Snapshots...")
+
+    deals = [dict(deal, marketId=f"m{i % 500}") for i, deal in enumerate(synthetic_deals(3000, seed=2))]
+    store = DealStore(deals)
+    assert store.bitmaps["market_id"].bitmaps is None and store.bitmaps["risk"].bitmaps is not None
+    by_market = {"marketId": ["m7", "m499"], "risk": "high"}
+    expected = [i for i, deal in enumerate(deals) if deal["marketId"] in ("m7", "m499") and deal["risk"] == "high"]
+    assert store.select(by_market).tolist() == expected
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deals.snapshot")
+        write_deal_snapshot(store, path)
+        mapped = open_deal_snapshot(path)
+        for spec in FILTERS + [by_market]:
+            assert np.array_equal(mapped.select(spec), store.select(spec)), spec
+        assert not mapped.bitmaps["risk"].bitmaps.flags.writeable
+
+        with Snapshot(path) as snapshot:
+            meta = dict(snapshot.meta, layout=1)
+            arrays = dict(snapshot.arrays)
+        old_path = os.path.join(tmp, "old.snapshot")
+        write_snapshot(old_path, arrays, meta)
+        try:
+            open_deal_snapshot(old_path)
+            assert False, "older snapshot layout accepted"
+        except SnapshotFormatError:
+            pass
+
+    print("✅ High cardinality and snapshot test passed!\n")
+
+def test_million_deals():
+    """Test multi-predicate filter latency over 1M deals"""
+    print("⏱️  Testing 1M-Deal Filters...")
+
+    store = DealStore(synthetic_deals(1_000_000))
+    for spec in filter_compiler.BENCHMARK_FILTERS:
+        store.select(spec)
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            matched = store.select(spec)
+            timings.append(time.perf_counter() - start)
+        p50 = float(np.median(timings)) * 1000
+        print(f"   {len(matched):>9,} matches in {p50:.2f} ms: {spec}")
+        assert p50 < 10, spec
+
+    print("✅ 1M-deal filter test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Filter Compiler Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_bitmaps()
+        test_filters_match_row_scan()
+        test_many_values_and_snapshots()
+        test_million_deals()
+        print("🎉 All filter compiler tests passed!")
+    except AssertionError as e:
+        print(f"❌ Filter compiler test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for vectorized investment metrics
+"""
+
+import time
+
+import numpy as np
+
+from config import Config
+from investment_metrics import (
+    annual_debt_service,
+    compute_metrics,
+    npv,
+    project_cash_flows,
+    remaining_balance,
+)
+
+def test_single_property():
+    """Test metrics against hand-calculated values"""
+    print("🧮 Testing Single Property Metrics...")
+
+    m = compute_metrics([350000], [48000], [12000], [1800],
+                        down_payment_percent=20.0, interest_rate=7.0, amortization_years=30)
+    debt_service = 280000 * (0.07 / 12) * (1 + 0.07 / 12) ** 360 / ((1 + 0.07 / 12) ** 360 - 1) * 12
+
+    assert abs(m["annual_debt_service"][0] - debt_service) < 1e-6
+    assert abs(m["cap_rate"][0] - 36000 / 350000 * 100) < 1e-9
+    assert abs(m["cash_on_cash_return"][0] - (36000 - debt_service) / 70000 * 100) < 1e-9
+    assert abs(m["dscr"][0] - 36000 / debt_service) < 1e-9
+    assert abs(m["debt_yield"][0] - 36000 / 280000 * 100) < 1e-9
+    assert abs(m["break_even_occupancy"][0] - (12000 + debt_service) / 48000 * 100) < 1e-9
+    assert abs(m["gross_rent_multiplier"][0] - 350000 / 48000) < 1e-9
+    assert abs(m["price_per_sqft"][0] - 350000 / 1800) < 1e-9
+
+    print(f"   Cash-on-Cash: {m['cash_on_cash_return'][0]:.2f}%, DSCR: {m['dscr'][0]:.2f}")
+    print("✅ Single property metrics test passed!\n")
+
+def test_edge_cases():
+    """Test all-cash purchases, zero rates and missing square footage"""
+    print("🛡️  Testing Edge Cases...")
+
+    m = compute_metrics([500000, 0], [60000, 0], [15000, 0],
+                        down_payment_percent=100.0, interest_rate=0.0)
+    assert np.all(m["annual_debt_service"] == 0)
+    assert m["dscr"][0] == 0.0 and m["price_per_sqft"][0] == 0.0
+    assert m["cap_rate"][1] == 0.0
+    assert abs(annual_debt_service(360000, 0.0, 30) - 12000) < 1e-9
+
+    print("✅ Edge cases test passed!\n")
+
+def test_config_default_and_scale():
+    """Test the Config down payment default and 1M-row timing"""
+    print("⚡ Testing Config Default and Scale...")
+
+    m = compute_metrics([100000], [12000], [2000])
+    assert abs(m["equity"][0] - 100000 * Config.DEFAULT_DOWN_PAYMENT_PERCENT / 100) < 1e-9
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    price = rng.uniform(1e5, 2e6, n)
+    start = time.perf_counter()
+    m = compute_metrics(price, price * 0.1, price * 0.03, rng.uniform(500, 5000, n))
+    elapsed = time.perf_counter() - start
+    assert m["dscr"].shape == (n,)
+
+    print(f"   1M properties in {elapsed * 1000:.0f} ms")
+    print("✅ Config default and scale test passed!\n")
+
+def test_cash_flow_projection():
+    """Test the multi-year projection against a year-by-year calculation"""
+    print("📅 Testing Cash-Flow Projection...")
+
+    p = project_cash_flows([500000], [60000], [15000], [0.06], years=5, rent_growth=3.0,
+                           expense_growth=2.0, selling_cost=3.0, discount_rate=8.0,
+                           down_payment_percent=20.0, interest_rate=7.0, amortization_years=30)
+    debt_service = annual_debt_service(400000, 7.0, 30)
+    noi = [60000 * 1.03 ** t - 15000 * 1.02 ** t for t in range(5)]
+    assert np.allclose(p["noi"][0], noi)
+    assert np.allclose(p["cash_flow"][0], np.array(noi) - debt_service)
+
+    # Balance after five years by stepping through the monthly schedule
+    balance, monthly = 400000.0, debt_service / 12
+    for _ in range(60):
+        balance = balance * (1 + 0.07 / 12) - monthly
+    assert abs(p["loan_balance"][0, -1] - balance) < 1e-4
+    assert abs(remaining_balance(400000, 7.0, 30, 30)) < 1e-6
+    assert abs(remaining_balance(360000, 0.0, 30, 10) - 240000) < 1e-9
+
+    sale = noi[-1] / 0.06
+    assert abs(p["sale_proceeds"][0] - (sale * 0.97 - balance)) < 1e-4
+    assert abs(npv(p["irr"] / 100, p["equity_cash_flows"])[0]) < 1e-4
+    assert abs(p["npv"][0] - npv(0.08, p["equity_cash_flows"][0])) < 1e-6
+
+    print(f"   5-year IRR: {p['irr'][0]:.2f}%, equity multiple {p['equity_multiple'][0]:.2f}x")
+    print("✅ Cash-flow projection test passed!\n")
+
+def test_projection_scale():
+    """Test 100k properties over 30 years"""
+    print("⚡ Testing Projection Scale...")
+
+    rng = np.random.default_rng(1)
+    n = 100_000
+    price = rng.uniform(1e5, 2e6, n)
+    start = time.perf_counter()
+    p = project_cash_flows(price, price * rng.uniform(0.06, 0.14, n), price * 0.03,
+                           rng.uniform(0.04, 0.08, n), years=30)
+    elapsed = time.perf_counter() - start
+
+    assert p["noi"].shape == (n, 30) and p["irr"].shape == (n,)
+    assert np.all(np.isfinite(p["irr"]))
+    assert np.abs(npv(p["irr"] / 100, p["equity_cash_flows"])).max() < 1e-4
+
+    # A deal that never recovers its equity reports a total loss
+    p = project_cash_flows([500000], [10000], [40000], [0.06], years=5)
+    assert p["irr"][0] == -100.0
+
+    print(f"   100k properties × 30 years in {elapsed:.2f}s")
+    print("✅ Projection scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Investment Metrics Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_single_property()
+        test_edge_cases()
+        test_config_default_and_scale()
+        test_cash_flow_projection()
+        test_projection_scale()
+        print("🎉 All investment metrics tests passed!")
+    except AssertionError as e:
+        print(f"❌ Investment metrics test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
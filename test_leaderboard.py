@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the online property leaderboard
+"""
+
+import os
+import random
+import time
+
+# The engine refuses to import without a key; these tests never call the API
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+from leaderboard import IndexableSkiplist, Leaderboard
+from real_estate_ai_engine import Property, RealEstateAnalysisEngine
+
+def test_skiplist_positions():
+    """Test skiplist positions against a sorted list under random edits"""
+    print("🪜 Testing Indexable Skiplist...")
+
+    rng = random.Random(7)
+    skiplist = IndexableSkiplist()
+    reference = []
+    for _ in range(5000):
+        key = rng.randrange(1000)
+        if key in reference and rng.random() < 0.5:
+            assert skiplist.remove(key)
+            reference.remove(key)
+        elif key not in reference:
+            skiplist.insert(key, str(key))
+            reference.append(key)
+    reference.sort()
+
+    assert len(skiplist) == len(reference)
+    assert [key for key, _ in skiplist] == reference
+    for position in range(0, len(reference), 37):
+        assert skiplist.at(position) == (reference[position], str(reference[position]))
+        assert skiplist.index(reference[position]) == position
+    assert skiplist.index(-1) == -1 and not skiplist.remove(-1)
+
+    print("✅ Indexable skiplist test passed!\n")
+
+def test_leaderboard_updates():
+    """Test ranks, re-scoring, ties and removal"""
+    print("🏆 Testing Leaderboard Updates...")
+
+    board = Leaderboard()
+    assert board.update("A", 7.0) == 1
+    assert board.update("B", 9.0) == 1
+    assert board.update("C", 7.0) == 3
+    assert board.rank("A") == 2
+
+    # Ties keep arrival order, and re-scoring keeps a property's place among ties
+    assert board.update("A", 7.0) == 2
+    assert board.update("C", 10.0) == 1
+    assert [entry[0] for entry in board.top(3)] == ["C", "B", "A"]
+    assert board.at_rank(2)[:2] == ("B", 9.0)
+
+    assert board.remove("B") and not board.remove("B")
+    assert board.rank("A") == 2 and board.rank("B") is None
+    assert len(board) == 2 and "C" in board
+
+    print("✅ Leaderboard updates test passed!\n")
+
+def test_engine_ranks_across_batches():
+    """Test that the engine ranks streamed batches against the whole book"""
+    print("📡 Testing Streamed Engine Ranking...")
+
+    engine = RealEstateAnalysisEngine(None, leaderboard=Leaderboard())
+    first = [Property(f"P{i}", f"{i} Main St", 500000, 40000 + i * 1000, 15000, 0.06) for i in range(5)]
+    engine.compute_results(first)
+    results = engine.compute_results([Property("P9", "9 Main St", 500000, 43500, 15000, 0.06)])
+    assert results[0].rank == 2
+
+    # Re-analysing a property moves it instead of adding a duplicate
+    results = engine.compute_results([Property("P0", "0 Main St", 500000, 60000, 15000, 0.06)])
+    assert results[0].rank == 1
+    assert len(engine.leaderboard) == 6
+
+    print("✅ Streamed engine ranking test passed!\n")
+
+def test_scale():
+    """Test update and rank cost on a large book"""
+    print("⚡ Testing Leaderboard Scale...")
+
+    rng = random.Random(0)
+    board = Leaderboard()
+    n = 100_000
+    start = time.perf_counter()
+    for i in range(n):
+        board.update(f"P{i}", rng.random())
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, n, 10):
+        board.rank(f"P{i}")
+    rank_time = time.perf_counter() - start
+
+    assert len(board) == n
+    print(f"   {insert_time / n * 1e6:.1f} µs per update, {rank_time / (n // 10) * 1e6:.1f} µs per rank")
+    print("✅ Leaderboard scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Leaderboard Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_skiplist_positions()
+        test_leaderboard_updates()
+        test_engine_ranks_across_batches()
+        test_scale()
+        print("🎉 All leaderboard tests passed!")
+    except AssertionError as e:
+        print(f"❌ Leaderboard test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental market aggregates
+"""
+
+import time
+
+import numpy as np
+
+from market_stats import MarketAggregates, QuantileSketch, RunningStats, market_key
+
+def test_running_stats():
+    """Test Welford add, remove and merge against numpy"""
+    print("📐 Testing Running Statistics...")
+
+    values = list(np.random.default_rng(0).normal(7.0, 1.5, 1000))
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    for value in values[:300]:
+        stats.remove(value)
+    assert abs(stats.mean - np.mean(values[300:])) < 1e-9
+    assert abs(stats.variance - np.var(values[300:], ddof=1)) < 1e-9
+
+    left, right = RunningStats(), RunningStats()
+    for value in values[:400]:
+        left.add(value)
+    for value in values[400:]:
+        right.add(value)
+    left.merge(right)
+    assert left.count == 1000 and abs(left.total - sum(values)) < 1e-6
+    assert abs(left.variance - np.var(values, ddof=1)) < 1e-9
+
+    print("✅ Running statistics test passed!\n")
+
+def test_quantile_sketch():
+    """Test sketch accuracy, deletion and merging"""
+    print("📊 Testing Quantile Sketch...")
+
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(0, 1, 20000) - 0.5
+    sketch, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        sketch.add(value)
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * abs(exact) + 1e-9, q
+        assert first.quantile(q) == sketch.quantile(q)
+
+    for value in values[:10000]:
+        sketch.remove(value)
+    exact = np.quantile(values[10000:], 0.5, method="lower")
+    assert abs(sketch.quantile(0.5) - exact) <= 0.011 * abs(exact)
+    assert QuantileSketch().quantile(0.5) is None
+
+    print("✅ Quantile sketch test passed!\n")
+
+def test_market_updates():
+    """Test arrivals, moves between markets and rankings"""
+    print("🌍 Testing Market Updates...")
+
+    assert market_key({"market_id": "NYC"}) == "NYC"
+    assert market_key({"city": "Mumbai", "country": "IN"}) == "Mumbai, IN"
+    assert market_key({}) == "unknown"
+
+    aggregates = MarketAggregates()
+    aggregates.update({"property_id": "A", "market_id": "NYC", "cap_rate": 5.0, "purchase_price": 900000, "score": 70})
+    aggregates.update({"property_id": "B", "market_id": "NYC", "cap_rate": 6.0, "purchase_price": 700000, "score": 80})
+    aggregates.update({"property_id": "C", "market_id": "AUS", "cap_rate": 8.0, "purchase_price": 400000, "score": 60})
+    assert [market for market, _ in aggregates.rank_markets()] == ["AUS", "NYC"]
+
+    # B is re-analysed in another market: its old contribution leaves NYC
+    aggregates.update({"property_id": "B", "market_id": "AUS", "cap_rate": 9.0, "purchase_price": 500000, "score": 85})
+    nyc, aus = aggregates.stats("NYC"), aggregates.stats("AUS")
+    assert nyc.count == 1 and abs(nyc.value("cap_rate", "mean") - 5.0) < 1e-12
+    assert aus.count == 2 and abs(aus.value("score", "mean") - 72.5) < 1e-12
+
+    assert aggregates.remove("A") and aggregates.stats("NYC") is None
+    summary = aggregates.to_dict()
+    assert summary["AUS"]["count"] == 2 and summary["AUS"]["purchase_price"]["sum"] == 900000
+
+    # A property held by both sides of a merge is counted once, and one delete removes it
+    other = MarketAggregates()
+    other.update({"property_id": "B", "market_id": "AUS", "cap_rate": 9.5, "purchase_price": 500000, "score": 85})
+    other.update({"property_id": "D", "market_id": "NYC", "cap_rate": 4.0, "purchase_price": 800000, "score": 50})
+    aggregates.merge(other)
+    assert aggregates.stats("AUS").count == 2 and abs(aggregates.stats("AUS").value("cap_rate", "mean") - 8.75) < 1e-12
+    assert aggregates.remove("B") and aggregates.stats("AUS").count == 1 and aggregates.stats("NYC").count == 1
+
+    print("✅ Market updates test passed!\n")
+
+def test_scale():
+    """Test update cost and ranking hundreds of markets"""
+    print("⚡ Testing Market Aggregate Scale...")
+
+    rng = np.random.default_rng(2)
+    aggregates = MarketAggregates()
+    n = 100_000
+    cap_rates = rng.normal(7.0, 1.0, n)
+    start = time.perf_counter()
+    for i in range(n):
+        aggregates.update({"property_id": f"P{i}", "market_id": f"M{i % 500}", "cap_rate": cap_rates[i],
+                           "purchase_price": 1e6, "score": 70.0})
+    update_time = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    ranked = aggregates.rank_markets("cap_rate", "median", limit=10)
+    rank_time = time.perf_counter() - start
+
+    assert len(aggregates) == 500 and len(ranked) == 10
+    print(f"   {update_time * 1e6:.1f} µs per update, 500 markets ranked in {rank_time * 1000:.1f} ms")
+    print("✅ Market aggregate scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Market Stats Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_running_stats()
+        test_quantile_sketch()
+        test_market_updates()
+        test_scale()
+        print("🎉 All market stats tests passed!")
+    except AssertionError as e:
+        print(f"❌ Market stats test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo risk engine
+"""
+
+import time
+
+import numpy as np
+
+import monte_carlo
+from investment_metrics import npv, solve_irr
+from monte_carlo import OUTPUT_COLUMNS, simulate_risk
+from summary_cube import classify_loss_probability
+
+def test_solve_irr():
+    """Test the batched IRR solver against known rates"""
+    print("📐 Testing Batched IRR...")
+
+    rates = np.array([-0.1, 0.0, 0.05, 0.12, 0.4])
+    flows = np.tile([-1000.0, 100.0, 150.0, 200.0, 250.0, 300.0], (len(rates), 1))
+    # Make each series' NPV zero at its own rate by adjusting the final flow
+    flows[:, -1] -= npv(rates, flows) * (1 + rates) ** 5
+    irr = solve_irr(flows)
+    assert np.allclose(irr, rates, atol=1e-7), irr
+
+    # No sign change: no IRR
+    assert np.isnan(solve_irr([[100.0, 50.0, 50.0]]))[0]
+
+    print(f"   Solved rates: {np.round(irr, 4).tolist()}")
+    print("✅ Batched IRR test passed!\n")
+
+def test_outputs_and_ordering():
+    """Test output shapes and that weaker deals carry more risk"""
+    print("🎲 Testing Simulation Outputs...")
+
+    price = [500000, 500000, 500000]
+    rent = [80000, 55000, 40000]
+    expenses = [20000, 20000, 20000]
+    result = simulate_risk(price, rent, expenses, [0.07, 0.07, 0.07], n_paths=2000, seed=7)
+
+    assert set(result) == set(OUTPUT_COLUMNS)
+    assert all(values.shape == (3,) for values in result.values())
+    assert np.all(result["noi_p5"] <= result["noi_p50"]) and np.all(result["noi_p50"] <= result["noi_p95"])
+    assert np.all(result["irr_p5"] <= result["irr_p50"]) and np.all(result["irr_p50"] <= result["irr_p95"])
+    # Percent, like the projected IRR in the same analysis row
+    assert 5 < result["irr_p50"][0] < 100 and np.all(result["irr_p5"] >= -100)
+
+    loss = result["probability_of_loss"]
+    assert loss[0] <= loss[1] <= loss[2], loss
+    assert classify_loss_probability(loss[0]) == "low"
+    assert classify_loss_probability(loss[2]) == "high"
+
+    print(f"   P(loss): {np.round(loss, 3).tolist()}")
+    print("✅ Simulation outputs test passed!\n")
+
+def test_determinism_across_workers():
+    """Test that results do not depend on the worker count"""
+    print("🧵 Testing Determinism Across Workers...")
+
+    rng = np.random.default_rng(3)
+    n = 100
+    price = rng.uniform(2e5, 1e6, n)
+    args = (price, price * rng.uniform(0.06, 0.14, n), price * 0.03, rng.uniform(0.04, 0.08, n))
+
+    threshold = monte_carlo.PARALLEL_THRESHOLD
+    monte_carlo.PARALLEL_THRESHOLD = 0
+    try:
+        start = time.perf_counter()
+        serial = simulate_risk(*args, n_paths=500, workers=1)
+        serial_time = time.perf_counter() - start
+        parallel = simulate_risk(*args, n_paths=500, workers=3)
+    finally:
+        monte_carlo.PARALLEL_THRESHOLD = threshold
+
+    for name in OUTPUT_COLUMNS:
+        assert np.array_equal(serial[name], parallel[name]), name
+
+    print(f"   {n} × 500 paths in {serial_time * 1000:.0f} ms on one worker")
+    print("✅ Determinism test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Monte Carlo Risk Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_solve_irr()
+        test_outputs_and_ordering()
+        test_determinism_across_workers()
+        print("🎉 All Monte Carlo tests passed!")
+    except AssertionError as e:
+        print(f"❌ Monte Carlo test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
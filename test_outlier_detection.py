@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming outlier detection
+"""
+
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+from market_stats import QuantileSketch
+from outlier_detection import OutlierDetector
+from real_estate_ai_engine import Property, RealEstateAnalysisEngine, build_output_data
+
+class RecordingService:
+    """Stands in for GroqAIService and records which properties were sent"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def send_chat_completion(self, messages, model=None):
+        self.prompts.append(messages[0]["content"])
+        return {"success": False, "content": ""}
+
+def market_listings(rng, n, cap_rate=6.0, price_per_sqft=300.0):
+    return rng.normal(cap_rate, 0.4, n), rng.normal(price_per_sqft, 25.0, n)
+
+def test_add_many():
+    """Test that bulk sketch inserts match one-by-one inserts"""
+    print("📥 Testing Bulk Sketch Inserts...")
+
+    values = np.random.default_rng(0).normal(0, 5, 5000)
+    one, bulk = QuantileSketch(), QuantileSketch()
+    for value in values:
+        one.add(value)
+    bulk.add_many(np.append(values, np.nan))
+    assert bulk.count == one.count == 5000
+    for q in (0.1, 0.5, 0.9):
+        assert bulk.quantile(q) == one.quantile(q)
+
+    print("✅ Bulk sketch insert test passed!\n")
+
+def test_flags():
+    """Test mispriced and distressed flags against each market"""
+    print("🔎 Testing Outlier Flags...")
+
+    rng = np.random.default_rng(1)
+    detector = OutlierDetector()
+    cap_a, psf_a = market_listings(rng, 500)
+    cap_b, psf_b = market_listings(rng, 500, cap_rate=9.0, price_per_sqft=120.0)
+    detector.observe_batch(["A"] * 500 + ["B"] * 500, np.append(cap_a, cap_b), np.append(psf_a, psf_b))
+
+    # 9% is normal in market B but far above market A
+    scores = detector.observe_batch(["A", "B", "A", "A"], [9.0, 9.0, 6.0, 6.0], [300.0, 120.0, 150.0, 300.0])
+    assert list(scores["category"]) == ["mispriced", "", "distressed", ""]
+    assert scores["cap_rate_z"][0] > 5 and abs(scores["cap_rate_z"][1]) < 1
+    assert scores["price_per_sqft_z"][2] < -3
+
+    # Markets below the minimum sample count are never flagged
+    quiet = OutlierDetector(min_samples=30)
+    scores = quiet.observe_batch(["C"] * 5, [5, 5, 5, 5, 20], [100] * 5)
+    assert not scores["category"].any()
+
+    print("✅ Outlier flag test passed!\n")
+
+def test_engine_escalation():
+    """Test that only flagged properties reach the AI"""
+    print("🤖 Testing AI Escalation...")
+
+    rng = np.random.default_rng(2)
+    cap_rate, price_per_sqft = market_listings(rng, 60)
+    properties = [
+        Property(id=f"P{i:03d}", address=f"{i} Market St", purchase_price=price_per_sqft[i] * 1000,
+                 annual_rent=price_per_sqft[i] * 10 * cap_rate[i], operating_expenses=0, market_cap_rate=0.06,
+                 square_footage=1000, market_id="austin")
+        for i in range(60)
+    ]
+    properties[7].annual_rent *= 2
+
+    service = RecordingService()
+    engine = RealEstateAnalysisEngine(service, outlier_detector=OutlierDetector())
+    results = {r.property_id: r for r in engine.analyze_properties(properties)}
+
+    assert results["P007"].outlier == "mispriced"
+    assert len(service.prompts) == 1 and '"P007"' in service.prompts[0] and '"P008"' not in service.prompts[0]
+    assert all(r.recommendation for r in results.values())
+    rows = {row["property_id"]: row for row in build_output_data(properties, list(results.values()))["analysis_results"]}
+    assert rows["P007"]["category"] == "mispriced" and rows["P008"]["category"] == "cap_rate_arbitrage"
+
+    service = RecordingService()
+    RealEstateAnalysisEngine(service, outlier_detector=OutlierDetector()).analyze_properties(properties[8:])
+    assert not service.prompts
+
+    print("✅ AI escalation test passed!\n")
+
+def test_scale():
+    """Test classifying a million listings across a thousand markets"""
+    print("⚡ Testing Outlier Detection at Scale...")
+
+    rng = np.random.default_rng(3)
+    n = 1_000_000
+    market = rng.integers(0, 1000, n)
+    names = np.array([f"market-{i}" for i in range(1000)])[market]
+    cap_rate = 5 + (market % 7) * 0.4 + rng.normal(0, 0.5, n)
+    price_per_sqft = 200 + (market % 11) * 25 + rng.normal(0, 30, n)
+    cap_rate[:1000] += 4
+
+    detector = OutlierDetector()
+    start = time.perf_counter()
+    categories = [
+        detector.observe_batch(names[i:i + 100_000], cap_rate[i:i + 100_000],
+                               price_per_sqft[i:i + 100_000])["category"]
+        for i in range(0, n, 100_000)
+    ]
+    elapsed = time.perf_counter() - start
+    categories = np.concatenate(categories)
+
+    assert (categories[:1000] == "mispriced").mean() > 0.95
+    assert (categories[1000:] != "").mean() < 0.02
+    assert len(detector.markets) == 1000
+    print(f"   {n:,} listings classified in {elapsed:.2f}s")
+    print("✅ Outlier detection scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Outlier Detection Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_add_many()
+        test_flags()
+        test_engine_escalation()
+        test_scale()
+        print("🎉 All outlier detection tests passed!")
+    except AssertionError as e:
+        print(f"❌ Outlier detection test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
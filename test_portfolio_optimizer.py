@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the budget-constrained portfolio optimizer
+"""
+
+import time
+
+import numpy as np
+
+from portfolio_optimizer import optimize_portfolio
+
+def make_rows(rng, count):
+    """Analysis-like rows with whole-thousand prices"""
+    return [
+        {
+            "property_id": f"PROP{i:04d}",
+            "purchase_price": float(rng.integers(1, 20)) * 1000,
+            "noi": float(rng.uniform(0, 100)),
+            "market_id": f"M{i % 3}",
+            "category": ("mispriced", "distressed")[i % 2],
+        }
+        for i in range(count)
+    ]
+
+def brute_force(rows, budget, market_share=None, category_share=None):
+    """Best NOI over every subset that respects the budget and caps"""
+    best = 0.0
+    for mask in range(1 << len(rows)):
+        chosen = [row for i, row in enumerate(rows) if mask >> i & 1]
+        if sum(row["purchase_price"] for row in chosen) > budget:
+            continue
+        feasible = True
+        for key, share in (("market_id", market_share), ("category", category_share)):
+            if share is None:
+                continue
+            spent = {}
+            for row in chosen:
+                spent[row[key]] = spent.get(row[key], 0) + row["purchase_price"]
+            feasible &= all(value <= share * budget for value in spent.values())
+        if feasible:
+            best = max(best, sum(row["noi"] for row in chosen))
+    return best
+
+def test_matches_brute_force():
+    """Test exact selections against exhaustive search"""
+    print("🧮 Testing Exact Selection...")
+
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        rows = make_rows(rng, 12)
+        for market_share, category_share in ((None, None), (0.4, None), (None, 0.5)):
+            selection = optimize_portfolio(rows, 60000, max_market_share=market_share,
+                                           max_category_share=category_share, resolution=60)
+            assert selection.exact
+            expected = brute_force(rows, 60000, market_share, category_share)
+            assert abs(selection.total_value - expected) < 1e-6, (market_share, category_share)
+
+    print("✅ Exact selection test passed!\n")
+
+def test_caps_respected():
+    """Test that both caps hold when categories are repaired greedily"""
+    print("🧱 Testing Concentration Caps...")
+
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        rows = make_rows(rng, 12)
+        selection = optimize_portfolio(rows, 60000, max_market_share=0.4, max_category_share=0.5,
+                                       resolution=60)
+        assert selection.total_cost <= 60000
+        assert all(spent <= 0.4 * 60000 for spent in selection.by_market.values())
+        assert all(spent <= 0.5 * 60000 for spent in selection.by_category.values())
+        assert selection.total_value <= brute_force(rows, 60000, 0.4, 0.5) + 1e-6
+
+    # Per-key caps and non-positive objectives
+    rows = make_rows(rng, 6)
+    rows[0]["noi"] = -5.0
+    selection = optimize_portfolio(rows, 1e6, max_market_share={"M1": 0.0})
+    assert rows[0]["property_id"] not in selection.property_ids
+    assert "M1" not in selection.by_market
+
+    print("✅ Concentration caps test passed!\n")
+
+def test_scale():
+    """Test thousands of candidates with market caps"""
+    print("⚡ Testing Optimizer Scale...")
+
+    rng = np.random.default_rng(2)
+    rows = make_rows(rng, 5000)
+    start = time.perf_counter()
+    selection = optimize_portfolio(rows, 5e6, max_market_share=0.4)
+    elapsed = time.perf_counter() - start
+
+    assert selection.total_cost <= 5e6 and selection.exact
+    assert elapsed < 1.0
+
+    print(f"   5,000 candidates in {elapsed * 1000:.0f} ms, {len(selection.property_ids)} selected")
+    print("✅ Optimizer scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Portfolio Optimizer Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_matches_brute_force()
+        test_caps_respected()
+        test_scale()
+        print("🎉 All portfolio optimizer tests passed!")
+    except AssertionError as e:
+        print(f"❌ Portfolio optimizer test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
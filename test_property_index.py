@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the property lookup index
+"""
+
+from property_index import PropertyIndex
+
+ROWS = [
+    {"property_id": "PROP001", "address": "123 Main St, Downtown"},
+    {"property_id": "PROP002", "address": "456 Oak Ave, Suburbs"},
+    {"property_id": "PROP003", "address": "789 Pine Rd, University Area"},
+    {"property_id": "PROP004", "address": "321 Elm St, Business District"},
+    {"property_id": "LOFT010", "address": "10 Mainland Blvd, Harbor"},
+]
+
+def test_lookup():
+    """Test O(1) id lookup"""
+    print("🔑 Testing ID Lookup...")
+
+    index = PropertyIndex(ROWS)
+    assert index.get("PROP003")["address"].startswith("789")
+    assert index.get("MISSING") is None
+    assert len(index) == len(ROWS)
+
+    print("✅ ID lookup test passed!\n")
+
+def test_prefix_search():
+    """Test prefix search over ids and address words"""
+    print("🔤 Testing Prefix Search...")
+
+    index = PropertyIndex(ROWS)
+    assert [r["property_id"] for r in index.search("prop00")] == ["PROP001", "PROP002", "PROP003", "PROP004"]
+    assert [r["property_id"] for r in index.search("oak")] == ["PROP002"]
+    assert {r["property_id"] for r in index.search("main")} == {"PROP001", "LOFT010"}
+    assert len(index.search("prop", limit=2)) == 2
+    assert len(index.search("")) == len(ROWS)
+
+    # An exact id prefix outranks earlier address words, even past the limit
+    rows = [{"property_id": f"A{i:03d}", "address": f"{i} Mainstay Rd"} for i in range(30)]
+    rows.append({"property_id": "MAINZ1", "address": "1 Harbor Way"})
+    index = PropertyIndex(rows)
+    found = [r["property_id"] for r in index.search("main", limit=5)]
+    assert found[0] == "MAINZ1" and len(found) == 5
+
+    print("✅ Prefix search test passed!\n")
+
+def test_fuzzy_search():
+    """Test trigram search for typos and substrings"""
+    print("🔍 Testing Fuzzy Search...")
+
+    index = PropertyIndex(ROWS)
+    assert index.search("univercity area")[0]["property_id"] == "PROP003"
+    assert index.search("Business Distr")[0]["property_id"] == "PROP004"
+    assert index.search("zzzzzz") == []
+
+    print("✅ Fuzzy search test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Property Index Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_lookup()
+        test_prefix_search()
+        test_fuzzy_search()
+        print("🎉 All property index tests passed!")
+    except AssertionError as e:
+        print(f"❌ Property index test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
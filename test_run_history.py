@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the run history store
+"""
+
+import os
+import tempfile
+
+from run_history import DIFF_QUERY, RunHistoryStore
+
+def make_run(timestamp, ranking):
+    """Engine-like output document with properties ranked in the given order"""
+    return {
+        "timestamp": timestamp,
+        "total_properties": len(ranking),
+        "analysis_results": [
+            {
+                "property_id": property_id,
+                "rank": rank,
+                "score": 100.0 - rank,
+                "cap_rate": 10.0 - rank * 0.01,
+                "noi": 50000.0,
+                "risk_level": "low",
+                "market_position": "above_market",
+                "category": "cap_rate_arbitrage",
+                "recommendation": "buy",
+            }
+            for rank, property_id in enumerate(ranking, 1)
+        ],
+        "summary": {"total_noi": 50000.0 * len(ranking), "cube": {"ignored": True}},
+    }
+
+def test_record_and_diff():
+    """Test persisting runs and finding rank movers"""
+    print("🗂️  Testing Run History Diff...")
+
+    ids = [f"PROP{i:03d}" for i in range(50)]
+    moved = ids[:]
+    moved.insert(30, moved.pop(0))   # PROP000 falls from #1 ...
+    moved.insert(2, moved.pop(45))   # ... to #32 once PROP045 climbs from #46 to #3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RunHistoryStore(os.path.join(tmp, "history.db"))
+        run_a = store.record_run(make_run("2026-01-01T00:00:00", ids))
+        run_b = store.record_run(make_run("2026-01-08T00:00:00", moved))
+
+        assert store.latest_run_ids(2) == [run_b, run_a]
+        movers = {row["property_id"]: row for row in store.rank_movers(run_a, run_b, 10)}
+        assert set(movers) == {"PROP000", "PROP045"}
+        assert movers["PROP000"]["rank_change"] == -31
+        assert movers["PROP045"]["rank_change"] == 43
+        assert movers["PROP045"]["score_delta"] == 43.0
+
+        assert len(store.score_deltas(run_a, run_b)) == 50
+        assert [row["run_id"] for row in store.property_history("PROP000")] == [run_a, run_b]
+        assert store.top_properties(run_b, 3)[2]["property_id"] == "PROP045"
+        assert "cube" not in store.run_summary(run_a)
+
+        # Recording the same run again replaces it instead of duplicating rows
+        store.record_run(make_run("2026-01-08T00:00:00", moved))
+        assert len(store.score_deltas(run_a, run_b)) == 50
+        store.close()
+
+    print("✅ Run history diff test passed!\n")
+
+def test_diff_uses_indexes():
+    """Test that the diff query is answered through the primary key"""
+    print("📇 Testing Diff Query Plan...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RunHistoryStore(os.path.join(tmp, "history.db"))
+        plan = " ".join(
+            row["detail"] for row in store.conn.execute(
+                "EXPLAIN QUERY PLAN " + DIFF_QUERY, {"run_a": "a", "run_b": "b", "min_rank_change": 10}
+            )
+        )
+        store.close()
+
+    print(f"   Plan: {plan}")
+    assert "SEARCH a USING PRIMARY KEY" in plan
+    assert "SEARCH b USING PRIMARY KEY" in plan
+
+    print("✅ Diff query plan test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Run History Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_record_and_diff()
+        test_diff_uses_indexes()
+        print("🎉 All run history tests passed!")
+    except AssertionError as e:
+        print(f"❌ Run history test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
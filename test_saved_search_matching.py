@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for saved-search matching
+"""
+
+import time
+
+import numpy as np
+
+from deals_service import scored_deal, synthetic_deals
+from saved_search_matching import (
+    IntervalTree,
+    SavedSearchIndex,
+    prefs_match,
+    synthetic_searches,
+)
+
+def make_batch(deal_count, search_count, seed=0):
+    deals = [scored_deal(deal) for deal in synthetic_deals(deal_count, seed=seed)]
+    cities = sorted({f"{deal['city']}, {deal['country']}" for deal in deals})
+    return deals, synthetic_searches(search_count, cities, seed=seed)
+
+def test_interval_tree():
+    """Test stabbing queries and counts against a direct scan"""
+    print("🌲 Testing Interval Tree...")
+
+    rng = np.random.default_rng(0)
+    lows = np.round(rng.uniform(0, 100, 5000), 1)
+    highs = lows + np.round(rng.exponential(10, 5000), 1)
+    highs[:200] = np.inf
+    lows[200:400] = -np.inf
+    # Many identical intervals must not keep a node from splitting
+    lows[400:1400], highs[400:1400] = 50.0, 50.0
+    tree = IntervalTree(lows, highs)
+    assert len(tree) == 5000
+
+    for x in list(rng.uniform(-10, 130, 300)) + [0.0, 50.0, 100.0, float(lows[500]), float(highs[600])]:
+        expected = np.flatnonzero((lows <= x) & (x <= highs))
+        assert np.array_equal(np.sort(tree.stab(x)), expected), x
+        assert tree.count(x) == len(expected), x
+    assert len(IntervalTree([], []).stab(1.0)) == 0
+
+    print("✅ Interval tree test passed!\n")
+
+def test_matches_direct_check():
+    """Test that single and batch matching agree with checking every search directly"""
+    print("🔎 Testing Matches Against Direct Checks...")
+
+    deals, searches = make_batch(300, 3000, seed=1)
+    deals[0] = dict(deals[0], capRate=0)
+    deals[1] = dict(deals[1], risk="unknown", category="new_category")
+    deals[2] = dict(deals[2], city="Lisbon", country="Portugal")
+    deals[3] = {key: value for key, value in deals[3].items() if key != "price"}
+    searches[:8] = [
+        {"id": "everything"},
+        {"id": "inverted", "capRateMin": 8.8, "capRateMax": 8.1},
+        {"id": "no-cap-rate", "capRateMax": 100, "risk": "any", "categories": []},
+        {"id": "by-country", "markets": ["UAE"], "minPrice": 0},
+        {"id": "by-market", "markets": ["Lisbon, Portugal"]},
+        {"id": "unknown-risk", "risk": "unknown"},
+        {"id": "new-category", "categories": ["new_category"]},
+        {"id": "blank-market", "markets": ["", " "]},
+    ]
+    index = SavedSearchIndex(searches)
+
+    for deal in deals:
+        expected = [search["id"] for search in searches if prefs_match(search, deal)]
+        assert index.match_ids(deal) == expected, deal["id"]
+        assert "inverted" not in expected
+    assert "everything" in index.match_ids(deals[3]) and "no-cap-rate" not in index.match_ids(deals[0])
+    assert index.match_ids(deals[2])[:1] == ["everything"] and "by-market" in index.match_ids(deals[2])
+    assert {"new-category", "unknown-risk"} <= set(index.match_ids(deals[1]))
+    assert all("blank-market" in index.match_ids(deal) for deal in deals)
+
+    searched, matched = index.match_batch(deals)
+    got = sorted((index.ids[s], int(d)) for s, d in zip(searched.tolist(), matched.tolist()))
+    expected = sorted((search["id"], j) for j, deal in enumerate(deals) for search in searches if prefs_match(search, deal))
+    assert got == expected
+    assert list(searched) == sorted(searched)
+
+    alerts = index.alerts(deals)
+    assert sum(map(len, alerts.values())) == len(expected)
+    assert alerts["everything"] == [deal["id"] for deal in deals]
+
+    print("✅ Direct check test passed!\n")
+
+def test_nightly_batch():
+    """Test fan-out of a 10k-deal batch against 100k saved searches"""
+    print("🔔 Testing Nightly Batch...")
+
+    deals, searches = make_batch(10_000, 100_000)
+    start = time.perf_counter()
+    index = SavedSearchIndex(searches)
+    built = time.perf_counter()
+    searched, matched = index.match_batch(deals)
+    elapsed = time.perf_counter() - built
+    print(f"   index {built - start:.2f} s, match {elapsed:.2f} s, {len(searched):,} alerts")
+
+    for j in (0, 4321, 9999):
+        expected = [i for i, search in enumerate(searches) if prefs_match(search, deals[j])]
+        assert list(searched[matched == j]) == expected
+    assert elapsed < 15
+
+    print("✅ Nightly batch test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Saved Search Matching Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_interval_tree()
+        test_matches_direct_check()
+        test_nightly_batch()
+        print("🎉 All saved search matching tests passed!")
+    except AssertionError as e:
+        print(f"❌ Saved search matching test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
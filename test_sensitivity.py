@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the what-if scenario grid
+"""
+
+import time
+
+import numpy as np
+
+from investment_metrics import compute_metrics
+from sensitivity import evaluate_scenarios, scenario_grid
+
+def test_grid_values():
+    """Test shocked cap rates and ranks against direct calculation"""
+    print("🔀 Testing Scenario Values...")
+
+    price = np.array([500000.0, 750000.0, 300000.0])
+    rent = np.array([60000.0, 90000.0, 42000.0])
+    expenses = np.array([15000.0, 25000.0, 12000.0])
+    market_cap = np.array([0.06, 0.07, 0.08])
+
+    grid = scenario_grid(annual_rent=(-0.1, 0.0), operating_expenses=(0.0, 0.05), market_cap_rate=(0.0, 0.5))
+    assert grid.shape == (8, 4)
+
+    results = evaluate_scenarios(price, rent, expenses, market_cap, grid,
+                                 fields=("noi", "cap_rate", "cap_rate_spread", "rank"), dtype=np.float64)
+    for i, (p, r, e, m) in enumerate(grid):
+        cap_rate = compute_metrics(price * (1 + p), rent * (1 + r), expenses * (1 + e))["cap_rate"]
+        assert np.allclose(results["cap_rate"][i], cap_rate)
+        assert np.allclose(results["cap_rate_spread"][i], cap_rate - market_cap * (1 + m) * 100)
+        expected_rank = np.empty(3, dtype=int)
+        expected_rank[np.argsort(-cap_rate)] = [1, 2, 3]
+        assert np.array_equal(results["rank"][i], expected_rank)
+        assert abs(results["average_cap_rate"][i] - cap_rate.mean()) < 1e-9
+
+    # Raising market cap rates by half pushes properties out of "above market"
+    assert results["above_market_count"][0] > results["above_market_count"][1]
+
+    print(f"   Base case ranks: {results['rank'][2].tolist()}")
+    print("✅ Scenario values test passed!\n")
+
+def test_price_shock_keeps_ranks():
+    """Test that a uniform price shock changes cap rates but not ranks"""
+    print("🏷️  Testing Price Shocks...")
+
+    rng = np.random.default_rng(1)
+    price = rng.uniform(1e5, 1e6, 200)
+    grid = scenario_grid(purchase_price=(-0.2, 0.0, 0.2))
+    results = evaluate_scenarios(price, price * rng.uniform(0.06, 0.12, 200), price * 0.03,
+                                 np.full(200, 0.06), grid)
+
+    assert np.array_equal(results["rank"][0], results["rank"][2])
+    assert np.all(results["cap_rate"][0] > results["cap_rate"][1])
+
+    try:
+        evaluate_scenarios(price, price, price, price, grid, fields=("irr",))
+        assert False, "unknown field accepted"
+    except ValueError:
+        pass
+
+    print("✅ Price shock test passed!\n")
+
+def test_scale():
+    """Test a 50×50 grid over 10k properties"""
+    print("⚡ Testing Grid Scale...")
+
+    rng = np.random.default_rng(0)
+    n = 10_000
+    price = rng.uniform(1e5, 2e6, n)
+    grid = scenario_grid(annual_rent=np.linspace(-0.2, 0.2, 50), operating_expenses=np.linspace(-0.1, 0.2, 50))
+
+    start = time.perf_counter()
+    results = evaluate_scenarios(price, price * rng.uniform(0.06, 0.14, n), price * 0.03,
+                                 rng.uniform(0.04, 0.08, n), grid)
+    elapsed = time.perf_counter() - start
+
+    assert results["rank"].shape == (2500, n)
+    assert results["rank"][0].min() == 1 and results["rank"][0].max() == n
+
+    print(f"   2,500 scenarios × 10k properties in {elapsed:.2f}s")
+    print("✅ Grid scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Sensitivity Grid Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_grid_values()
+        test_price_shock_keeps_ranks()
+        test_scale()
+        print("🎉 All sensitivity tests passed!")
+    except AssertionError as e:
+        print(f"❌ Sensitivity test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script for sharded analysis across worker processes
+"""
+
+import heapq
+import os
+import socket
+import time
+
+import numpy as np
+
+# The engine refuses to import without a key; these tests never call the API
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+from market_stats import MarketAggregates
+from real_estate_ai_engine import Property, build_output_data
+from summary_cube import classify_loss_probability
+from sharded_analysis import (
+    LocalWorkers,
+    ShardCoordinator,
+    ShardError,
+    partition,
+    recv_frame,
+    send_frame,
+)
+
+MARKETS = ["austin", "denver", "phoenix", "tampa", "raleigh", "boise", "reno"]
+
+def make_properties(count, seed=0):
+    """Properties spread unevenly over a few markets"""
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.lognormal(13, 0.4, count), -3)
+    markets = rng.choice(len(MARKETS), count, p=[0.3, 0.2, 0.15, 0.15, 0.1, 0.05, 0.05])
+    return [
+        Property(
+            id=f"PROP{i:06d}",
+            address=f"{i} Test St",
+            purchase_price=float(price[i]),
+            annual_rent=float(price[i] * rng.uniform(0.08, 0.14)),
+            operating_expenses=float(price[i] * 0.03),
+            market_cap_rate=0.06,
+            market_id=MARKETS[markets[i]],
+        )
+        for i in range(count)
+    ]
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+def test_frames_and_partitions():
+    """Test the frame protocol and both partitionings"""
+    print("🧩 Testing Frames and Partitions...")
+
+    left, right = socket.socketpair()
+    message = {"op": "analyze", "properties": [{"id": "P1", "price": 1.5}] * 1000, "note": "é"}
+    send_frame(left, message)
+    assert recv_frame(right) == message
+    left.close()
+    assert recv_frame(right) is None
+    right.close()
+
+    properties = make_properties(5000)
+    by_market = partition(properties, 4, "market")
+    assert sum(len(shard) for shard in by_market) == len(properties)
+    owners = {}
+    for i, shard in enumerate(by_market):
+        for prop in shard:
+            assert owners.setdefault(prop.market_id, i) == i
+    by_hash = partition(properties, 8, "hash")
+    assert len(by_hash) == 8 and max(map(len, by_hash)) < 1.2 * len(properties) / 8
+    try:
+        partition(properties, 2, "city")
+        assert False, "unknown partitioning accepted"
+    except ValueError:
+        pass
+
+    aggregates = MarketAggregates.from_rows(
+        {"property_id": f"P{i}", "market_id": MARKETS[i % 3], "cap_rate": i % 11, "purchase_price": i, "score": 50}
+        for i in range(300)
+    )
+    restored = MarketAggregates.from_state(aggregates.to_state())
+    assert restored.to_dict() == aggregates.to_dict()
+
+    print("✅ Frame and partition test passed!\n")
+
+def test_merged_results():
+    """Test that merged shard outputs match a single-process analysis"""
+    print("🔀 Testing Merged Results...")
+
+    properties = make_properties(3000, seed=1)
+    single = build_output_data(properties, _analyze_locally(properties))
+    expected_top = [row["property_id"] for row in heapq.nlargest(10, single["analysis_results"],
+                                                                   key=lambda row: row["cap_rate"])]
+
+    with LocalWorkers(3) as workers:
+        coordinator = ShardCoordinator(workers.addresses, top_k=10)
+        assert len({reply["pid"] for reply in coordinator.ping()}) == 3
+        for by in ("market", "hash"):
+            report = coordinator.run(properties, by=by, use_ai=False, simulate=False)
+            summary = report["summary"]
+            assert report["total_properties"] == len(properties)
+            assert [row["property_id"] for row in report["top_results"]] == expected_top
+            assert [row["rank"] for row in report["top_results"]] == list(range(1, 11))
+            assert abs(summary["total_noi"] - single["summary"]["total_noi"]) < 1e-3
+            assert abs(summary["average_cap_rate"] - single["summary"]["average_cap_rate"]) < 1e-9
+            assert summary["category_distribution"] == single["summary"]["category_distribution"]
+            assert summary["total_investment"] == single["summary"]["total_investment"]
+            for market, stats in single["summary"]["market_stats"].items():
+                merged = summary["market_stats"][market]
+                assert merged["count"] == stats["count"]
+                assert abs(merged["cap_rate"]["mean"] - stats["cap_rate"]["mean"]) < 1e-9
+                assert abs(merged["cap_rate"]["std"] - stats["cap_rate"]["std"]) < 1e-9
+                assert merged["cap_rate"]["median"] == stats["cap_rate"]["median"]
+            assert sum(shard["properties"] for shard in report["shards"]) == len(properties)
+
+        # Simulated shards classify risk by loss probability, like the engine and the worker pool
+        report = coordinator.run(properties[:300], use_ai=False)
+        assert all(row["risk_level"] == classify_loss_probability(row["probability_of_loss"])
+                   and -100 <= row["irr_p50"] for row in report["top_results"])
+
+    print("✅ Merged result test passed!\n")
+
+def _analyze_locally(properties):
+    from analysis_worker import analyze_chunk
+    return analyze_chunk(properties, use_ai=False)
+
+def test_worker_failures():
+    """Test that unreachable workers are skipped and failed shards reported"""
+    print("🛟 Testing Worker Failures...")
+
+    properties = make_properties(500, seed=2)
+    with LocalWorkers(1) as workers:
+        coordinator = ShardCoordinator([("localhost", unused_port())] + workers.addresses)
+        report = coordinator.run(properties, by="hash", shards=4, use_ai=False)
+        assert report["total_properties"] == 500 and len(report["shards"]) == 4
+
+        broken = make_properties(10)
+        broken[3].purchase_price = "not a price"
+        try:
+            ShardCoordinator(workers.addresses).run(broken, use_ai=False)
+            assert False, "failed shard not reported"
+        except ShardError:
+            pass
+
+    try:
+        ShardCoordinator([("localhost", unused_port())]).run(properties, use_ai=False)
+        assert False, "run without workers succeeded"
+    except ShardError:
+        pass
+
+    print("✅ Worker failure test passed!\n")
+
+def test_scaling():
+    """Test throughput as workers are added"""
+    print("📈 Testing Worker Scaling...")
+
+    properties = make_properties(40000, seed=3)
+    cores = os.cpu_count() or 1
+    throughput = {}
+    for count in (1, 4):
+        with LocalWorkers(count) as workers:
+            start = time.perf_counter()
+            ShardCoordinator(workers.addresses).run(properties, by="hash", use_ai=False, simulate=False)
+            throughput[count] = len(properties) / (time.perf_counter() - start)
+        print(f"   {count} worker(s): {throughput[count]:,.0f} properties/s")
+
+    speedup = throughput[4] / throughput[1]
+    print(f"   speedup {speedup:.2f}x on {cores} core(s)")
+    # Near-linear up to the number of cores, and little coordination overhead beyond it
+    assert speedup > 0.7 * min(4, cores) if cores > 1 else speedup > 0.7
+
+    print("✅ Worker scaling test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Sharded Analysis Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_frames_and_partitions()
+        test_merged_results()
+        test_worker_failures()
+        test_scaling()
+        print("🎉 All sharded analysis tests passed!")
+    except AssertionError as e:
+        print(f"❌ Sharded analysis test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+"""
+
+import os
+import threading
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+import real_estate_ai_engine
+from real_estate_ai_engine import GroqAIService, RealEstateAnalysisEngine, sample_properties
+from single_flight import SingleFlight, fingerprint
+
+HERD_SIZE = 20
+
+def run_herd(target, count=HERD_SIZE):
+    """Start ``count`` threads at once and return their results"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class SlowChatAPI:
+    """Stands in for requests.post to the chat endpoint and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url, headers=None, json=None, timeout=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+class CountingService:
+    """Stands in for GroqAIService inside the engine"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send_chat_completion(self, messages, model=None):
+        self.calls += 1
+        time.sleep(0.2)
+        return {"success": False, "content": ""}
+
+def test_single_flight():
+    """Test sharing, errors and that finished calls are not cached"""
+    print("🛬 Testing Single Flight...")
+
+    flights = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.1)
+        return {"value": value}
+
+    results = run_herd(lambda: flights.do("same", slow, 1))
+    assert len(calls) == 1 and flights.executions == 1 and flights.coalesced == HERD_SIZE - 1
+    assert all(result == ({"value": 1}, True) for result in results)
+    assert flights.in_flight() == 0
+
+    assert flights.do("same", slow, 2) == ({"value": 2}, False)
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    errors = run_herd(lambda: flights.do("broken", failing), count=5)
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+    assert fingerprint([{"a": 1, "b": 2}]) == fingerprint([{"b": 2, "a": 1}])
+    assert fingerprint(sample_properties()) != fingerprint(sample_properties()[1:])
+
+    print("✅ Single flight test passed!\n")
+
+def test_chat_herd():
+    """Test that a herd of identical chat requests makes one API call"""
+    print("💬 Testing Chat Completion Herd...")
+
+    api = SlowChatAPI()
+    original = real_estate_ai_engine.requests.post
+    real_estate_ai_engine.requests.post = api
+    try:
+        messages = [{"role": "user", "content": "Analyze PROP001"}]
+        responses = run_herd(lambda: GroqAIService("key", "https://example.test").send_chat_completion(
+            messages, model="test-model"))
+        assert api.calls == 1
+        assert all(r == {"choices": [{"message": {"content": "ok"}}]} for r in responses)
+        responses[0]["choices"].clear()
+        assert responses[1]["choices"]
+
+        run_herd(lambda: GroqAIService("key", "https://example.test").send_chat_completion(
+            [{"role": "user", "content": "Analyze PROP002"}], model="test-model"), count=3)
+        assert api.calls == 2
+
+        # Another account's identical request is not answered with this one's response
+        keys = iter(["key", "other key"] * 2)
+        lock = threading.Lock()
+
+        def send():
+            with lock:
+                key = next(keys)
+            return GroqAIService(key, "https://example.test").send_chat_completion(messages, model="test-model")
+
+        run_herd(send, count=4)
+        assert api.calls == 4
+    finally:
+        real_estate_ai_engine.requests.post = original
+
+    print("✅ Chat completion herd test passed!\n")
+
+def test_analysis_herd():
+    """Test that concurrent identical analyses share one run and one AI call"""
+    print("🏘️  Testing Analysis Herd...")
+
+    service = CountingService()
+    portfolios = [sample_properties() for _ in range(HERD_SIZE)]
+    index = iter(range(HERD_SIZE))
+    lock = threading.Lock()
+
+    def analyze():
+        with lock:
+            properties = portfolios[next(index)]
+        return RealEstateAnalysisEngine(service).analyze_properties(properties)
+
+    results = run_herd(analyze)
+    assert service.calls == 1
+    assert all([r.property_id for r in result] == [r.property_id for r in results[0]] for result in results)
+    assert results[0][0] is not results[1][0]
+    assert all(r.recommendation for result in results for r in result)
+
+    RealEstateAnalysisEngine(service).analyze_properties(sample_properties()[:2])
+    assert service.calls == 2
+
+    # Engines with different AI services never share results
+    services = [CountingService(), CountingService()]
+    index = iter(range(HERD_SIZE))
+
+    def analyze_with_either():
+        with lock:
+            i = next(index)
+        return RealEstateAnalysisEngine(services[i % 2]).analyze_properties(sample_properties())
+
+    run_herd(analyze_with_either)
+    assert [s.calls for s in services] == [1, 1]
+
+    print("✅ Analysis herd test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Single Flight Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_single_flight()
+        test_chat_herd()
+        test_analysis_herd()
+        print("🎉 All single flight tests passed!")
+    except AssertionError as e:
+        print(f"❌ Single flight test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
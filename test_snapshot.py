@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for binary deal snapshots
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+from chat_query_planner import ChatAssistant
+from deals_service import (
+    BENCHMARK_QUERIES,
+    DealStore,
+    deal_etag,
+    deal_since,
+    open_deal_snapshot,
+    serve,
+    synthetic_deals,
+    write_deal_snapshot,
+)
+from snapshot import (
+    FORMAT_VERSION,
+    KeyIndex,
+    LazyRecords,
+    Snapshot,
+    SnapshotFormatError,
+    encode_keys,
+    encode_records,
+    write_snapshot,
+)
+
+def test_format():
+    """Test array round trips, lazy records, key lookups and format checks"""
+    print("🗜️  Testing Snapshot Format...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.snapshot")
+        arrays = {"ints": np.arange(10), "floats": np.linspace(0, 1, 7), "grid": np.ones((3, 4), dtype=np.float32),
+                  "empty": np.zeros(0), "names": np.array(["low", "medium", "high"])}
+        write_snapshot(path, arrays, {"kind": "test", "version": 7})
+        with Snapshot(path) as snapshot:
+            assert snapshot.meta == {"kind": "test", "version": 7}
+            for name, array in arrays.items():
+                assert snapshot[name].dtype == array.dtype and np.array_equal(snapshot[name], array), name
+            assert not snapshot["ints"].flags.writeable
+
+        records = [{"id": "b", "price": 1.5}, {"id": "a", "title": "Flat in Zürich"}, {"id": "c"}]
+        lazy = LazyRecords(**encode_records(records))
+        assert len(lazy) == 3 and list(lazy) == records and lazy[-1] == records[-1] and lazy[1:] == records[1:]
+        keys = encode_keys(["b", "a", "c", "a"])
+        index = KeyIndex(keys["sorted"], keys["positions"])
+        assert index.get("b") == 0 and index.get("a") == 3 and index.get("d") is None and index.get("") is None
+
+        with open(path, "r+b") as f:
+            f.seek(8)
+            f.write((FORMAT_VERSION + 1).to_bytes(4, "little"))
+        with open(os.path.join(tmp, "deals.json"), "w") as f:
+            json.dump(records, f)
+        for bad in (path, os.path.join(tmp, "deals.json")):
+            try:
+                Snapshot(bad)
+                assert False, f"{bad} accepted"
+            except SnapshotFormatError:
+                pass
+
+    print("✅ Snapshot format test passed!\n")
+
+def test_deal_snapshot_queries():
+    """Test that a mapped store answers exactly like the one it was written from"""
+    print("🔍 Testing Snapshot Queries...")
+
+    store = DealStore(synthetic_deals(5000, seed=3), version=42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deals.snapshot")
+        write_deal_snapshot(store, path)
+        mapped = open_deal_snapshot(path)
+
+        assert len(mapped) == len(store) and mapped.version == 42 and mapped.epoch == store.epoch
+        queries = list(BENCHMARK_QUERIES) + [{"sort": "priceDesc", "limit": "200", "offset": "30"},
+                                             {"markets": "uk,dubai", "discountMin": "5", "sort": "capRate"}]
+        for params in queries:
+            assert mapped.handle_query(params) == store.handle_query(params), params
+        for field in ("capRate", "price"):
+            assert mapped.top(field, False, 5, risk="high") == store.top(field, False, 5, risk="high")
+        deal = store.deals[1234]
+        assert mapped.get(deal["id"]) == deal and mapped.get("missing") is None
+
+        question = "Top 3 distressed deals under $400k in Mumbai"
+        assert ChatAssistant(mapped).answer(question)["response"] == ChatAssistant(store).answer(question)["response"]
+
+    print("✅ Snapshot query test passed!\n")
+
+def test_cold_start():
+    """Test that opening a snapshot costs the same whatever its size"""
+    print("🚀 Testing Cold Start...")
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (20_000, 200_000):
+            path = os.path.join(tmp, f"deals-{n}.snapshot")
+            deals = synthetic_deals(n, seed=4)
+            start = time.perf_counter()
+            json.loads(json.dumps(deals))
+            store = DealStore(deals)
+            rebuild = time.perf_counter() - start
+            write_deal_snapshot(store, path)
+            del store, deals
+
+            start = time.perf_counter()
+            mapped = open_deal_snapshot(path)
+            mapped.handle_query({"sort": "capRate", "capRateMin": "8"})
+            timings[n] = time.perf_counter() - start
+            print(f"   {n:>7,} deals: parse and rebuild {rebuild:.2f} s, "
+                  f"snapshot open and first query {timings[n] * 1000:.1f} ms")
+            del mapped
+
+    assert timings[200_000] < 0.25
+    assert timings[200_000] < 5 * timings[20_000] + 0.02
+
+    print("✅ Cold start test passed!\n")
+
+def test_serving_snapshot():
+    """Test serving a mapped snapshot and writing to it after boot"""
+    print("🌐 Testing Snapshot Serving...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deals.snapshot")
+        written = DealStore(synthetic_deals(2000, seed=5), version=9)
+        write_deal_snapshot(written, path)
+        server = serve(open_deal_snapshot(path), port=0)
+        book = server.store
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://localhost:{server.server_address[1]}/api/deals"
+        try:
+            with urllib.request.urlopen(f"{base}?limit=5") as response:
+                assert response.headers["ETag"] == deal_etag(written.epoch, 9)
+                assert json.loads(response.read())["total"] == 2000
+            assert book._base is not None and len(book) == 2000
+
+            deal = dict(book.get("D0000007"), price=1000.0)
+            assert book.upsert(deal) == 10 and book._base is None and book.epoch != written.epoch
+            # Clients of the snapshot can catch up, but version 10 of it may be another boot's write
+            with urllib.request.urlopen(f"{base}?since={deal_since(written.epoch, 9)}") as response:
+                delta = json.loads(response.read())
+            assert [d["id"] for d in delta["changed"]] == ["D0000007"] and not delta["inserted"]
+            assert delta["epoch"] == book.epoch
+            for since in (deal_since(written.epoch, 10), "0"):
+                try:
+                    urllib.request.urlopen(f"{base}?since={since}")
+                    assert False, f"since={since} answered"
+                except urllib.error.HTTPError as e:
+                    assert e.code == 410
+            with urllib.request.urlopen(f"{base}?sort=price&limit=1") as response:
+                assert json.loads(response.read())["deals"][0]["id"] == "D0000007"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print("✅ Snapshot serving test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Snapshot Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_format()
+        test_deal_snapshot_queries()
+        test_cold_start()
+        test_serving_snapshot()
+        print("🎉 All snapshot tests passed!")
+    except AssertionError as e:
+        print(f"❌ Snapshot test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
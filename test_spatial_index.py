@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the spatial index and comp-based market cap rates
+"""
+
+import os
+import time
+
+import numpy as np
+
+# The engine refuses to import without a key; these tests never call the API
+os.environ.setdefault("GROQ_API_KEY", "test_api_key_12345")
+
+from real_estate_ai_engine import Property
+from spatial_index import SpatialIndex, fill_market_cap_rates, haversine_km, local_market_cap_rates
+
+def clustered_points(rng, count, cities=50):
+    """Points scattered around random city centres"""
+    centres = np.column_stack([rng.uniform(-60, 70, cities), rng.uniform(-180, 180, cities)])
+    city = rng.integers(0, cities, count)
+    lat = centres[city, 0] + rng.normal(0, 0.3, count)
+    lng = (centres[city, 1] + rng.normal(0, 0.3, count) + 180) % 360 - 180
+    return lat, lng
+
+def test_queries_match_brute_force():
+    """Test kNN and radius queries against exhaustive distances"""
+    print("📍 Testing Spatial Queries...")
+
+    rng = np.random.default_rng(0)
+    lat, lng = clustered_points(rng, 50_000)
+    lat[:10] = np.nan
+    index = SpatialIndex(lat, lng)
+    assert len(index) == 50_000 - 10
+
+    for i in rng.integers(10, 50_000, 25):
+        query_lat, query_lng = lat[i] + 0.01, lng[i] - 0.01
+        distances = haversine_km(query_lat, query_lng, lat, lng)
+        distances[np.isnan(distances)] = np.inf
+
+        ids, found = index.nearest(query_lat, query_lng, 10)
+        assert np.allclose(found, np.sort(distances)[:10])
+        ids, _ = index.radius(query_lat, query_lng, 2.5)
+        assert set(ids.tolist()) == set(np.flatnonzero(distances <= 2.5).tolist())
+
+    # Neighbours across the antimeridian
+    index = SpatialIndex([0.0, 0.0, 0.0], [179.999, -179.999, 170.0])
+    ids, distances = index.nearest(0.0, 179.9995, 2)
+    assert sorted(ids.tolist()) == [0, 1] and distances.max() < 0.2
+
+    print("✅ Spatial queries test passed!\n")
+
+def test_sparse_index():
+    """Test searches that widen to the whole globe over a handful of points"""
+    print("🌐 Testing Sparse Index...")
+
+    rng = np.random.default_rng(3)
+    lat, lng = rng.uniform(-60, 70, 20), rng.uniform(-180, 180, 20)
+    index = SpatialIndex(lat, lng)
+    start = time.perf_counter()
+    for k in (5, 19, 20, 50):
+        distances = haversine_km(lat[0], lng[0], lat, lng)
+        ids, found = index.nearest(lat[0], lng[0], k)
+        assert len(ids) == min(k, 20) and np.allclose(found, np.sort(distances)[:k]), k
+    ids, _ = index.nearest(lat[0], lng[0], 50, max_distance_km=1.0)
+    assert ids.tolist() == [0]
+
+    properties = [Property(f"P{i}", f"{i} Main St", 500000, 50000, 10000, 0.06 if i else 0.0,
+                           lat=float(lat[i]), lng=float(lng[i])) for i in range(4)]
+    assert fill_market_cap_rates(properties) == 1 and properties[0].market_cap_rate == 0.08
+    elapsed = time.perf_counter() - start
+    print(f"   wide searches over 20 points in {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.5
+
+    print("✅ Sparse index test passed!\n")
+
+def test_local_market_cap_rates():
+    """Test comp medians and filling missing market cap rates"""
+    print("🏘️  Testing Comp Cap Rates...")
+
+    # Two neighbourhoods far apart with different yields
+    lat = np.array([40.70, 40.71, 40.72, 40.73, 34.05, 34.06, 34.07, np.nan])
+    lng = np.array([-74.00, -74.01, -74.00, -74.01, -118.24, -118.25, -118.24, np.nan])
+    cap = np.array([0.05, 0.06, 0.07, 0.08, 0.04, 0.05, 0.06, 0.09])
+    local = local_market_cap_rates(lat, lng, cap, k=3, max_distance_km=50)
+    assert abs(local[0] - 0.07) < 1e-12
+    assert abs(local[4] - 0.055) < 1e-12
+    assert np.isnan(local[7])
+
+    properties = [
+        Property("A", "1 Main St", 500000, 45000, 10000, 0.0, lat=40.70, lng=-74.00),
+        Property("B", "2 Main St", 500000, 50000, 10000, 0.065, lat=40.71, lng=-74.01),
+        Property("C", "3 Main St", 500000, 40000, 10000, 0.065, lat=40.72, lng=-74.00),
+        Property("D", "4 Main St", 500000, 40000, 10000, 0.0),
+    ]
+    assert fill_market_cap_rates(properties, k=2) == 1
+    assert abs(properties[0].market_cap_rate - 0.07) < 1e-12
+    assert properties[1].market_cap_rate == 0.065 and properties[3].market_cap_rate == 0.0
+
+    print("✅ Comp cap rates test passed!\n")
+
+def test_fill_cost_follows_missing_rows():
+    """Test that filling looks up only the properties missing a market cap rate"""
+    print("🎯 Testing Fill Cost...")
+
+    rng = np.random.default_rng(2)
+    lat, lng = clustered_points(rng, 20_000)
+    properties = [
+        Property(f"P{i}", f"{i} Main St", 500000, 50000, 10000, 0.06, lat=float(lat[i]), lng=float(lng[i]))
+        for i in range(len(lat))
+    ]
+    lookups = []
+    nearest = SpatialIndex.nearest
+
+    def counted(self, *args, **kwargs):
+        lookups.append(args)
+        return nearest(self, *args, **kwargs)
+
+    SpatialIndex.nearest = counted
+    try:
+        for count in (1, 100):
+            for p in properties[:count]:
+                p.market_cap_rate = 0.0
+            lookups.clear()
+            start = time.perf_counter()
+            assert fill_market_cap_rates(properties) == count
+            elapsed = time.perf_counter() - start
+            assert len(lookups) == count
+            print(f"   {count} of {len(properties):,} missing: {elapsed:.3f}s")
+            assert elapsed < 1.0
+    finally:
+        SpatialIndex.nearest = nearest
+
+    local = local_market_cap_rates(lat, lng, np.full(len(lat), 0.06), query_rows=[5, 7])
+    assert np.isfinite(local[[5, 7]]).all() and np.isnan(np.delete(local, [5, 7])).all()
+
+    print("✅ Fill cost test passed!\n")
+
+def test_scale():
+    """Test query latency over a million points"""
+    print("⚡ Testing Spatial Index Scale...")
+
+    rng = np.random.default_rng(1)
+    lat, lng = clustered_points(rng, 1_000_000)
+    start = time.perf_counter()
+    index = SpatialIndex(lat, lng)
+    build_time = time.perf_counter() - start
+
+    queries = rng.integers(0, len(lat), 1000)
+    start = time.perf_counter()
+    for i in queries:
+        index.nearest(lat[i], lng[i], 10)
+    knn_time = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for i in queries:
+        index.radius(lat[i], lng[i], 1.0)
+    radius_time = (time.perf_counter() - start) / len(queries)
+
+    assert knn_time < 1e-3 and radius_time < 1e-3
+    print(f"   Build {build_time:.2f}s, kNN {knn_time * 1e6:.0f} µs, radius {radius_time * 1e6:.0f} µs")
+    print("✅ Spatial index scale test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Spatial Index Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_queries_match_brute_force()
+        test_sparse_index()
+        test_local_market_cap_rates()
+        test_fill_cost_follows_missing_rows()
+        test_scale()
+        print("🎉 All spatial index tests passed!")
+    except AssertionError as e:
+        print(f"❌ Spatial index test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
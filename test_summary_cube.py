@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed summary cube
+"""
+
+from summary_cube import (
+    CATEGORIES,
+    MARKET_POSITIONS,
+    RISK_LEVELS,
+    build_summary_cube,
+    classify_market_position,
+    classify_risk,
+    cube_cell,
+    distribution,
+    ensure_dimensions,
+)
+
+SAMPLE_ROWS = [
+    {"property_id": "PROP001", "noi": 45000, "cap_rate": 9.0, "score": 90,
+     "risk_level": "low", "market_position": "above_market", "category": "cap_rate_arbitrage"},
+    {"property_id": "PROP002", "noi": 70000, "cap_rate": 9.3, "score": 85,
+     "risk_level": "low", "market_position": "above_market", "category": "cap_rate_arbitrage"},
+    {"property_id": "PROP003", "noi": 36000, "cap_rate": 4.5, "score": 60,
+     "risk_level": "medium", "market_position": "below_market", "category": "distressed"},
+]
+
+def test_classification():
+    """Test risk and market position banding"""
+    print("🏷️  Testing Classification...")
+
+    assert classify_risk(80) == "low"
+    assert classify_risk(79.9) == "medium"
+    assert classify_risk(40) == "high"
+    assert classify_market_position(9.0, 0.06) == "above_market"
+    assert classify_market_position(6.2, 0.06) == "at_market"
+    assert classify_market_position(4.0, 0.06) == "below_market"
+
+    print("✅ Classification test passed!\n")
+
+def test_every_band_populated():
+    """Test that empty bands are still present in the cube"""
+    print("🧊 Testing Cube Completeness...")
+
+    cube = build_summary_cube(SAMPLE_ROWS)
+    risk = distribution(cube, "risk_level")
+    assert list(risk) == list(RISK_LEVELS)
+    assert risk == {"low": 2, "medium": 1, "high": 0}
+    assert set(distribution(cube, "market_position")) == set(MARKET_POSITIONS)
+    assert set(distribution(cube, "category")) == set(CATEGORIES)
+    assert len(cube["cells"]) == len(RISK_LEVELS) * len(MARKET_POSITIONS) * len(CATEGORIES)
+
+    empty = build_summary_cube([])
+    assert distribution(empty, "risk_level") == {"low": 0, "medium": 0, "high": 0}
+    assert empty["total"]["score_mean"] == 0.0
+
+    print("✅ Cube completeness test passed!\n")
+
+def test_aggregates():
+    """Test sums and means"""
+    print("➕ Testing Aggregates...")
+
+    cube = build_summary_cube(SAMPLE_ROWS)
+    cell = cube_cell(cube, "low", "above_market", "cap_rate_arbitrage")
+    assert cell["count"] == 2
+    assert cell["noi_sum"] == 115000
+    assert abs(cell["score_mean"] - 87.5) < 1e-9
+    assert cube["total"]["count"] == 3
+    assert cube["margins"]["category"]["distressed"]["cap_rate_sum"] == 4.5
+
+    print(f"   Total NOI: ${cube['total']['noi_sum']:,.2f}")
+    print("✅ Aggregates test passed!\n")
+
+def test_legacy_rows():
+    """Test that rows without cube dimensions are filled in"""
+    print("🕰️  Testing Legacy Rows...")
+
+    row = ensure_dimensions({"property_id": "OLD", "noi": 1, "cap_rate": 5.0, "score": 95})
+    assert row["risk_level"] == "low"
+    assert row["market_position"] == "unknown"
+    cube = build_summary_cube([row])
+    assert distribution(cube, "market_position")["unknown"] == 1
+
+    print("✅ Legacy rows test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Summary Cube Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_classification()
+        test_every_band_populated()
+        test_aggregates()
+        test_legacy_rows()
+        print("🎉 All summary cube tests passed!")
+    except AssertionError as e:
+        print(f"❌ Summary cube test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
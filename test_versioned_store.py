@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test script for versioned deal snapshots and delta responses
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from deals_service import deal_etag, deal_since, serve, synthetic_deals, versioned_deals
+from versioned_store import StaleVersionError, VersionedStore
+
+def test_versions_and_deltas():
+    """Test write versions, unchanged writes and collapsed deltas"""
+    print("🔢 Testing Versions and Deltas...")
+
+    store = VersionedStore([{"id": "A", "price": 1}, {"id": "B", "price": 2}])
+    assert store.version == 2
+    assert store.upsert({"id": "A", "price": 1}) is None
+    assert store.upsert({"id": "A", "price": 5}) == 3
+    assert store.upsert({"id": "C", "price": 7}) == 4
+    assert store.remove("B") == 5 and store.remove("B") is None
+    store.upsert({"id": "D", "price": 9})
+    store.remove("D")
+    store.upsert({"id": "A", "price": 6})
+
+    delta = store.changes_since(2)
+    assert delta["version"] == 8 and delta["since"] == 2
+    assert delta["inserted"] == [{"id": "C", "price": 7}]
+    assert delta["changed"] == [{"id": "A", "price": 6}]
+    assert delta["removed"] == ["B"]
+    assert store.changes_since(8) == {"version": 8, "epoch": store.epoch, "since": 8,
+                                      "inserted": [], "changed": [], "removed": []}
+    assert store.changes_since(8, store.epoch)["version"] == 8
+    try:
+        VersionedStore([{"id": "A", "price": 1}] * 8).changes_since(2, store.epoch)
+        assert False, "version from another store accepted"
+    except StaleVersionError:
+        pass
+
+    assert store.sync([{"id": "A", "price": 6}, {"id": "E", "price": 1}]) == 10
+    assert sorted(store.changes_since(8)["removed"]) == ["C"]
+
+    small = VersionedStore(max_log=10)
+    small.upsert_many({"id": str(i)} for i in range(30))
+    try:
+        small.changes_since(0)
+        assert False, "compacted version accepted"
+    except StaleVersionError:
+        pass
+    assert len(small.changes_since(small.version - 3)["inserted"]) == 3
+
+    print("✅ Version and delta test passed!\n")
+
+def test_snapshots():
+    """Test that indexed snapshots are rebuilt only after writes, and rate limited when asked"""
+    print("📸 Testing Deal Snapshots...")
+
+    book = versioned_deals(synthetic_deals(1000))
+    first = book.snapshot()
+    assert book.snapshot() is first and first.version == 1000
+    deals, total = book.query("price", 3)
+    assert total == 1000 and deals[0]["price"] <= deals[1]["price"]
+
+    cheapest = dict(deals[0], id="NEW", price=1000.0)
+    book.upsert(cheapest)
+    assert book.snapshot() is not first and book.snapshot().version == 1001
+    assert book.query("price", 1)[0][0]["id"] == "NEW"
+    inserted = book.changes_since(1000)["inserted"][0]
+    assert inserted == book.get("NEW") and "score" in inserted
+
+    # Every write costs a full rebuild on the next read, unless rebuilds are rate limited
+    deals = synthetic_deals(100_000)
+    timings = {}
+    for name, seconds in (("unlimited", 0.0), ("rate limited", 60.0)):
+        book = versioned_deals(deals, min_rebuild_seconds=seconds)
+        book.snapshot()
+        start = time.perf_counter()
+        for i in range(5):
+            book.upsert(dict(book.get(f"D{i:07d}"), price=1000.0 + i))
+            snapshot = book.snapshot()
+        timings[name] = time.perf_counter() - start
+        print(f"   5 writes and reads over 100,000 deals, {name}: {timings[name]:.2f} s")
+    assert snapshot.version == book.version - 5 and len(book.changes_since(snapshot.version)["changed"]) == 5
+    assert timings["rate limited"] * 3 < timings["unlimited"]
+
+    print("✅ Deal snapshot test passed!\n")
+
+def fetch(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers.get("ETag"), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("ETag"), e.read()
+
+def test_http_polling():
+    """Test ETag short-circuits and delta polling over HTTP"""
+    print("🌐 Testing Conditional and Delta Polling...")
+
+    book = versioned_deals(synthetic_deals(100_000), max_log=200_000)
+    server = serve(book, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://localhost:{server.server_address[1]}/api/deals"
+    try:
+        status, etag, body = fetch(f"{base}?limit=1000")
+        version, epoch = json.loads(body)["version"], json.loads(body)["epoch"]
+        assert status == 200 and etag == deal_etag(epoch, version) and epoch == book.epoch
+        full_size = len(body)
+
+        start = time.perf_counter()
+        for _ in range(50):
+            status, same, body = fetch(f"{base}?limit=1000", etag)
+        not_modified_time = (time.perf_counter() - start) / 50
+        assert status == 304 and same == etag and body == b""
+
+        for i in range(10):
+            book.upsert(dict(book.get(f"D{i:07d}"), price=123456.0 + i))
+        book.remove("D0000099")
+
+        start = time.perf_counter()
+        status, delta_etag, body = fetch(f"{base}?since={deal_since(epoch, version)}", etag)
+        delta_time = time.perf_counter() - start
+        delta = json.loads(body)
+        assert status == 200 and delta_etag != etag and delta["version"] == version + 11
+        assert len(delta["changed"]) == 10 and delta["removed"] == ["D0000099"] and not delta["inserted"]
+        assert fetch(f"{base}?since={deal_since(epoch, delta['version'])}", delta_etag)[0] == 304
+
+        print(f"   full page {full_size:,} bytes, 11-change delta {len(body):,} bytes; "
+              f"304 in {not_modified_time * 1000:.2f} ms, delta in {delta_time * 1000:.2f} ms")
+        assert len(body) * 50 < full_size
+
+        assert fetch(f"{base}?since={deal_since(epoch, -1)}")[0] == 410
+        assert fetch(f"{base}?since=abc")[0] == 400
+        # A bare version, or one from another book, could mean anything here
+        assert fetch(f"{base}?since=0")[0] == 410
+        assert fetch(f"{base}?since={deal_since('another', version)}")[0] == 410
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Conditional and delta polling test passed!\n")
+
+def test_restarts():
+    """Test that validators from another book or another boot never match"""
+    print("🔁 Testing Restarts...")
+
+    deals = synthetic_deals(10)
+    first, second = versioned_deals(deals), versioned_deals(synthetic_deals(10, seed=1))
+    assert first.version == second.version == 10 and first.epoch != second.epoch
+    # The same records booted again are a new line of versions too
+    assert versioned_deals(deals).epoch != first.epoch
+
+    server = serve(second, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://localhost:{server.server_address[1]}/api/deals"
+    try:
+        status, etag, _ = fetch(base, deal_etag(first.epoch, first.version))
+        assert status == 200 and etag == deal_etag(second.epoch, 10)
+        assert fetch(f"{base}?since={deal_since(first.epoch, 10)}")[0] == 410
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("✅ Restart test passed!\n")
+
+def main():
+    """Main test function"""
+    print("🧪 Versioned Store Test Suite")
+    print("=" * 40)
+    print()
+
+    try:
+        test_versions_and_deltas()
+        test_snapshots()
+        test_http_polling()
+        test_restarts()
+        print("🎉 All versioned store tests passed!")
+    except AssertionError as e:
+        print(f"❌ Versioned store test failed: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Versioned record store for Real Estate AI Investment System
+Numbers every write, keeps a change log for delta reads and rebuilds indexed snapshots on demand
+"""
+
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Change log entries kept before the oldest half is dropped
+DEFAULT_MAX_LOG = 100_000
+
+
+class StaleVersionError(LookupError):
+    """Raised when a delta is asked for from a version the change log no longer covers"""
+
+
+def new_epoch() -> str:
+    """Id of one line of versions; a store started afresh numbers its writes under a new one"""
+    return uuid.uuid4().hex[:16]
+
+
+class Change(NamedTuple):
+    version: int
+    key: str
+    created: int
+    record: Optional[Dict[str, Any]]
+
+
+class VersionedStore:
+    """Records keyed by id where every effective write gets the next version.
+
+    Each insert, change or removal appends to a change log, so
+    ``changes_since`` reads only the entries after a client's version and
+    costs time proportional to churn. Writes that leave a record unchanged
+    are not versioned. ``snapshot`` builds an indexed view with ``build``
+    (for example ``DealStore``) at most once per version, and attributes
+    the store itself lacks are read from that snapshot.
+
+    Versions count from wherever the store started, so they are only
+    comparable within one ``epoch``: a fresh id per store, or the base
+    snapshot's own until the first write over it. Deltas are refused for a
+    version from any other epoch.
+
+    ``base`` is an already built snapshot to start from, such as a
+    memory-mapped one: it is served as the current version, and its
+    records are only read into the store by the first write.
+
+    A rebuild indexes every record again, so its cost follows the size of
+    the store, not of the write. ``min_rebuild_seconds`` bounds how often
+    that happens under a steady stream of writes: a snapshot younger than
+    that keeps being served, and its ``version`` says which writes it has.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = (), build: Optional[Callable[..., Any]] = None,
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None, key: str = "id",
+                 max_log: int = DEFAULT_MAX_LOG, base=None, min_rebuild_seconds: float = 0.0):
+        self.key = key
+        self.max_log = max_log
+        self.min_rebuild_seconds = min_rebuild_seconds
+        self._build = build
+        self._prepare = prepare or dict
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._created: Dict[str, int] = {}
+        self._log: List[Change] = []
+        self._log_versions: List[int] = []
+        self._floor = 0
+        self._version = 0
+        self._lock = threading.RLock()
+        self._snapshot = None
+        self._snapshot_version = -1
+        self._snapshot_built = float("-inf")
+        self._base = base
+        self.epoch = new_epoch()
+        # (epoch, version) of the base snapshot, whose clients may still ask for deltas from it
+        self._origin = None
+        if base is not None:
+            self._version = self._floor = self._snapshot_version = base.version
+            self._snapshot = base
+            self.epoch = base.epoch
+        self.upsert_many(records)
+
+    def __len__(self) -> int:
+        base = self._base
+        return len(base) if base is not None else len(self._records)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.snapshot(), name)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        base = self._base
+        return base.get(key) if base is not None else self._records.get(key)
+
+    def _load_base(self):
+        """Read the base snapshot's records in before the first write; they predate every delta"""
+        if self._base is not None:
+            for record in self._base:
+                key = str(record[self.key])
+                self._records[key] = record
+                self._created[key] = 0
+            # Another process writing over the same base numbers its writes alike
+            self._origin = (self.epoch, self._version)
+            self.epoch = new_epoch()
+            self._base = None
+
+    def _append(self, key: str, record: Optional[Dict[str, Any]]) -> int:
+        self._version += 1
+        self._log.append(Change(self._version, key, self._created[key], record))
+        self._log_versions.append(self._version)
+        if len(self._log) > self.max_log:
+            drop = len(self._log) // 2
+            self._floor = self._log_versions[drop - 1]
+            del self._log[:drop], self._log_versions[:drop]
+        return self._version
+
+    def upsert(self, record: Dict[str, Any]) -> Optional[int]:
+        """Insert or replace a record; its version, or None when nothing changed"""
+        record = self._prepare(record)
+        key = str(record[self.key])
+        with self._lock:
+            self._load_base()
+            if self._records.get(key) == record:
+                return None
+            if key not in self._records:
+                self._created[key] = self._version + 1
+            self._records[key] = record
+            return self._append(key, record)
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        for record in records:
+            self.upsert(record)
+        return self._version
+
+    def remove(self, key: str) -> Optional[int]:
+        """Remove a record; its removal version, or None when it was absent"""
+        with self._lock:
+            self._load_base()
+            if self._records.pop(key, None) is None:
+                return None
+            version = self._append(key, None)
+            del self._created[key]
+            return version
+
+    def sync(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Make the store hold exactly ``records``, versioning only the differences"""
+        with self._lock:
+            self._load_base()
+            keep = set()
+            for record in records:
+                keep.add(str(record[self.key]))
+                self.upsert(record)
+            for key in [key for key in self._records if key not in keep]:
+                self.remove(key)
+            return self._version
+
+    def changes_since(self, since: int, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """Records inserted, changed and removed after version ``since`` of ``epoch``.
+
+        Several writes to one record collapse to its latest state, and a
+        record both created and removed in the window is left out. Without
+        ``epoch`` the version is taken to be this store's.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch and (epoch, since) != self._origin:
+                raise StaleVersionError(f"Version {since} is from another store ({epoch})")
+            if since < self._floor:
+                raise StaleVersionError(f"Changes before version {self._floor} are no longer kept")
+            latest: Dict[str, Change] = {}
+            for change in self._log[bisect_right(self._log_versions, since):]:
+                latest[change.key] = change
+            version, current = self._version, self.epoch
+
+        inserted, changed, removed = [], [], []
+        for key, change in latest.items():
+            if change.record is not None:
+                (inserted if change.created > since else changed).append(change.record)
+            elif change.created <= since:
+                removed.append(key)
+        return {"version": version, "epoch": current, "since": since,
+                "inserted": inserted, "changed": changed, "removed": removed}
+
+    def snapshot(self):
+        """Indexed view of the records, rebuilt after writes at most once per ``min_rebuild_seconds``"""
+        with self._lock:
+            if self._snapshot_version != self._version and (
+                    time.monotonic() - self._snapshot_built >= self.min_rebuild_seconds):
+                self._snapshot = self._build(list(self._records.values()), version=self._version, epoch=self.epoch)
+                self._snapshot_version = self._version
+                self._snapshot_built = time.monotonic()
+            return self._snapshot